@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from lee_county_permit_scraper import LeeCountyPermitScraper
+
+logger = logging.getLogger('main')
+
+
+def load_fixtures(paths):
+    """HAR captures (made with --record-har) and the search stored next to each of them"""
+    fixtures = []
+    for path in paths:
+        path = Path(path)
+        hars = sorted(path.glob("*.har")) if path.is_dir() else [path]
+        for har in hars:
+            meta_file = har.with_suffix(".json")
+            if not meta_file.exists():
+                logger.warning(f"Skipping {har}: no {meta_file.name} with the recorded search")
+                continue
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            fixtures.append({"name": har.stem, "har": har, **{k: v for k, v in meta.items() if k != "har"}})
+    return fixtures
+
+
+async def run_fixture(fixture, output_dir, max_concurrent, bulk_extraction, headless):
+    """Replay one capture through the normal scraper and return its run metrics"""
+    # A fresh profile every time, so cookies of an earlier replay can't change the requests
+    profile_dir = tempfile.mkdtemp(prefix="benchmark_profile_")
+    try:
+        scraper = LeeCountyPermitScraper(
+            output_file="permits_data.json",
+            user_data_dir=profile_dir,
+            max_concurrent=max_concurrent,
+            stream_output=True,
+            shard_by=fixture.get("shard_by"),
+            bulk_extraction=bulk_extraction,
+            sections=fixture.get("sections"),
+            output_dir=output_dir,
+            replay_har=fixture["har"],
+        )
+        await scraper.run(fixture["start_date"], fixture["end_date"], extract_details=True, headless=headless)
+        return scraper.metrics.report(scraper.waits, resources=scraper.resource_report())
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def print_results(results):
+    print(f"\n{'='*78}")
+    for result in results:
+        report = result["metrics"]
+        permits_per_second = report["permits"] / report["duration_s"] if report["duration_s"] else 0
+        print(f"{result['fixture']} (run {result['run']}): {report['permits']} permits in {report['duration_s']} s "
+              f"= {permits_per_second:.2f} permits/s")
+        print(f"  {'stage':<28}{'count':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for stage, timing in report["stages"].items():
+            print(f"  {stage:<28}{timing['count']:>8}{timing['total_s']:>10}{timing['p50_ms']:>10}"
+                  f"{timing['p95_ms']:>10}{timing['max_ms']:>10}")
+    print(f"{'='*78}\n")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay recorded portal sessions offline and time the extractors")
+    parser.add_argument("fixtures", nargs="*", default=["benchmarks"],
+                        help="HAR files or folders of them, recorded with --record-har (default: benchmarks/)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per fixture")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Permits processed simultaneously")
+    parser.add_argument("--per-element-extraction", action="store_true",
+                        help="Benchmark the element by element extractors instead of one script per tab")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+    
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        logger.error(f"No fixtures found in {', '.join(args.fixtures)} - record one with "
+                     f"lee_county_permit_scraper.py --record-har benchmarks/<name>.har")
+        return
+    
+    output_dir = Path("output") / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    results = []
+    for fixture in fixtures:
+        for run in range(1, args.repeat + 1):
+            logger.info(f"Benchmark {fixture['name']} run {run}/{args.repeat}")
+            metrics = await run_fixture(
+                fixture, output_dir / f"{fixture['name']}_{run}", args.max_concurrent,
+                not args.per_element_extraction, not args.headed
+            )
+            results.append({"fixture": fixture["name"], "run": run, "metrics": metrics})
+    
+    print_results(results)
+    with open(output_dir / "benchmark_results.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Benchmark results saved to {output_dir / 'benchmark_results.json'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,26 +1,882 @@
+import argparse
 import asyncio
 import json
 import csv
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+import math
 import re
+import textwrap
+import time
+from collections import deque
+from contextlib import contextmanager
 from asyncio import Semaphore
 
 from playwright.async_api import async_playwright
 
+from permit_store import (
+    ContactCache, PermitIndex, PermitStore, contact_key, contacts_to_refs, raw_contact_key, resolve_contact_refs,
+    row_fingerprint,
+)
+from parquet_export import PARQUET_AVAILABLE, export_parquet
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('main')
 
+# Mirrors extract_search_table_data for every results row at once. innerText trimmed to
+# null when empty, matching _safe_extract_text.
+SEARCH_ROWS_JS = """
+(siteUrl) => {
+    const text = (el) => {
+        if (!el) return null;
+        const value = el.innerText;
+        return value ? value.trim() : null;
+    };
+    const rows = document.querySelectorAll(
+        "table.ACA_GridView tr.ACA_TabRow_Odd, table.ACA_GridView tr.ACA_TabRow_Even"
+    );
+    return Array.from(rows).map(row => {
+        const data = {};
+        
+        const recordLink = row.querySelector("a[id*='hlPermitNumber']");
+        if (recordLink) {
+            data.record_number = recordLink.innerText.trim();
+            let detailUrl = recordLink.getAttribute("href");
+            if (detailUrl && !detailUrl.startsWith("http")) {
+                detailUrl = siteUrl + detailUrl;
+            }
+            data.detail_url = detailUrl;
+        } else {
+            const recordSpan = row.querySelector("span[id*='lblPermitNumber']");
+            if (recordSpan) {
+                data.record_number = recordSpan.innerText.trim();
+                data.detail_url = null;
+            }
+        }
+        
+        data.address = text(row.querySelector("span[id*='lblAddress']"));
+        data.description = text(row.querySelector("span[id*='lblDescription']"));
+        data.status = text(row.querySelector("span[id*='lblStatus']"));
+        data.action = text(row.querySelector("a[id*='btnFeeStatus']"));
+        
+        const relatedDiv = row.querySelector("td:nth-child(7) div.ACA_CapListStyle");
+        data.related_records = relatedDiv ? relatedDiv.innerText.trim() : null;
+        
+        data.submittal_type = text(row.querySelector("span[id*='lblShortNote']"));
+        return data;
+    });
+}
+"""
+
+# Clicks the highest numbered pager link between the current and the target results page
+# (the pager only lists a window of pages), else Next. Returns the page clicked, -1 for Next.
+PAGER_CLICK_JS = """
+([current, target]) => {
+    const nextLink = Array.from(document.querySelectorAll("td.aca_pagination_PrevNext a"))
+        .find(a => a.textContent.includes('Next'));
+    const pager = nextLink ? nextLink.closest("table") : null;
+    let best = null, bestNumber = current;
+    for (const link of pager ? pager.querySelectorAll("a") : []) {
+        const number = parseInt(link.textContent.trim(), 10);
+        if (number > bestNumber && number <= target) {
+            best = link;
+            bestNumber = number;
+        }
+    }
+    if (best) {
+        best.click();
+        return bestNumber;
+    }
+    if (nextLink) {
+        nextLink.click();
+        return -1;
+    }
+    return null;
+}
+"""
+
+# One extractor per CapDetail tab, each returning the raw values the legacy per-element
+# methods read (innerText, innerHTML, hrefs). Parsing stays in Python so both paths
+# produce the same schema.
+DETAIL_EXTRACTORS_JS = """
+(section) => {
+    const text = (el) => {
+        if (!el) return null;
+        const value = el.innerText;
+        return value ? value.trim() : null;
+    };
+    const raw = (el) => el ? el.innerText : null;
+    
+    // Same fields as _extract_contact_info_from_container
+    const contactInfo = (container) => {
+        const contact = {};
+        const firstName = container.querySelector("span.contactinfo_firstname");
+        const lastName = container.querySelector("span.contactinfo_lastname");
+        contact.name = (firstName && lastName)
+            ? `${firstName.innerText.trim()} ${lastName.innerText.trim()}`.trim()
+            : null;
+        contact.contact_id = text(container.querySelector("span.contactinfo_title"));
+        contact.business_name = text(container.querySelector("span.contactinfo_businessname"));
+        
+        const addressParts = [];
+        const addressLine = container.querySelector("span.contactinfo_addressline1");
+        if (addressLine) addressParts.push(addressLine.innerText.trim());
+        const regions = Array.from(container.querySelectorAll("span.contactinfo_region"))
+            .map(el => el.innerText.trim().replace(/,+$/, "").trim())
+            .filter(Boolean);
+        if (regions.length) addressParts.push(regions.join(", "));
+        contact.address = addressParts.length ? addressParts.join(", ") : null;
+        
+        contact.primary_phone = text(container.querySelector("span.contactinfo_phone1 div.ACA_PhoneNumberLTR"));
+        contact.cell_phone = text(container.querySelector("span.contactinfo_phone3 div.ACA_PhoneNumberLTR"));
+        contact.alternate_phone = text(container.querySelector("span.contactinfo_phone2 div.ACA_PhoneNumberLTR"));
+        contact.fax = text(container.querySelector("span.contactinfo_fax div.ACA_PhoneNumberLTR"));
+        contact.email = text(
+            container.querySelector("span.contactinfo_email table td:last-child td")
+            || container.querySelector("span.contactinfo_email td:not(:has(table))")
+        );
+        return contact;
+    };
+    
+    const extractors = {
+        expand_licensed_professional: () => {
+            const link = document.querySelector("a#link_licenseProfessional");
+            if (link && document.querySelector("table#tbl_licensedps")) {
+                const linkText = link.innerText;
+                if (linkText.includes("View Additional") || linkText.includes("Show Additional")) {
+                    link.click();
+                    return true;
+                }
+            }
+            return false;
+        },
+        
+        summary: () => {
+            const data = {
+                record_number: raw(document.querySelector("span#ctl00_PlaceHolderMain_lblPermitNumber")),
+                permit_type: raw(document.querySelector("span#ctl00_PlaceHolderMain_lblPermitType")),
+                record_status: raw(document.querySelector("span#ctl00_PlaceHolderMain_lblRecordStatus")),
+                work_location_rows: null,
+                applicant: null,
+                licensed_professional_rows: null,
+                project_description: null,
+            };
+            
+            const workLocation = document.querySelector("table#tbl_worklocation");
+            if (workLocation) {
+                data.work_location_rows = Array.from(workLocation.querySelectorAll("tr")).map(row => row.innerText);
+            }
+            
+            const applicantLabel = document.querySelector("span[id*='per_permitDetail_label_applicant']");
+            const applicantCell = applicantLabel ? applicantLabel.closest("td") : null;
+            if (applicantCell) data.applicant = contactInfo(applicantCell);
+            
+            const lpTable = document.querySelector("table#tbl_licensedps");
+            if (lpTable) {
+                data.licensed_professional_rows = Array.from(lpTable.querySelectorAll("tr")).map(row => {
+                    const infoCell = row.querySelector("td:nth-child(2)");
+                    return {
+                        html: row.innerHTML,
+                        text: infoCell ? infoCell.innerText : null,
+                        phones: infoCell
+                            ? Array.from(infoCell.querySelectorAll("div.ACA_PhoneNumberLTR")).map(div => {
+                                const phoneRow = div.closest("tr");
+                                return [phoneRow ? phoneRow.innerText : "", div.innerText];
+                            })
+                            : [],
+                    };
+                });
+            }
+            
+            const projectLabel = document.querySelector("span[id*='per_permitDetail_label_projectl']");
+            const projectCell = projectLabel ? projectLabel.closest("td") : null;
+            const projectText = projectCell ? projectCell.querySelector("table.table_child td:last-child") : null;
+            if (projectText) data.project_description = projectText.innerText.trim();
+            
+            return data;
+        },
+        
+        expand_more_details: () => {
+            let clicked = 0;
+            for (const selector of ["a#lnkMoreDetail", "a#lnkRc", "a#lnkASI", "a#lnkASITableList", "a#lnkParcelList"]) {
+                const link = document.querySelector(selector);
+                if (link) {
+                    link.click();
+                    clicked++;
+                }
+            }
+            return clicked;
+        },
+        
+        more_details: () => {
+            const data = {related_contacts: null, application_information_html: null, application_information_table: null};
+            
+            const contactsTable = document.querySelector("table#ctl00_PlaceHolderMain_PermitDetailList1_RelatContactList");
+            if (contactsTable) {
+                data.related_contacts = Array.from(contactsTable.querySelectorAll("div.MoreDetail_ItemCol1"))
+                    .map(contactInfo)
+                    .filter(contact => contact.name || contact.business_name);
+            }
+            
+            const appInfo = document.querySelector("div#ctl00_PlaceHolderMain_PermitDetailList1_phPlumbingGroup");
+            if (appInfo) data.application_information_html = appInfo.innerHTML;
+            
+            data.application_information_table = Array.from(
+                document.querySelectorAll("tr#trASITList table[cellpadding='0'][cellspacing='0']")
+            ).map(table => ({
+                section_title: raw(table.querySelector("div.ACA_TabRow.ACA_Title_Text")),
+                items: Array.from(table.querySelectorAll("tr:has(div.MoreDetail_Item)")).map(row => ({
+                    labels: Array.from(row.querySelectorAll("span.ACA_SmLabelBolder")).map(el => el.innerText),
+                    values: Array.from(row.querySelectorAll("span.ACA_SmLabel.ACA_SmLabel_FontSize")).map(el => el.innerText),
+                })),
+            }));
+            return data;
+        },
+        
+        // Workflow rows (no id, name cell) in the processing status table, as extract_processing_status walks them
+        _workflow_rows: () => {
+            const table = document.querySelector("div#divProcessingTable table");
+            if (!table) return null;
+            const rows = Array.from(table.querySelectorAll("tr"));
+            const workflows = [];
+            for (let i = 0; i < rows.length; i++) {
+                const row = rows[i];
+                if (row.getAttribute("id")) continue;
+                const nameCell = row.querySelector("td.ACA_ALeft[width='770px']");
+                if (!nameCell) continue;
+                const expandLink = row.querySelector("a[id^='lnk_']");
+                const detailRow = (expandLink && i + 1 < rows.length) ? rows[i + 1] : null;
+                workflows.push({nameCell, expandLink, detailRow});
+                i++;
+            }
+            return workflows;
+        },
+        
+        expand_processing_status: () => {
+            const workflows = extractors._workflow_rows();
+            if (!workflows) return 0;
+            let clicked = 0;
+            for (const workflow of workflows) {
+                if (workflow.detailRow) {
+                    workflow.expandLink.click();
+                    clicked++;
+                }
+            }
+            return clicked;
+        },
+        
+        processing_status: () => {
+            const workflows = extractors._workflow_rows();
+            if (!workflows) return null;
+            return workflows.map(workflow => ({
+                name: workflow.nameCell.innerText.trim(),
+                items: workflow.detailRow
+                    ? Array.from(workflow.detailRow.querySelectorAll("tr.ACA_TabRow_Bold, tr.ACA_TabRow_Italic"))
+                        .map(item => item.innerText)
+                    : null,
+            }));
+        },
+        
+        related_records: () => {
+            if (document.querySelector("div#divRelatedCapTree span.ACA_CapDetail_NoRecord")) return null;
+            const table = document.querySelector("table#tableCapTreeList");
+            if (!table) return null;
+            
+            const records = [];
+            for (const row of table.querySelectorAll("tr[name]")) {
+                const cells = row.querySelectorAll(":scope > td");
+                if (cells.length < 4) continue;
+                
+                const nestedTable = cells[0].querySelector("table");
+                const nestedCells = nestedTable ? nestedTable.querySelectorAll("td") : [];
+                if (nestedCells.length < 3) continue;
+                const recordNumber = nestedCells[2].innerText.trim();
+                if (!recordNumber) continue;
+                
+                const dateDiv = cells[3].querySelector("div.ACA_NShot");
+                const viewLink = cells.length > 4 ? cells[4].querySelector("div.ACA_Shot a#detail") : null;
+                records.push({
+                    related_record_number: recordNumber,
+                    related_record_type: cells[1].innerText.trim() || null,
+                    related_project_name: cells[2].innerText.trim() || null,
+                    related_date: (dateDiv || cells[3]).innerText.trim() || null,
+                    related_detail_url: viewLink ? viewLink.getAttribute("href") : null,
+                });
+            }
+            return records;
+        },
+        
+        fees: () => {
+            const section = (divSelector) => {
+                const feeDiv = document.querySelector(divSelector);
+                if (!feeDiv) return null;
+                const style = feeDiv.getAttribute("style");
+                if (style && style.includes("display: none")) return null;
+                const table = feeDiv.querySelector("table#ctl00_PlaceHolderMain_FeeList_gdvFeeUnpaidList");
+                if (!table) return null;
+                
+                const rows = Array.from(table.querySelectorAll("tr.ACA_TabRow_Odd, tr.ACA_TabRow_Even"))
+                    .map(row => Array.from(row.querySelectorAll("td")))
+                    .filter(cells => cells.length >= 3)
+                    .map(cells => cells.slice(0, 3).map(cell => {
+                        const div = cell.querySelector("div");
+                        return div ? div.innerText.trim() : null;
+                    }));
+                const totalCell = table.querySelector("tr td[colspan]");
+                return {rows, total_text: totalCell ? totalCell.innerText : null};
+            };
+            return {outstanding: section("div#divFeeList"), paid: section("div#divFeeListPaid")};
+        },
+        
+        conditions: () => {
+            const table = document.querySelector("table#ctl00_PlaceHolderMain_capConditions_gdvGeneralConditionsList");
+            if (!table) return null;
+            return Array.from(table.querySelectorAll("tr.ACA_TabRow_Odd, tr.ACA_TabRow_Even")).map(row => {
+                const groupDiv = row.querySelector("div[id*='divGeneralConditionsGroupName']");
+                const groupName = groupDiv ? groupDiv.querySelector("span[id*='lblGeneralConditionsGroupName']") : null;
+                const typeDiv = row.querySelector("div[id*='divGeneralConditionsType']");
+                const typeName = typeDiv ? typeDiv.querySelector("span[id*='lblGeneralConditionsType']") : null;
+                const info = row.querySelector("span[id*='lblGeneralConditionsInfo']");
+                return {
+                    group: groupName ? groupName.innerText.trim() : null,
+                    type: typeName ? typeName.innerText.trim() : null,
+                    info_html: info ? info.innerHTML : null,
+                    info_text: info ? info.innerText : null,
+                };
+            });
+        },
+    };
+    
+    return extractors[section]();
+}
+"""
+
+# Resource types aborted by each blocking profile. Scripts, XHR and documents always load,
+# the ASP.NET postbacks (tabs, paging, loading mask) depend on them.
+RESOURCE_BLOCK_PROFILES = {
+    "none": (),
+    "standard": ("image", "media", "font"),
+    "aggressive": ("image", "media", "font", "stylesheet", "manifest", "other"),
+}
+BLOCKED_URL_PATTERNS = ("google-analytics", "googletagmanager", "facebook", "doubleclick")
+# Typical transfer size of an aborted request, the response is never fetched so savings are estimates
+BLOCKED_BYTES_ESTIMATE = {
+    "image": 25_000, "media": 250_000, "font": 40_000, "stylesheet": 15_000,
+    "manifest": 1_000, "script": 30_000, "other": 5_000,
+}
+
+# Contacts kept in memory by the contact cache when bounded_memory is set
+BOUNDED_CONTACT_CACHE_SIZE = 5000
+
+# Accela Citizen Access host and the agency/module scraped by default
+ACA_HOST = "https://aca-prod.accela.com"
+DEFAULT_AGENCY = "LEECO"
+DEFAULT_MODULE = "Permitting"
+# Search form elements; agencies with a customised CapHome form can override them
+SEARCH_SELECTORS = {
+    "start_date": "input[name='ctl00$PlaceHolderMain$generalSearchForm$txtGSStartDate']",
+    "end_date": "input[name='ctl00$PlaceHolderMain$generalSearchForm$txtGSEndDate']",
+    "search_button": "a#ctl00_PlaceHolderMain_btnNewSearch",
+    "results_grid": "table.ACA_GridView",
+}
+
+# Detail sections that can be selected; everything except summary/more_details costs a tab postback
+DETAIL_SECTIONS = ("summary", "more_details", "processing_status", "related_records", "fees", "conditions")
+DETAIL_TAB_SECTIONS = DETAIL_SECTIONS[2:]
+# Tabs read together on one page when parallel_tabs is on (Record Info, Payments, Conditions)
+DETAIL_TAB_GROUPS = (("processing_status", "related_records"), ("fees",), ("conditions",))
+
+# Elements that start a new line in innerText, used when reading CapDetail HTML with lxml
+HTML_BLOCK_TAGS = {
+    "div", "p", "tr", "table", "tbody", "thead", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6", "form",
+}
+
+
+# Element that becomes visible once each detail tab has rendered after its click
+TAB_READY_SELECTORS = {
+    "processing_status": "div#divProcessingTable",
+    "related_records": "div#divRelatedCapTree span.ACA_CapDetail_NoRecord, table#tableCapTreeList",
+    "fee": "div#divFeeListContent",
+    "conditions": "div#divGeneralConditions",
+}
+
+
+class TimingStats:
+    """Count, total and max of a stream of durations, with percentiles from a log-scaled histogram instead of every value"""
+    
+    # Bucket n holds durations up to 1.05^n ms, so percentiles are within 5%
+    BUCKET_GROWTH = 1.05
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+    
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = math.ceil(math.log(max(seconds * 1000, 1), self.BUCKET_GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+    
+    def percentile(self, percent):
+        """Nearest-rank percentile in seconds, rounded up to its bucket bound but never above the max"""
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.BUCKET_GROWTH ** bucket / 1000, self.max)
+        return self.max
+
+
+class WaitStrategy:
+    """Waits on page signals (postback response, loading mask, selectors) and records how long each wait took"""
+    
+    LOADING_MASK_HIDDEN_JS = """
+        () => {
+            const mask = document.querySelector('div#divGlobalLoadingMask');
+            return !mask || mask.classList.contains('ACA_Hide') || mask.offsetParent === null;
+        }
+    """
+    
+    def __init__(self):
+        self.timings = {}
+        self.timeouts = {}
+        self.replaced_ms = {}
+    
+    def record(self, label, seconds, replaced_ms=0, timed_out=False):
+        if label not in self.timings:
+            self.timings[label] = TimingStats()
+        self.timings[label].add(seconds)
+        self.replaced_ms[label] = replaced_ms
+        if timed_out:
+            self.timeouts[label] = self.timeouts.get(label, 0) + 1
+    
+    async def _timed(self, label, replaced_ms, waiter, required=False):
+        started = time.perf_counter()
+        try:
+            await waiter
+            self.record(label, time.perf_counter() - started, replaced_ms)
+            return True
+        except Exception:
+            self.record(label, time.perf_counter() - started, replaced_ms, timed_out=True)
+            if required:
+                raise
+            return False
+    
+    async def loading_mask(self, page, label, replaced_ms=0, timeout=15000):
+        """Until the ACA loading mask is hidden (returns at once when no postback is running)"""
+        return await self._timed(label, replaced_ms, page.wait_for_function(self.LOADING_MASK_HIDDEN_JS, timeout=timeout))
+    
+    async def selector(self, page, selector, label, replaced_ms=0, timeout=10000, state="visible", required=False):
+        return await self._timed(label, replaced_ms, page.wait_for_selector(selector, state=state, timeout=timeout), required)
+    
+    async def function(self, page, expression, label, arg=None, replaced_ms=0, timeout=10000):
+        return await self._timed(label, replaced_ms, page.wait_for_function(expression, arg=arg, timeout=timeout))
+    
+    async def postback(self, page, action, label, replaced_ms=0, timeout=15000):
+        """Run action (which triggers an ASP.NET postback), wait for the POST response, then for the loading mask"""
+        started = time.perf_counter()
+        try:
+            async with page.expect_response(lambda response: response.request.method == "POST", timeout=timeout):
+                await action()
+            await page.wait_for_load_state("domcontentloaded")
+            await page.wait_for_function(self.LOADING_MASK_HIDDEN_JS, timeout=timeout)
+            self.record(label, time.perf_counter() - started, replaced_ms)
+            return True
+        except Exception:
+            self.record(label, time.perf_counter() - started, replaced_ms, timed_out=True)
+            return False
+    
+    def summary(self):
+        """{label: count, avg/max ms, timeouts, fixed sleep it replaced and total ms saved}"""
+        stats = {}
+        for label, timing in sorted(self.timings.items()):
+            replaced_ms = self.replaced_ms.get(label, 0)
+            stats[label] = {
+                "count": timing.count,
+                "avg_ms": round(timing.total / timing.count * 1000, 1),
+                "max_ms": round(timing.max * 1000, 1),
+                "timeouts": self.timeouts.get(label, 0),
+                "replaced_ms": replaced_ms,
+                "saved_ms": round(replaced_ms * timing.count - timing.total * 1000),
+            }
+        return stats
+    
+    def log_summary(self):
+        stats = self.summary()
+        if not stats:
+            return
+        for label, label_stats in stats.items():
+            logger.info(f"Wait {label}: {label_stats['count']}x avg {label_stats['avg_ms']:.0f} ms "
+                        f"(max {label_stats['max_ms']:.0f} ms, {label_stats['timeouts']} timeouts, "
+                        f"fixed sleep was {label_stats['replaced_ms']} ms)")
+        # Scope totals: search.* per search, page.* per results page, permit.* per permit
+        for scope, counter in (("search", "search.results"), ("page", "page.grid"), ("permit", "permit.ready")):
+            count = stats.get(counter, {}).get("count", 0)
+            if not count:
+                continue
+            waited = sum(s["avg_ms"] * s["count"] for label, s in stats.items() if label.startswith(scope + "."))
+            saved = sum(s["saved_ms"] for label, s in stats.items() if label.startswith(scope + "."))
+            logger.info(f"Per {scope}: waited {waited / count / 1000:.1f} s, saved {saved / count / 1000:.1f} s vs fixed sleeps")
+
+
+class AdaptiveConcurrency:
+    """AIMD limit for permit extraction: +1 while latency and errors stay healthy, multiplied down on failures or slow pages"""
+    
+    def __init__(self, initial, min_limit=1, max_limit=10, latency_target_s=30.0, max_error_rate=0.1, backoff=0.7):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"concurrency bounds must satisfy 1 <= min <= max, got {min_limit!r}..{max_limit!r}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.latency_target_s = latency_target_s
+        self.max_error_rate = max_error_rate
+        self.backoff = backoff
+        self.in_use = 0
+        self.waiters = deque()
+        self.started = time.perf_counter()
+        self.decisions = []
+        self._reset_window()
+    
+    def _reset_window(self):
+        self.window = []
+        self.window_started = time.perf_counter()
+        self.window_peak = self.in_use
+    
+    def locked(self):
+        return self.in_use >= self.limit
+    
+    def _take(self):
+        self.in_use += 1
+        self.window_peak = max(self.window_peak, self.in_use)
+    
+    def try_acquire(self):
+        """Take a slot only if one is free right now"""
+        if self.locked():
+            return False
+        self._take()
+        return True
+    
+    async def acquire(self):
+        while self.locked():
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        self._take()
+        return True
+    
+    def release(self):
+        self.in_use -= 1
+        self._wake()
+    
+    def _wake(self):
+        free = self.limit - self.in_use
+        while self.waiters and free > 0:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.release()
+    
+    def report(self, latency, ok):
+        """Record one finished permit; once a window of results is in, adjust the limit. Returns True if it changed"""
+        self.window.append((latency, ok))
+        if len(self.window) < max(self.limit, 5):
+            return False
+        
+        latencies = sorted(latency for latency, _ in self.window)
+        p50 = latencies[len(latencies) // 2]
+        errors = sum(1 for _, ok in self.window if not ok)
+        error_rate = errors / len(self.window)
+        elapsed = time.perf_counter() - self.window_started
+        throughput = len(self.window) / elapsed * 60 if elapsed > 0 else 0
+        
+        old_limit = self.limit
+        if error_rate > self.max_error_rate:
+            self.limit = max(self.min_limit, int(self.limit * self.backoff))
+            reason = f"error rate {error_rate:.0%}"
+        elif p50 > self.latency_target_s:
+            self.limit = max(self.min_limit, int(self.limit * self.backoff))
+            reason = f"slow pages (p50 above {self.latency_target_s:.0f} s)"
+        elif self.window_peak >= self.limit:
+            # Only grow when the current limit was actually used
+            self.limit = min(self.max_limit, self.limit + 1)
+            reason = "healthy"
+        else:
+            reason = "healthy, limit not reached"
+        
+        self.decisions.append({
+            "at_s": round(time.perf_counter() - self.started, 1),
+            "from": old_limit,
+            "to": self.limit,
+            "reason": reason,
+            "p50_s": round(p50, 2),
+            "error_rate": round(error_rate, 3),
+            "permits_per_minute": round(throughput, 2),
+        })
+        message = (f"Concurrency {old_limit} -> {self.limit}: {reason} "
+                   f"(p50 {p50:.1f} s, {errors}/{len(self.window)} failed, {throughput:.1f} permits/min)")
+        if self.limit != old_limit:
+            logger.info(message)
+        else:
+            logger.debug(message)
+        
+        self._reset_window()
+        self._wake()
+        return self.limit != old_limit
+
+
+class RunMetrics:
+    """Per-stage timings (count, p50, p95, max), throughput and concurrency utilization of one run"""
+    
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.permits_completed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.limit = 0
+        self.in_flight_seconds = 0.0
+        self.limit_seconds = 0.0
+        self.last_change = self.started
+    
+    def record(self, stage, seconds):
+        if stage not in self.stages:
+            self.stages[stage] = TimingStats()
+        self.stages[stage].add(seconds)
+    
+    def lap(self, stage, started):
+        """Record the time since started under stage, returns the new start"""
+        now = time.perf_counter()
+        self.record(stage, now - started)
+        return now
+    
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    def _advance(self):
+        # Integrate in-flight permits and the concurrency limit over time
+        now = time.perf_counter()
+        self.in_flight_seconds += self.in_flight * (now - self.last_change)
+        self.limit_seconds += self.limit * (now - self.last_change)
+        self.last_change = now
+    
+    def set_limit(self, limit):
+        self._advance()
+        self.limit = limit
+    
+    def permit_started(self):
+        self._advance()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    
+    def permit_finished(self):
+        self._advance()
+        self.in_flight -= 1
+    
+    def report(self, waits=None, concurrency_decisions=None, resources=None):
+        self._advance()
+        duration = time.perf_counter() - self.started
+        stages = {}
+        for stage, timing in sorted(self.stages.items()):
+            stages[stage] = {
+                "count": timing.count,
+                "total_s": round(timing.total, 3),
+                "p50_ms": round(timing.percentile(50) * 1000, 1),
+                "p95_ms": round(timing.percentile(95) * 1000, 1),
+                "max_ms": round(timing.max * 1000, 1),
+            }
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_s": round(duration, 1),
+            "permits": self.permits_completed,
+            "permits_per_minute": round(self.permits_completed / duration * 60, 2) if duration > 0 else 0,
+            "concurrency": {
+                "limit": self.limit,
+                "avg_in_flight": round(self.in_flight_seconds / duration, 2) if duration > 0 else 0,
+                "max_in_flight": self.max_in_flight,
+                "utilization": round(self.in_flight_seconds / self.limit_seconds, 3) if self.limit_seconds else None,
+            },
+            "stages": stages,
+        }
+        if waits is not None:
+            report["waits"] = waits.summary()
+        if concurrency_decisions is not None:
+            report["concurrency_decisions"] = concurrency_decisions
+        if resources is not None:
+            report["resources"] = resources
+        return report
+    
+    def save(self, path, waits=None, concurrency_decisions=None, resources=None):
+        report = self.report(waits, concurrency_decisions, resources)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Run metrics: {report['permits']} permits in {report['duration_s']:.0f} s "
+                    f"({report['permits_per_minute']} permits/min, "
+                    f"concurrency utilization {report['concurrency']['utilization']}) - {path}")
+        return report
+
+
+class DetailPagePool:
+    """Fixed pool of long-lived detail pages, recycled after max_uses permits or when the JS heap grows"""
+    
+    def __init__(self, context, size, max_uses=50, max_heap_mb=300, open_page=None):
+        self.context = context
+        self.open_page = open_page or context.new_page
+        self.size = size
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.idle_pages = asyncio.Queue()
+        self.uses = {}
+        # Pages being opened, counted against the size so concurrent acquires can't overfill the pool
+        self.opening = 0
+        self.created = 0
+        self.recycled = 0
+    
+    def _has_room(self):
+        return len(self.uses) + self.opening < self.size
+    
+    async def _new_page(self):
+        self.opening += 1
+        try:
+            page = await self.open_page()
+        finally:
+            self.opening -= 1
+        self.uses[page] = 0
+        self.created += 1
+        return page
+    
+    async def acquire(self):
+        """Check out an idle page, opening a new one while the pool is below its size"""
+        if self.idle_pages.empty() and self._has_room():
+            return await self._new_page()
+        return await self.idle_pages.get()
+    
+    async def try_acquire(self):
+        """Check out a page without waiting, None when every page is in use"""
+        if not self.idle_pages.empty():
+            return self.idle_pages.get_nowait()
+        if self._has_room():
+            return await self._new_page()
+        return None
+    
+    async def release(self, page):
+        """Reset a page and return it to the pool, replacing it when it is worn out or broken"""
+        self.uses[page] = self.uses.get(page, 0) + 1
+        try:
+            heap_mb = await page.evaluate(
+                "() => performance.memory ? performance.memory.usedJSHeapSize / 1048576 : 0"
+            )
+            if self.uses[page] >= self.max_uses or heap_mb > self.max_heap_mb:
+                logger.debug(f"Recycling detail page after {self.uses[page]} uses ({heap_mb:.0f} MB heap)")
+                page = await self._recycle(page)
+            else:
+                # Drop the CapDetail DOM and its timers while the page sits idle
+                await page.goto("about:blank")
+        except Exception:
+            try:
+                page = await self._recycle(page)
+            except Exception as e:
+                logger.warning(f"Could not replace detail page: {e}")
+                return
+        self.idle_pages.put_nowait(page)
+    
+    async def _recycle(self, page):
+        # The old page keeps its slot until the replacement takes it over
+        try:
+            await page.close()
+        except:
+            pass
+        self.uses.pop(page, None)
+        self.recycled += 1
+        return await self._new_page()
+    
+    async def close(self):
+        while not self.idle_pages.empty():
+            page = self.idle_pages.get_nowait()
+            try:
+                await page.close()
+            except:
+                pass
+        self.uses.clear()
+
 
 class LeeCountyPermitScraper:
-    def __init__(self, output_file="permits_data.json", user_data_dir="./chrome_profile", max_concurrent=5):
-        self.base_url = "https://aca-prod.accela.com/LEECO/Cap/CapHome.aspx?module=Permitting&TabName=Home"
+    # Key fields exported to CSV (shared by the full rewrite and the streaming sink)
+    CSV_COLUMNS = [
+        'record_number', 'permit_type', 'status', 'record_status', 
+        'description', 'submittal_type', 'action', 'related_records',
+        'address', 'work_location',
+        'applicant_name', 'applicant_business', 'applicant_address', 
+        'applicant_phone', 'applicant_cell', 'applicant_email',
+        'licensed_professional_name', 'licensed_professional_business', 'licensed_professional_address', 
+        'licensed_professional_license', 'licensed_professional_phone',
+        'project_description', 'job_value', 'commercial_residential', 'type_of_use',
+        'work_area_sqft', 'property_use_type', 'master_plan_num',
+        'total_outstanding', 'total_paid', 'total_fees',
+        'conditions_count', 'current_workflow_step', 'permit_issued_date', 'application_date',
+        'extraction_status', 'detail_url'
+    ]
+    
+    def __init__(self, output_file="permits_data.json", user_data_dir="./chrome_profile", max_concurrent=5,
+                 stream_output=False, resume_dir=None, shard_by=None, max_concurrent_searches=2,
+                 bulk_extraction=True, detail_page_max_uses=50, detail_page_max_heap_mb=300,
+                 resource_profile="standard", http_fast_path=False, sections=None, parallel_tabs=False,
+                 index_file=None, use_database=False, adaptive_concurrency=False, min_concurrent=1,
+                 max_concurrent_limit=None, latency_target_s=30.0, max_retries=3, retry_base_delay=5.0,
+                 output_dir=None, on_permit=None, record_har=None, replay_har=None, parquet=False,
+                 contact_cache_file=None, contact_refs=False, agency=DEFAULT_AGENCY, module=DEFAULT_MODULE,
+                 host=ACA_HOST, selectors=None, semaphore=None, bounded_memory=False, follow_related=False,
+                 related_max_depth=1):
+        # Which Accela Citizen Access portal to scrape (every agency has the same CapHome/CapDetail layout)
+        self.host = host.rstrip("/")
+        self._set_agency(agency, module)
+        unknown = sorted(set(selectors or {}) - set(SEARCH_SELECTORS))
+        if unknown:
+            raise ValueError(f"selectors must be taken from {list(SEARCH_SELECTORS)}, got {unknown!r}")
+        self.selectors = {**SEARCH_SELECTORS, **(selectors or {})}
+        # Set by run_in_context when other scrapers share the browser context
+        self.shared_context = False
         
-        # Create timestamped output folder
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.output_dir = Path("output") / f"scrape_{timestamp}"
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if resume_dir:
+            # Continue writing into the folder of the interrupted run
+            self.output_dir = Path(resume_dir)
+            if not (self.output_dir / "checkpoint.json").exists():
+                raise FileNotFoundError(f"No checkpoint.json found in {self.output_dir}")
+        elif output_dir:
+            self.output_dir = Path(output_dir)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            # Create timestamped output folder
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.output_dir = Path("output") / f"scrape_{timestamp}"
+            self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Set output file paths in the timestamped folder
         output_path = Path(output_file)
@@ -29,14 +885,149 @@ class LeeCountyPermitScraper:
         
         self.output_file = self.output_dir / f"{stem}{suffix}"
         self.csv_file = self.output_dir / f"{stem}.csv"
+        self.jsonl_file = self.output_dir / f"{stem}.jsonl"
+        self.checkpoint_file = self.output_dir / "checkpoint.json"
+        # Record numbers of saved permits, appended at every checkpoint instead of rewriting the whole list
+        self.completed_log_file = self.output_dir / "completed_records.txt"
+        self.db_file = self.output_dir / f"{stem}.db"
+        self.contacts_file = self.output_dir / "contacts.json"
+        self.related_edges_file = self.output_dir / "related_edges.csv"
+        # Finished permits only go to disk (stream or database), only their record numbers stay in memory
+        self.bounded_memory = bounded_memory
+        if bounded_memory and not stream_output and not use_database:
+            logger.info("Bounded memory mode writes permits to disk as they finish - streaming output enabled")
+            stream_output = True
+        self.stream_output = stream_output
+        # With a database the permits are already on disk, so all_permits is only filled without one
+        self.keep_permits = not bounded_memory and not use_database
         self.user_data_dir = Path(user_data_dir)
         self.all_permits = []
+        self.permit_count = 0
         self.max_concurrent = max_concurrent
         self.semaphore = None
+        
+        # AIMD controller instead of a fixed Semaphore(max_concurrent); max_concurrent is then the starting limit
+        self.adaptive_concurrency = adaptive_concurrency
+        self.min_concurrent = min_concurrent
+        self.max_concurrent_limit = max_concurrent_limit or max_concurrent * 2
+        self.latency_target_s = latency_target_s
+        
+        # Optional date-range sharding: one search per day/week, run in parallel pages
+        if shard_by not in (None, "day", "week"):
+            raise ValueError(f"shard_by must be None, 'day' or 'week', got {shard_by!r}")
+        self.shard_by = shard_by
+        self.max_concurrent_searches = max_concurrent_searches
+        self.search_semaphore = None
+        
+        # Detail pipeline: paginators put (search_data, record_number) here, workers drain it
+        self.detail_queue = None
+        self.detail_workers = []
+        
+        # Permits whose detail extraction failed: (search_data, record_number, error), retried at the end
+        self.retry_queue = []
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        
+        # Called with every finished permit (e.g. to stream results to another process)
+        self.on_permit = on_permit
+        
+        # Graph crawl: queue the related records of finished permits too, up to related_max_depth links away
+        if related_max_depth < 1:
+            raise ValueError(f"related_max_depth must be at least 1, got {related_max_depth!r}")
+        self.follow_related = follow_related
+        self.related_max_depth = related_max_depth
+        # Discovered records that did not fit into the bounded detail queue, fed in as it drains
+        self.related_overflow = []
+        
+        # Long-lived detail pages shared by the workers instead of a new tab per permit
+        self.page_pool = None
+        self.detail_page_max_uses = detail_page_max_uses
+        self.detail_page_max_heap_mb = detail_page_max_heap_mb
+        
+        # Event-driven waits instead of fixed sleeps, with per-wait timings
+        self.waits = WaitStrategy()
+        # Stage timings written to run_metrics.json at the end of the run
+        self.metrics = RunMetrics()
+        self.metrics_file = self.output_dir / "run_metrics.json"
+        if semaphore is not None:
+            # Permit slots shared with other scrapers in the same process (e.g. daemon jobs)
+            self.semaphore = semaphore
+            self.metrics.set_limit(getattr(semaphore, "limit", max_concurrent))
+        
+        # Request interception on the browser context
+        if resource_profile not in RESOURCE_BLOCK_PROFILES:
+            raise ValueError(f"resource_profile must be one of {list(RESOURCE_BLOCK_PROFILES)}, got {resource_profile!r}")
+        self.resource_profile = resource_profile
+        self.blocked_resource_types = set(RESOURCE_BLOCK_PROFILES[resource_profile])
+        self.resource_stats = {
+            "blocked_requests": 0, "blocked_by_type": {}, "bytes_saved": 0,
+            "permits_measured": 0, "permit_blocked_requests": 0, "permit_bytes_saved": 0,
+        }
+        self.page_permits = {}
+        self.permit_resources = {}
+        # Pages this scraper opened and hasn't seen closed yet
+        self.owned_pages = set()
+        
+        # Read the server-rendered sections of CapDetail over plain HTTP
+        if http_fast_path and lxml_html is None:
+            logger.warning("lxml is not installed - HTTP fast path disabled (pip install lxml)")
+            http_fast_path = False
+        self.http_fast_path = http_fast_path
+        
+        # Capture every portal response to a HAR file, or serve a captured run from one (offline benchmarks)
+        self.record_har = Path(record_har) if record_har else None
+        self.replay_har = Path(replay_har) if replay_har else None
+        if self.replay_har and self.http_fast_path:
+            # HAR routing only applies to browser pages, not to context.request
+            logger.warning("HTTP fast path is not available when replaying a HAR file - disabled")
+            self.http_fast_path = False
+        
+        # Read each detail tab with one injected script instead of per-element round trips
+        self.bulk_extraction = bulk_extraction
+        # Detail sections to collect (None = all of DETAIL_SECTIONS)
+        self.sections = self.normalize_sections(sections)
+        # Read tab groups of one permit in sibling pages, using free slots of the permit semaphore
+        self.parallel_tabs = parallel_tabs
+        
+        # Change detection between runs: permits whose search row is unchanged reuse their stored details
+        self.permit_index = PermitIndex(index_file) if index_file else None
+        self.recrawl_stats = {"new": 0, "changed": 0, "unchanged": 0, "details_changed": 0}
+        
+        # SQLite store of finished permits; JSON and CSV are then exported from it at the end
+        self.permit_store = PermitStore(self.db_file) if use_database else None
+        
+        # Contacts already seen on earlier permits (per run, or kept between runs in contact_cache_file),
+        # only the most recently used ones in memory with bounded_memory
+        self.contact_cache = ContactCache(contact_cache_file,
+                                          max_entries=BOUNDED_CONTACT_CACHE_SIZE if bounded_memory else None)
+        # Write each keyed contact once to contacts.json and only {"contact_ref": key} in the JSON permits
+        self.contact_refs = contact_refs
+        
+        # Typed Parquet files (permits plus child tables) written next to the JSON at the end of the run
+        if parquet and not PARQUET_AVAILABLE:
+            logger.warning("pyarrow is not installed - Parquet export disabled (pip install pyarrow)")
+            parquet = False
+        self.parquet = parquet
         self.should_stop = False
         self.context = None
         self.user_data_dir.mkdir(parents=True, exist_ok=True)
         
+        # Checkpoint state (persisted to checkpoint.json after every page)
+        self.search_range = None
+        self.extract_details = False
+        self.last_completed_pages = {}
+        self.completed_shards = set()
+        self.processed_permit_ids = set()
+        self.completed_permit_ids = set()
+        self.pending_permits = {}
+        self.pending_pages = {}
+        self.listed_pages = {}
+        self.unlogged_completions = []
+        self.completed_log_mode = 'w'
+        self.resuming = bool(resume_dir)
+        if self.resuming:
+            self.load_checkpoint()
+        
         # Pre-built translation table for fast label cleaning (5x faster than chained replace)
         self.label_trans = str.maketrans({
             ' ': '_', '?': '', '/': '_', ':': '', '#': 'num',
@@ -90,6 +1081,11 @@ class LeeCountyPermitScraper:
             business_elem = await container.query_selector("span.contactinfo_businessname")
             contact["business_name"] = await self._safe_extract_text(business_elem)
             
+            # Seen on an earlier permit: skip the address, phone and email lookups
+            cached = self.contact_cache.get(contact_key(contact, "contact"))
+            if cached:
+                return cached
+            
             address_parts = []
             address_elem = await container.query_selector("span.contactinfo_addressline1")
             if address_elem:
@@ -156,8 +1152,8 @@ class LeeCountyPermitScraper:
     
     async def _extract_fee_rows_from_table(self, table):
         """Extract fee rows from a fee table"""
-        fees = []
-        total = None
+        row_cells = []
+        total_text = None
         
         try:
             rows = await table.query_selector_all("tr.ACA_TabRow_Odd, tr.ACA_TabRow_Even")
@@ -166,71 +1162,304 @@ class LeeCountyPermitScraper:
                 try:
                     cells = await row.query_selector_all("td")
                     if len(cells) >= 3:
-                        fee = {}
-                        
-                        date_div = await cells[0].query_selector("div")
-                        if date_div:
-                            fee["date"] = (await date_div.inner_text()).strip()
-                        
-                        invoice_div = await cells[1].query_selector("div")
-                        if invoice_div:
-                            fee["invoice_number"] = (await invoice_div.inner_text()).strip()
-                        
-                        amount_div = await cells[2].query_selector("div")
-                        if amount_div:
-                            fee["amount"] = (await amount_div.inner_text()).strip()
-                        
-                        if fee.get("invoice_number"):
-                            fees.append(fee)
+                        cell_texts = []
+                        for cell in cells[:3]:
+                            cell_div = await cell.query_selector("div")
+                            cell_texts.append((await cell_div.inner_text()).strip() if cell_div else None)
+                        row_cells.append(cell_texts)
                 except:
                     continue
             
             total_row = await table.query_selector("tr td[colspan]")
             if total_row:
                 total_text = await total_row.inner_text()
-                total_match = re.search(r'\$[\d,]+\.?\d*', total_text)
-                if total_match:
-                    total = total_match.group(0)
         except:
             pass
         
+        return self._build_fee_rows(row_cells, total_text)
+    
+    def _build_fee_rows(self, row_cells, total_text):
+        """Build fee dicts from [date, invoice, amount] cell texts (None when the cell has no div)"""
+        fees = []
+        for date, invoice_number, amount in row_cells:
+            fee = {}
+            if date is not None:
+                fee["date"] = date
+            if invoice_number is not None:
+                fee["invoice_number"] = invoice_number
+            if amount is not None:
+                fee["amount"] = amount
+            if fee.get("invoice_number"):
+                fees.append(fee)
+        
+        total = None
+        if total_text:
+            total_match = re.search(r'\$[\d,]+\.?\d*', total_text)
+            if total_match:
+                total = total_match.group(0)
+        
         return fees, total
+    
+    def _workflow_value(self, workflow_steps):
+        """A workflow with one step is stored as a dict, several as a list, none as None"""
+        if len(workflow_steps) == 1:
+            return workflow_steps[0]
+        elif len(workflow_steps) > 1:
+            return workflow_steps
+        return None
+    
+    def _set_agency(self, agency, module):
+        self.agency = agency
+        self.module = module
+        self.site_url = f"{self.host}/{agency}"
+        self.base_url = f"{self.site_url}/Cap/CapHome.aspx?module={module}&TabName=Home"
+    
+    def _related_detail_url(self, detail_url):
+        """Make a related record's relative CapDetail link absolute"""
+        if detail_url and not detail_url.startswith('http'):
+            if detail_url.startswith('../'):
+                detail_url = detail_url.replace('../', '/')
+            detail_url = f"{self.site_url}{detail_url}"
+        return detail_url
+    
+    def _parse_condition_info(self, condition, info_html, info_text):
+        """Fill title, description, status and date of a condition from its info span"""
+        title_match = re.search(r'<div[^>]*font-weight: bold[^>]*>([^<]+)</div>', info_html)
+        if title_match:
+            condition["title"] = title_match.group(1).strip()
+        
+        desc_match = re.search(r'<div[^>]*font-style: italic[^>]*>([^<]+)</div>', info_html)
+        if desc_match:
+            condition["description"] = desc_match.group(1).strip()
+        
+        status_date_match = re.search(r'<div[^>]*>([^<|]+)\|\s*(&nbsp;)?(\d{2}/\d{2}/\d{4})</div>', info_html)
+        if status_date_match:
+            condition["status"] = status_date_match.group(1).strip()
+            condition["date"] = status_date_match.group(3).strip()
+        elif info_text:
+            status_date_text_match = re.search(r'([^|\n]+)\|\s*(\d{2}/\d{2}/\d{4})\s*$', info_text, re.MULTILINE)
+            if status_date_text_match:
+                condition["status"] = status_date_text_match.group(1).strip()
+                condition["date"] = status_date_text_match.group(2).strip()
+        return condition
+    
+    def _parse_application_information(self, full_html):
+        """Parse the application information (ASI) block HTML into {section: {field: value}}"""
+        app_info = {}
+        section_pattern = r'<div class="MoreDetail_ItemTitle[^>]*>([^<]+)</div>'
+        sections = re.split(section_pattern, full_html)
+        current_section = None
+        
+        for i in range(len(sections)):
+            if i == 0:
+                continue
+            
+            if i % 2 == 1:
+                current_section = sections[i].strip()
+                if current_section:
+                    app_info[current_section] = {}
+            else:
+                if current_section and current_section in app_info:
+                    section_html = sections[i]
+                    
+                    standard_labels = re.findall(
+                        r'<div class="MoreDetail_ItemColASI MoreDetail_ItemCol1"[^>]*>.*?<span class="ACA_SmLabelBolder[^>]*>([^<]+)</span>.*?</div>',
+                        section_html, re.DOTALL
+                    )
+                    standard_values = re.findall(
+                        r'<div class="MoreDetail_ItemColASI MoreDetail_ItemCol2">.*?<span class="ACA_SmLabel ACA_SmLabel_FontSize">([^<]+)</span>.*?</div>',
+                        section_html, re.DOTALL
+                    )
+                    
+                    for j, label in enumerate(standard_labels):
+                        if j < len(standard_values):
+                            key = self._clean_label(label)
+                            app_info[current_section][key] = standard_values[j].strip()
+                    
+                    two_column_divs = re.findall(
+                        r'<div class="ACA_FLeft ASIReview2Columns">(.*?)</div>',
+                        section_html, re.DOTALL
+                    )
+                    
+                    for column_div in two_column_divs:
+                        label_match = re.search(r'<span class="ACA_SmLabelBolder"[^>]*>([^<]+)</span>', column_div)
+                        value_match = re.search(r'<span class="ACA_SmLabel">([^<]+)</span>', column_div)
+                        
+                        if label_match and value_match:
+                            key = self._clean_label(label_match.group(1))
+                            app_info[current_section][key] = value_match.group(1).strip()
+        
+        return app_info
+    
+    def _parse_licensed_professional(self, full_text, phones):
+        """Parse one licensed professional from its info cell text and [(row_text, phone)] pairs"""
+        all_lines = [line.strip() for line in full_text.split('\n') if line.strip()]
+        lines = [line for line in all_lines if line not in ["Primary Phone:", "Fax:", "Alternate Phone:"]]
+        
+        if len(lines) < 2:
+            return None
+        
+        professional = {}
+        professional["name"] = lines[0] if len(lines) > 0 else None
+        professional["business_name"] = lines[1] if len(lines) > 1 else None
+        
+        address_parts = []
+        if len(lines) > 2:
+            address_parts.append(lines[2])
+        if len(lines) > 3:
+            address_parts.append(lines[3])
+        
+        professional["address"] = ", ".join(address_parts) if address_parts else None
+        
+        primary_phone = None
+        alternate_phone = None
+        fax = None
+        
+        for row_text, phone_value in phones:
+            if "Primary Phone:" in row_text:
+                primary_phone = phone_value.strip()
+            elif "Alternate Phone:" in row_text:
+                alternate_phone = phone_value.strip()
+            elif "Fax:" in row_text:
+                fax = phone_value.strip()
+        
+        professional["primary_phone"] = primary_phone
+        professional["alternate_phone"] = alternate_phone
+        professional["fax"] = fax
+        
+        license_info = None
+        license_pattern = r'\b[A-Z]{2,4}\d{5,}\b'
+        
+        for line in lines:
+            if line == professional.get("name") or line == professional.get("business_name"):
+                continue
+            if re.search(r',\s*[A-Z]{2},?\s*\d{5}', line):
+                continue
+            if re.search(license_pattern, line):
+                license_info = line.strip()
+                break
+        
+        if not license_info:
+            for line in lines:
+                line_upper = line.upper()
+                if line == professional.get("business_name"):
+                    continue
+                if ('CERTIFIED' in line_upper or 'LICENSE' in line_upper or 'PRIVATE PROVIDER' in line_upper) and \
+                   ('CONTRACTOR' in line_upper or 'CNTR' in line_upper or 'PP' in line_upper or 'PROVIDER' in line_upper):
+                    license_info = line.strip()
+                    break
+        
+        professional["license"] = license_info
+        
+        if professional.get("name") or professional.get("business_name"):
+            return professional
+        return None
+    
+    def _parse_work_location(self, row_texts):
+        """Group work location table rows into locations ('1) ...' starts a new one)"""
+        locations = []
+        current_location = []
+        
+        for row_text in row_texts:
+            row_text = row_text.strip()
+            
+            if not row_text:
+                continue
+                
+            if '<<Hide Additional Locations' in row_text or '>>Show Additional Locations' in row_text:
+                continue
+            
+            if re.match(r'^\d+\)', row_text):
+                if current_location:
+                    location_str = ", ".join(current_location).replace('*', '').strip()
+                    if location_str:
+                        locations.append(location_str)
+                current_location = [re.sub(r'^\d+\)\s*', '', row_text)]
+            else:
+                if row_text:
+                    current_location.append(row_text)
+        
+        if current_location:
+            location_str = ", ".join(current_location).replace('*', '').strip()
+            if location_str:
+                locations.append(location_str)
+        
+        if len(locations) == 0:
+            return None
+        elif len(locations) == 1:
+            return locations[0]
+        else:
+            return {
+                "primary_location": locations[0],
+                "additional_locations": locations[1:]
+            }
         
     async def search_permits(self, page, start_date, end_date):
         logger.info(f"Searching permits {start_date} to {end_date}")
+        with self.metrics.stage("search"):
+            return await self._search_permits(page, start_date, end_date)
+    
+    async def _search_permits(self, page, start_date, end_date):
+        
+        start_date_field = self.selectors["start_date"]
+        end_date_field = self.selectors["end_date"]
         
         await page.goto(self.base_url, wait_until="domcontentloaded")
-        await page.wait_for_timeout(2000)
+        await self.waits.selector(page, start_date_field, "search.form_ready", replaced_ms=2000)
         
-        start_date_field = "input[name='ctl00$PlaceHolderMain$generalSearchForm$txtGSStartDate']"
-        await page.focus(start_date_field)
-        await page.wait_for_timeout(200)
-        await page.keyboard.press("Control+A")
-        await page.wait_for_timeout(200)
-        await page.keyboard.press("Delete")
-        await page.wait_for_timeout(200)
-        await page.type(start_date_field, start_date, delay=100)
-        await page.wait_for_timeout(2000)
+        await self._type_date(page, start_date_field, start_date)
+        await self._type_date(page, end_date_field, end_date)
         
-        end_date_field = "input[name='ctl00$PlaceHolderMain$generalSearchForm$txtGSEndDate']"
-        await page.focus(end_date_field)
-        await page.wait_for_timeout(200)
+        search_button = self.selectors["search_button"]
+        await self.waits.postback(page, lambda: page.click(search_button), "search.results", replaced_ms=5000)
+        
+        if await self.waits.selector(page, self.selectors["results_grid"], "search.grid", timeout=3000):
+            return True
+        logger.info(f"No results found for {start_date} to {end_date}")
+        return False
+    
+    async def _type_date(self, page, field, value):
+        """Replace a date field's value, waiting until the input actually holds it"""
+        await page.focus(field)
         await page.keyboard.press("Control+A")
-        await page.wait_for_timeout(200)
         await page.keyboard.press("Delete")
-        await page.wait_for_timeout(200)
-        await page.type(end_date_field, end_date, delay=100)
-        await page.wait_for_timeout(2000)
-        
-        search_button = "a#ctl00_PlaceHolderMain_btnNewSearch"
-        await page.click(search_button)
-        await page.wait_for_timeout(5000)
+        await page.type(field, value, delay=100)
+        await self.waits.function(
+            page, "([field, value]) => document.querySelector(field)?.value === value",
+            "search.date_entered", arg=[field, value], replaced_ms=2600, timeout=3000
+        )
+    
+    @staticmethod
+    def normalize_sections(sections):
+        """Validate a section selection, returned in DETAIL_SECTIONS order (None = all)"""
+        if sections is None:
+            return None
+        if isinstance(sections, str):
+            sections = [section.strip() for section in sections.split(",") if section.strip()]
+        unknown = [section for section in sections if section not in DETAIL_SECTIONS]
+        if unknown:
+            raise ValueError(f"sections must be taken from {list(DETAIL_SECTIONS)}, got {unknown!r}")
+        return tuple(section for section in DETAIL_SECTIONS if section in sections)
+    
+    def wants_section(self, section):
+        return self.sections is None or section in self.sections
+    
+    def _split_date_range(self, start_date, end_date, shard_by):
+        """Split an mm/dd/yyyy date range into consecutive day or week sub-ranges"""
+        start = datetime.strptime(start_date, "%m/%d/%Y")
+        end = datetime.strptime(end_date, "%m/%d/%Y")
+        step = timedelta(days=7 if shard_by == "week" else 1)
         
-        try:
-            await page.wait_for_selector("table.ACA_GridView", timeout=5000)
-        except:
-            logger.info("No results found")
-            return
+        shards = []
+        shard_start = start
+        while shard_start <= end:
+            shard_end = min(shard_start + step - timedelta(days=1), end)
+            shards.append((shard_start.strftime("%m/%d/%Y"), shard_end.strftime("%m/%d/%Y")))
+            shard_start = shard_end + timedelta(days=1)
+        return shards
+    
+    def _range_key(self, start_date, end_date):
+        return f"{start_date}-{end_date}"
     
     async def extract_search_table_data(self, row):
         try:
@@ -242,7 +1471,7 @@ class LeeCountyPermitScraper:
                     search_data["record_number"] = (await record_link.inner_text()).strip()
                     detail_url = await record_link.get_attribute("href")
                     if detail_url and not detail_url.startswith('http'):
-                        detail_url = f"https://aca-prod.accela.com{detail_url}"
+                        detail_url = f"{self.host}{detail_url}"
                     search_data["detail_url"] = detail_url
                 else:
                     record_span = await row.query_selector("span[id*='lblPermitNumber']")
@@ -298,14 +1527,36 @@ class LeeCountyPermitScraper:
             logger.debug(f"Error extracting search table data: {str(e)}")
             return {}
     
-    async def extract_single_permit_details(self, context, search_data, record_number):
+    async def extract_search_rows(self, page):
+        """Extract every results row in a single page.evaluate round trip (same keys as extract_search_table_data)"""
+        try:
+            return await page.evaluate(SEARCH_ROWS_JS, self.host)
+        except Exception as e:
+            logger.warning(f"Bulk row extraction failed, falling back to per-row extraction: {str(e)}")
+            rows = await page.query_selector_all("table.ACA_GridView tr.ACA_TabRow_Odd, table.ACA_GridView tr.ACA_TabRow_Even")
+            return [await self.extract_search_table_data(row) for row in rows]
+    
+    async def extract_single_permit_details(self, context, search_data, record_number, fresh_page=False):
+        """Search row merged with the permit's details; extraction_status is "partial" (with extraction_error) on failure"""
         async with self.semaphore:
-            detail_page = await context.new_page()
+            self.metrics.permit_started()
+            started = time.perf_counter()
+            details = None
+            detail_page = None
             try:
                 detail_url = search_data["detail_url"]
                 logger.info(f"[Concurrent] Extracting: {record_number}")
                 
-                details = await self.extract_permit_details(detail_page, detail_url, record_number)
+                if self.http_fast_path and not self._wants_tabs():
+                    # A plain GET needs no browser page, one is only taken when it fails
+                    details = await self._fetch_permit_details_http(context, detail_url, record_number)
+                if details is None:
+                    if self.page_pool and not fresh_page:
+                        detail_page = await self.page_pool.acquire()
+                    else:
+                        detail_page = await self._open_page(context)
+                    self._track_permit_resources(detail_page, record_number)
+                    details = await self._extract_permit_details(detail_page, detail_url, record_number)
                 permit_data = {**search_data}
                 
                 if details:
@@ -322,33 +1573,71 @@ class LeeCountyPermitScraper:
                             permit_data["record_status"] = value
                         else:
                             permit_data[key] = value
+                if permit_data.get("failed_sections"):
+                    # Retried like a failed page; saved with the sections that were read if the retries run out
+                    permit_data["extraction_status"] = "partial"
+                    permit_data["extraction_error"] = f"sections failed: {', '.join(permit_data['failed_sections'])}"
+                    logger.warning(f"[Concurrent] Incomplete: {record_number} ({permit_data['extraction_error']})")
+                    return permit_data
+                permit_data["extraction_status"] = "complete"
                 
                 logger.info(f"[Concurrent] ✓ Completed: {record_number}")
                 return permit_data
             except Exception as e:
                 logger.error(f"[Concurrent] Error {record_number}: {str(e)}")
-                return search_data
+                return {**search_data, "extraction_status": "partial", "extraction_error": str(e) or type(e).__name__}
             finally:
-                await detail_page.close()
+                if detail_page is not None:
+                    self._finish_permit_resources(detail_page, record_number)
+                self.metrics.permit_finished()
+                self.metrics.lap("detail.total", started)
+                if isinstance(self.semaphore, AdaptiveConcurrency):
+                    succeeded = details is not None and not details.get("failed_sections")
+                    if self.semaphore.report(time.perf_counter() - started, succeeded):
+                        self.metrics.set_limit(self.semaphore.limit)
+                if detail_page is None:
+                    pass
+                elif self.page_pool and not fresh_page:
+                    await self.page_pool.release(detail_page)
+                else:
+                    await detail_page.close()
     
-    async def scrape_permits_page_by_page(self, page, extract_details=False):
+    async def scrape_permits_page_by_page(self, page, extract_details=False, range_key=None):
         page_number = 1
         total_permits_processed = 0
-        processed_permit_ids = set()
+        processed_permit_ids = self.processed_permit_ids
         
-        if self.semaphore is None:
-            self.semaphore = Semaphore(self.max_concurrent)
+        # Page position is tracked per search so sharded runs resume each shard separately
+        if range_key is None:
+            range_key = self._range_key(*self.search_range) if self.search_range else "search"
+        last_completed_page = self.last_completed_pages.get(range_key, 0)
         
-        while True:
+        self._ensure_semaphore()
+        
+        # Standalone use: run a detail pipeline just for this search
+        owns_workers = extract_details and self.detail_queue is None
+        if owns_workers:
+            self.start_detail_workers(page.context)
+        
+        # Every permit of a completed page is saved, so jump past those pages without reading their rows
+        while page_number <= last_completed_page and not self.should_stop:
+            logger.info(f"Pages {page_number}-{last_completed_page} already completed in checkpoint, skipping")
+            next_page_number = await self._goto_page(page, page_number, last_completed_page + 1)
+            if next_page_number is None:
+                break
+            page_number = next_page_number
+        
+        while page_number > last_completed_page:
             if self.should_stop:
                 logger.info("Stop requested, terminating scrape...")
                 break
             logger.info(f"Processing page {page_number}")
+            page_started = started = time.perf_counter()
             
-            await page.wait_for_selector("table.ACA_GridView", timeout=10000)
-            await page.wait_for_timeout(1000)
+            await self.waits.selector(page, "table.ACA_GridView", "page.grid", replaced_ms=1000, timeout=10000, required=True)
             
-            rows = await page.query_selector_all("table.ACA_GridView tr.ACA_TabRow_Odd, table.ACA_GridView tr.ACA_TabRow_Even")
+            rows = await self.extract_search_rows(page)
+            started = self.metrics.lap("page.rows", started)
             
             if not rows:
                 logger.warning(f"No rows found on page {page_number}")
@@ -357,10 +1646,8 @@ class LeeCountyPermitScraper:
             logger.info(f"Found {len(rows)} permits on page {page_number}")
             
             page_permits = []
-            for i, row in enumerate(rows, 1):
+            for i, search_data in enumerate(rows, 1):
                 try:
-                    search_data = await self.extract_search_table_data(row)
-                    
                     if not search_data or not search_data.get("record_number"):
                         continue
                     
@@ -378,126 +1665,525 @@ class LeeCountyPermitScraper:
                     logger.error(f"Error processing row {i}: {str(e)}")
                     continue
             
-            if extract_details and page_permits:
-                context = page.context
-                tasks = []
-                
+            if page_permits:
                 for search_data, record_number in page_permits:
-                    if search_data.get("detail_url"):
-                        task = self.extract_single_permit_details(context, search_data, record_number)
-                        tasks.append(task)
-                    else:
-                        tasks.append(asyncio.create_task(asyncio.sleep(0, result=search_data)))
-                
-                logger.info(f"Processing {len(tasks)} permits concurrently (max {self.max_concurrent})")
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                    self.pending_permits[record_number] = search_data
+                    self.pending_pages[record_number] = (range_key, page_number)
                 
-                for result in results:
-                    if isinstance(result, Exception):
-                        logger.error(f"Task failed: {result}")
-                        continue
-                    if result:
-                        self.all_permits.append(result)
-                
-                self.save_to_json()
-                logger.info(f"Completed page {page_number}")
-            elif page_permits:
-                for search_data, _ in page_permits:
-                    self.all_permits.append(search_data)
-                self.save_to_json()
-            
-            # Check if there's a next button (as clickable link, not disabled span)
-            next_button = await page.query_selector("td.aca_pagination_PrevNext a:has-text('Next')")
-            
-            if not next_button:
-                logger.info(f"Reached last page (page {page_number}) - Next button is disabled")
-                break
+                if extract_details:
+                    # Blocks only while the queue is full, so the listing keeps moving as details finish
+                    for item in page_permits:
+                        stored_permit = self._carry_forward(*item)
+                        if stored_permit is not None:
+                            self.complete_permit(stored_permit, item[1])
+                        else:
+                            await self.detail_queue.put(item)
+                    logger.info(f"Queued page {page_number} for details ({self.detail_queue.qsize()} waiting)")
+                    started = self.metrics.lap("page.queue", started)
+                else:
+                    for search_data, record_number in page_permits:
+                        self.complete_permit(search_data, record_number)
             
-            logger.info(f"Moving to page {page_number + 1}")
+            self.listed_pages[range_key] = page_number
+            if not self.stream_output and not self.permit_store:
+                self.save_to_json()
+            self.save_checkpoint()
+            started = self.metrics.lap("page.save", started)
             
-            try:
-                # Use JavaScript click to trigger the ASP.NET postback
-                await page.evaluate("""
-                    () => {
-                        const nextBtn = Array.from(document.querySelectorAll("td.aca_pagination_PrevNext a"))
-                            .find(a => a.textContent.includes('Next'));
-                        if (nextBtn) nextBtn.click();
-                    }
-                """)
-                
-                # Wait for the postback to start
-                await page.wait_for_timeout(500)
-                
-                # Wait for loading mask to disappear
-                try:
-                    await page.wait_for_function(
-                        """
-                        () => {
-                            const mask = document.querySelector('div#divGlobalLoadingMask');
-                            return !mask || mask.classList.contains('ACA_Hide');
-                        }
-                        """,
-                        timeout=15000
-                    )
-                except Exception as e:
-                    logger.warning(f"Loading mask timeout: {e}")
-                
-                # Wait for page number to update
-                next_page_number = page_number + 1
-                try:
-                    await page.wait_for_function(
-                        f"""
-                        () => {{
-                            const selectedBtn = document.querySelector('span.SelectedPageButton');
-                            return selectedBtn && selectedBtn.textContent.trim() === '{next_page_number}';
-                        }}
-                        """,
-                        timeout=10000
-                    )
-                    logger.info(f"✓ Successfully navigated to page {next_page_number}")
-                except Exception as e:
-                    logger.warning(f"Page number didn't update to {next_page_number}: {e}")
-                    # Try one more wait
-                    await page.wait_for_timeout(2000)
-                
-                # Additional stabilization wait
-                await page.wait_for_timeout(1500)
-                
-                page_number += 1
-                
-            except Exception as e:
-                logger.error(f"Error during pagination: {str(e)}")
+            next_page_number = await self._goto_page(page, page_number, page_number + 1)
+            self.metrics.lap("page.next", started)
+            self.metrics.lap("page.total", page_started)
+            if next_page_number is None:
                 break
+            page_number = next_page_number
+        
+        if owns_workers:
+            await self.finish_detail_workers()
+            await self.retry_failed_permits(page.context)
+            self.save_checkpoint()
         
         logger.info(f"Scraping complete! Total permits: {total_permits_processed} across {page_number} pages")
     
-    async def navigate_to_tab(self, page, tab_name, parent_menu=None):
+    async def _goto_page(self, page, page_number, target):
+        """Move the results grid towards page target, returns the page now shown (None after the last page)"""
+        # Only a clickable Next link (not the disabled span) means there are more pages
+        if not await page.query_selector("td.aca_pagination_PrevNext a:has-text('Next')"):
+            logger.info(f"Reached last page (page {page_number}) - Next button is disabled")
+            return None
+        
+        clicked = {}
+        
+        async def click():
+            clicked["page"] = await page.evaluate(PAGER_CLICK_JS, [page_number, target])
+        
         try:
-            if parent_menu:
-                parent_selector = f'a.par-menu[data-label*="{parent_menu.lower().replace(" ", "")}"], a.par-menu:has-text("{parent_menu}")'
-                try:
-                    await page.click(parent_selector, timeout=3000)
-                    await page.wait_for_timeout(500)
-                except:
-                    pass
-            
-            tab_selector = f'a[data-control="tab-{tab_name}"]'
-            tab_element = await page.query_selector(tab_selector)
-            if not tab_element:
-                return False
+            # JavaScript click triggers the ASP.NET postback, then wait for its response and the loading mask
+            if not await self.waits.postback(page, click, "page.next", replaced_ms=2000):
+                logger.warning("Postback for the next page did not finish in time")
+            if clicked.get("page") is None:
+                logger.warning(f"No pager link found on page {page_number}")
+                return None
+            next_page_number = page_number + 1 if clicked["page"] == -1 else clicked["page"]
+            logger.info(f"Moving to page {next_page_number}")
+            
+            # Wait for page number to update
+            if await self.waits.function(page, """
+                (expected) => {
+                    const selectedBtn = document.querySelector('span.SelectedPageButton');
+                    return selectedBtn && selectedBtn.textContent.trim() === expected;
+                }
+            """, "page.number", arg=str(next_page_number), replaced_ms=1500):
+                logger.info(f"✓ Successfully navigated to page {next_page_number}")
+            else:
+                logger.warning(f"Page number didn't update to {next_page_number}")
+                # Try one more wait
+                await page.wait_for_timeout(2000)
+            return next_page_number
+        except Exception as e:
+            logger.error(f"Error during pagination: {str(e)}")
+            return None
+    
+    async def scrape_sharded(self, start_date, end_date, extract_details=False):
+        """Run one search per day/week shard in parallel pages and merge the results"""
+        shards = self._split_date_range(start_date, end_date, self.shard_by)
+        remaining = [shard for shard in shards if self._range_key(*shard) not in self.completed_shards]
+        
+        self._ensure_semaphore()
+        self.search_semaphore = Semaphore(self.max_concurrent_searches)
+        
+        logger.info(f"Split {start_date} to {end_date} into {len(shards)} {self.shard_by} shards "
+                    f"({len(remaining)} remaining, max {self.max_concurrent_searches} searches at once)")
+        
+        results = await asyncio.gather(
+            *(self._scrape_shard(shard_start, shard_end, extract_details) for shard_start, shard_end in remaining),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Shard failed: {result}")
+    
+    async def _scrape_shard(self, start_date, end_date, extract_details):
+        async with self.search_semaphore:
+            if self.should_stop:
+                return
             
-            await page.click(tab_selector)
-            await page.wait_for_timeout(1000)
+            range_key = self._range_key(start_date, end_date)
+            shard_page = await self._open_page(self.context)
+            try:
+                if await self.search_permits(shard_page, start_date, end_date):
+                    await self.scrape_permits_page_by_page(shard_page, extract_details, range_key)
+                
+                if not self.should_stop:
+                    # Permits are de-duplicated by record_number across shards via processed_permit_ids
+                    self.completed_shards.add(range_key)
+                    self.save_checkpoint()
+                    logger.info(f"✓ Shard {start_date} to {end_date} done")
+            except Exception as e:
+                logger.error(f"Error in shard {start_date} to {end_date}: {str(e)}")
+            finally:
+                await shard_page.close()
+    
+    def _ensure_semaphore(self):
+        """Create the permit concurrency limit (fixed or adaptive) on first use"""
+        if self.semaphore is not None:
+            return
+        if self.adaptive_concurrency:
+            self.semaphore = AdaptiveConcurrency(
+                self.max_concurrent, min_limit=self.min_concurrent, max_limit=self.max_concurrent_limit,
+                latency_target_s=self.latency_target_s
+            )
+            logger.info(f"Adaptive concurrency: starting at {self.semaphore.limit}, "
+                        f"bounds {self.min_concurrent}-{self.max_concurrent_limit}")
+            self.metrics.set_limit(self.semaphore.limit)
+        else:
+            self.semaphore = Semaphore(self.max_concurrent)
+            self.metrics.set_limit(self.max_concurrent)
+    
+    def _max_workers(self):
+        return self.semaphore.max_limit if isinstance(self.semaphore, AdaptiveConcurrency) else self.max_concurrent
+    
+    async def _try_acquire_slot(self):
+        """Take a permit concurrency slot without waiting, False when none is free"""
+        if isinstance(self.semaphore, AdaptiveConcurrency):
+            return self.semaphore.try_acquire()
+        if self.semaphore is not None and not self.semaphore.locked():
+            await self.semaphore.acquire()
             return True
-        except:
+        return False
+    
+    def start_detail_workers(self, context):
+        """Start a fixed set of detail workers draining a bounded queue"""
+        self._ensure_semaphore()
+        # Enough workers and pages for the highest limit the controller may reach
+        max_workers = self._max_workers()
+        self.detail_queue = asyncio.Queue(maxsize=max_workers * 2)
+        # Parallel tabs can use a sibling page per extra tab group; pages are only opened when used
+        pages_per_permit = len(DETAIL_TAB_GROUPS) if self.parallel_tabs else 1
+        self.page_pool = DetailPagePool(
+            context, max_workers * pages_per_permit,
+            max_uses=self.detail_page_max_uses, max_heap_mb=self.detail_page_max_heap_mb,
+            open_page=lambda: self._open_page(context)
+        )
+        self.detail_workers = [
+            asyncio.create_task(self._detail_worker(context, worker_id))
+            for worker_id in range(1, max_workers + 1)
+        ]
+        logger.info(f"Started {len(self.detail_workers)} detail workers")
+    
+    async def finish_detail_workers(self):
+        """Wait until every queued permit is done, then stop the workers"""
+        if self.detail_queue is None:
+            return
+        while True:
+            # Related records still waiting for room; the workers keep feeding the rest as they go
+            self._feed_related()
+            await self.detail_queue.join()
+            # join() returns once the count hit 0, even if a worker queued more right after
+            if self.should_stop or (self.detail_queue.empty() and not self.related_overflow):
+                break
+        await self.stop_detail_workers()
+    
+    async def stop_detail_workers(self):
+        for worker in self.detail_workers:
+            worker.cancel()
+        await asyncio.gather(*self.detail_workers, return_exceptions=True)
+        self.detail_workers = []
+        self.detail_queue = None
+        
+        if self.page_pool:
+            logger.info(f"Detail page pool: {self.page_pool.created} pages opened, {self.page_pool.recycled} recycled")
+            await self.page_pool.close()
+            self.page_pool = None
+    
+    async def _detail_worker(self, context, worker_id):
+        while True:
+            search_data, record_number = await self.detail_queue.get()
+            try:
+                # After a stop, leave the rest pending in the checkpoint
+                if self.should_stop:
+                    continue
+                
+                if search_data.get("detail_url"):
+                    permit_data = await self.extract_single_permit_details(context, search_data, record_number)
+                    if permit_data["extraction_status"] == "partial":
+                        # Not written yet: it stays pending until a retry succeeds or the retries run out
+                        self.retry_queue.append((search_data, record_number, permit_data))
+                        continue
+                    if self.permit_index:
+                        self._index_permit(search_data, permit_data, record_number)
+                else:
+                    permit_data = search_data
+                
+                self.complete_permit(permit_data, record_number)
+            except Exception as e:
+                logger.error(f"[Worker {worker_id}] Task failed for {record_number}: {str(e)}")
+            finally:
+                # Refill before task_done, so join() can't see an empty queue with related records still waiting
+                self._feed_related()
+                self.detail_queue.task_done()
+    
+    async def retry_failed_permits(self, context):
+        """Retry permits whose extraction failed on a fresh page, with exponential backoff between rounds"""
+        recovered = 0
+        for attempt in range(1, self.max_retries + 1):
+            if not self.retry_queue or self.should_stop:
+                break
+            delay = self.retry_base_delay * 2 ** (attempt - 1)
+            logger.info(f"Retrying {len(self.retry_queue)} failed permits in {delay:.0f} s "
+                        f"(attempt {attempt}/{self.max_retries})")
+            await asyncio.sleep(delay)
+            
+            retries, self.retry_queue = self.retry_queue, []
+            results = await asyncio.gather(*(
+                self.extract_single_permit_details(context, search_data, record_number, fresh_page=True)
+                for search_data, record_number, _ in retries
+            ))
+            for (search_data, record_number, _), permit_data in zip(retries, results):
+                if permit_data["extraction_status"] == "partial":
+                    self.retry_queue.append((search_data, record_number, permit_data))
+                    continue
+                recovered += 1
+                if self.permit_index:
+                    self._index_permit(search_data, permit_data, record_number)
+                self.complete_permit(permit_data, record_number)
+        
+        if self.should_stop:
+            # Still pending in the checkpoint, a resumed run retries them
+            return
+        for search_data, record_number, partial_permit in self.retry_queue:
+            logger.warning(f"Giving up on details for {record_number} after {self.max_retries} retries: "
+                           f"{partial_permit['extraction_error']}")
+            self.complete_permit(partial_permit, record_number)
+        if recovered or self.retry_queue:
+            logger.info(f"Retries: {recovered} permits recovered, {len(self.retry_queue)} saved as partial")
+        self.retry_queue = []
+    
+    def _sections_key(self):
+        return ",".join(self.sections) if self.sections is not None else "all"
+    
+    def _carry_forward(self, search_data, record_number):
+        """Stored permit with the current search row applied, or None when the details must be extracted"""
+        if not self.permit_index:
+            return None
+        entry = self.permit_index.lookup(record_number)
+        if entry is None:
+            self.recrawl_stats["new"] += 1
+            return None
+        if entry["row_fingerprint"] != row_fingerprint(search_data) or entry["sections"] != self._sections_key():
+            self.recrawl_stats["changed"] += 1
+            return None
+        
+        self.recrawl_stats["unchanged"] += 1
+        permit_data = entry["details"]
+        for key, value in search_data.items():
+            if value is not None or key not in permit_data:
+                permit_data[key] = value
+        logger.info(f"Unchanged since last run, reusing details: {record_number}")
+        return permit_data
+    
+    def _index_permit(self, search_data, permit_data, record_number):
+        details = {key: value for key, value in permit_data.items() if key not in search_data}
+        if self.permit_index.update(record_number, row_fingerprint(search_data), self._sections_key(), permit_data, details):
+            self.recrawl_stats["details_changed"] += 1
+    
+    def complete_permit(self, permit_data, record_number):
+        """Save one finished permit and mark it completed"""
+        if self.keep_permits:
+            self.all_permits.append(permit_data)
+        self.permit_count += 1
+        if self.permit_store:
+            self.permit_store.add(permit_data)
+        elif self.stream_output:
+            self.append_to_stream([permit_data])
+        
+        self.pending_permits.pop(record_number, None)
+        self.pending_pages.pop(record_number, None)
+        self.completed_permit_ids.add(record_number)
+        if record_number:
+            self.unlogged_completions.append(record_number)
+        self.contact_cache.remember(permit_data)
+        self.metrics.permits_completed += 1
+        if self.on_permit:
+            self.on_permit(permit_data)
+        if permit_data.get("related_records_detail"):
+            self._record_related(permit_data, record_number)
+    
+    def _record_related(self, permit_data, record_number):
+        """Append the permit's related records to the edge list and, when crawling, queue the unseen ones"""
+        depth = permit_data.get("related_depth", 0)
+        related_records = [record for record in permit_data["related_records_detail"] if record.get("related_record_number")]
+        try:
+            write_header = not self.related_edges_file.exists() or self.related_edges_file.stat().st_size == 0
+            with open(self.related_edges_file, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                if write_header:
+                    writer.writerow(["record_number", "related_record_number", "related_record_type",
+                                     "related_project_name", "related_date", "depth"])
+                for record in related_records:
+                    writer.writerow([record_number, record["related_record_number"], record.get("related_record_type"),
+                                     record.get("related_project_name"), record.get("related_date"), depth])
+        except Exception as e:
+            logger.error(f"Error writing related edges: {str(e)}")
+        
+        if not self.follow_related or depth >= self.related_max_depth:
+            return
+        for record in related_records:
+            related_number = record["related_record_number"]
+            # processed_permit_ids is the visited set shared with every search, so nothing is fetched twice
+            if related_number in self.processed_permit_ids or not record.get("related_detail_url"):
+                continue
+            self.processed_permit_ids.add(related_number)
+            search_data = {
+                "record_number": related_number,
+                "permit_type": record.get("related_record_type"),
+                "description": record.get("related_project_name"),
+                "detail_url": record["related_detail_url"],
+                "related_depth": depth + 1,
+                "related_from": record_number,
+            }
+            self.pending_permits[related_number] = search_data
+            self.related_overflow.append((search_data, related_number))
+        self._feed_related()
+    
+    def _feed_related(self):
+        """Move queued related records into the detail queue while it has room (never blocks a worker)"""
+        while self.related_overflow and self.detail_queue is not None and not self.detail_queue.full():
+            self.detail_queue.put_nowait(self.related_overflow.pop(0))
+    
+    async def setup_resource_blocking(self, context):
+        """Abort non-essential requests on every page of the context and count what was saved"""
+        if self.resource_profile != "none":
+            await context.route("**/*", self._route_request)
+        logger.info(f"Resource blocking profile: {self.resource_profile} "
+                    f"({', '.join(sorted(self.blocked_resource_types)) or 'nothing blocked'})")
+    
+    async def teardown_resource_blocking(self, context):
+        """Remove the route again, for contexts that outlive this scraper"""
+        try:
+            if self.resource_profile != "none":
+                await context.unroute("**/*", self._route_request)
+        except Exception as e:
+            logger.debug(f"Error removing resource blocking: {str(e)}")
+    
+    async def _open_page(self, context):
+        """New page in the context, remembered as this scraper's for request ownership"""
+        page = await context.new_page()
+        self.owned_pages.add(page)
+        page.on("close", lambda closed_page: self.owned_pages.discard(closed_page))
+        return page
+    
+    def _owns_request(self, request):
+        """In a context shared with other scrapers (other agencies or jobs), only requests of pages we opened are ours"""
+        if not self.shared_context:
+            return True
+        try:
+            return request.frame.page in self.owned_pages
+        except Exception:
             return False
     
+    def _permit_resources_for(self, request):
+        """Resource counters of the permit whose detail page made this request, if any"""
+        try:
+            record_number = self.page_permits.get(request.frame.page)
+        except Exception:
+            return None
+        return self.permit_resources.get(record_number) if record_number else None
+    
+    async def _route_request(self, route):
+        request = route.request
+        if not self._owns_request(request):
+            # Leave it to the route of the agency it belongs to
+            await route.fallback()
+            return
+        url = request.url.lower()
+        if request.resource_type in self.blocked_resource_types or any(pattern in url for pattern in BLOCKED_URL_PATTERNS):
+            # Counted here, never measured: aborted requests have no response to size
+            size = BLOCKED_BYTES_ESTIMATE.get(request.resource_type, BLOCKED_BYTES_ESTIMATE["other"])
+            self.resource_stats["blocked_requests"] += 1
+            self.resource_stats["bytes_saved"] += size
+            by_type = self.resource_stats["blocked_by_type"]
+            by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+            permit_resources = self._permit_resources_for(request)
+            if permit_resources is not None:
+                permit_resources["blocked"] += 1
+                permit_resources["bytes_saved"] += size
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _track_permit_resources(self, page, record_number):
+        self.page_permits[page] = record_number
+        self.permit_resources[record_number] = {"blocked": 0, "bytes_saved": 0}
+    
+    def _finish_permit_resources(self, page, record_number):
+        self.page_permits.pop(page, None)
+        permit_resources = self.permit_resources.pop(record_number, None)
+        if permit_resources is None:
+            return
+        stats = self.resource_stats
+        stats["permits_measured"] += 1
+        stats["permit_blocked_requests"] += permit_resources["blocked"]
+        stats["permit_bytes_saved"] += permit_resources["bytes_saved"]
+        logger.debug(f"{record_number}: blocked {permit_resources['blocked']} requests "
+                     f"(~{permit_resources['bytes_saved'] / 1024:.0f} KB saved)")
+    
+    def resource_report(self):
+        """Blocked requests and estimated bytes saved, in total and per permit, for run_metrics.json"""
+        stats = self.resource_stats
+        permits = stats["permits_measured"]
+        return {
+            "profile": self.resource_profile,
+            "blocked_requests": stats["blocked_requests"],
+            "blocked_by_type": dict(sorted(stats["blocked_by_type"].items())),
+            "estimated_bytes_saved": stats["bytes_saved"],
+            "permits_measured": permits,
+            "blocked_requests_per_permit": round(stats["permit_blocked_requests"] / permits, 1) if permits else None,
+            "estimated_bytes_saved_per_permit": round(stats["permit_bytes_saved"] / permits) if permits else None,
+        }
+    
+    def log_resource_summary(self):
+        stats = self.resource_stats
+        by_type = ", ".join(f"{resource_type}: {count}" for resource_type, count in sorted(stats["blocked_by_type"].items()))
+        logger.info(f"Resources ({self.resource_profile}): blocked {stats['blocked_requests']} requests"
+                    f"{f' ({by_type})' if by_type else ''}, ~{stats['bytes_saved'] / 1048576:.1f} MB saved")
+        if stats["permits_measured"]:
+            permits = stats["permits_measured"]
+            logger.info(f"Per permit: blocked {stats['permit_blocked_requests'] / permits:.1f} requests, "
+                        f"~{stats['permit_bytes_saved'] / permits / 1024:.0f} KB saved")
+    
+    async def navigate_to_tab(self, page, tab_name, parent_menu=None):
+        """Open a detail tab: False when the permit has no such tab, raises when the tab doesn't load"""
+        if parent_menu:
+            parent_selector = f'a.par-menu[data-label*="{parent_menu.lower().replace(" ", "")}"], a.par-menu:has-text("{parent_menu}")'
+            try:
+                await page.click(parent_selector, timeout=3000)
+            except:
+                pass
+        
+        tab_selector = f'a[data-control="tab-{tab_name}"]'
+        if parent_menu:
+            # The tab link shows up once the parent menu has opened
+            await self.waits.selector(page, tab_selector, "permit.tab_menu", replaced_ms=500, state="attached", timeout=3000)
+        tab_element = await page.query_selector(tab_selector)
+        if not tab_element:
+            return False
+        
+        # The click posts back; wait for that response and the loading mask, not just a mask that isn't up yet
+        await self.waits.postback(page, lambda: page.click(tab_selector), "permit.tab_postback", replaced_ms=1000)
+        if tab_name in TAB_READY_SELECTORS:
+            # The containers are in the page before the tab loads, only a visible one has its content
+            await self.waits.selector(page, TAB_READY_SELECTORS[tab_name], "permit.tab_ready", timeout=5000, required=True)
+        return True
+    
+    async def extract_summary(self, page):
+        """Header, work location, applicant, licensed professional and project description, element by element"""
+        permit_data = {}
+        
+        try:
+            permit_data["record_number"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblPermitNumber")
+        except:
+            permit_data["record_number"] = None
+        
+        try:
+            permit_data["permit_type"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblPermitType")
+        except:
+            permit_data["permit_type"] = None
+        
+        try:
+            permit_data["record_status"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblRecordStatus")
+        except:
+            permit_data["record_status"] = None
+        
+        permit_data["work_location"] = await self.extract_work_location(page)
+        permit_data["applicant"] = await self.extract_applicant_info(page)
+        permit_data["licensed_professional"] = await self.extract_licensed_professional_info(page)
+        permit_data["project_description"] = await self.extract_project_description(page)
+        return permit_data
+    
+    async def extract_more_details(self, page):
+        """Related contacts and application information (fields and tables), element by element"""
+        more_details = {}
+        
+        related_contacts = await self.extract_related_contacts(page)
+        if related_contacts:
+            more_details["related_contacts"] = {"contact_information": related_contacts}
+        
+        app_info = await self.extract_application_information(page)
+        if app_info:
+            more_details["application_information"] = app_info
+        
+        app_info_table = await self.extract_application_information_table(page)
+        if app_info_table:
+            more_details["application_information_table"] = app_info_table
+        
+        return more_details
+    
     async def expand_more_details(self, page):
         try:
             more_details_link = await page.query_selector("a#lnkMoreDetail")
             if more_details_link:
                 await more_details_link.click()
-                await page.wait_for_timeout(1000)
+                await self.waits.loading_mask(page, "permit.more_details", replaced_ms=1000)
             
             subsection_links = ["a#lnkRc", "a#lnkASI", "a#lnkASITableList", "a#lnkParcelList"]
             
@@ -506,7 +2192,7 @@ class LeeCountyPermitScraper:
                     link = await page.query_selector(link_selector)
                     if link:
                         await link.click()
-                        await page.wait_for_timeout(500)
+                        await self.waits.loading_mask(page, "permit.more_details_section", replaced_ms=500)
                 except:
                     pass
         except:
@@ -514,651 +2200,964 @@ class LeeCountyPermitScraper:
     
     async def extract_related_contacts(self, page):
         contacts = []
-        try:
-            contacts_table = await page.query_selector("table#ctl00_PlaceHolderMain_PermitDetailList1_RelatContactList")
-            if not contacts_table:
-                return None
-            
-            contact_divs = await contacts_table.query_selector_all("div.MoreDetail_ItemCol1")
-            
-            for contact_div in contact_divs:
-                try:
-                    contact = await self._extract_contact_info_from_container(contact_div)
-                    if contact.get("name") or contact.get("business_name"):
-                        contacts.append(contact)
-                except:
-                    continue
-        except:
+        contacts_table = await page.query_selector("table#ctl00_PlaceHolderMain_PermitDetailList1_RelatContactList")
+        if not contacts_table:
             return None
         
+        contact_divs = await contacts_table.query_selector_all("div.MoreDetail_ItemCol1")
+        
+        for contact_div in contact_divs:
+            try:
+                contact = await self._extract_contact_info_from_container(contact_div)
+                if contact.get("name") or contact.get("business_name"):
+                    contacts.append(contact)
+            except:
+                continue
+        
         return contacts if contacts else None
     
     async def extract_application_information(self, page):
         app_info = {}
-        try:
-            app_info_div = await page.query_selector("div#ctl00_PlaceHolderMain_PermitDetailList1_phPlumbingGroup")
-            if not app_info_div:
-                return None
-            
-            full_html = await app_info_div.inner_html()
-            section_pattern = r'<div class="MoreDetail_ItemTitle[^>]*>([^<]+)</div>'
-            sections = re.split(section_pattern, full_html)
-            current_section = None
-            
-            for i in range(len(sections)):
-                if i == 0:
-                    continue
-                
-                if i % 2 == 1:
-                    current_section = sections[i].strip()
-                    if current_section:
-                        app_info[current_section] = {}
-                else:
-                    if current_section and current_section in app_info:
-                        section_html = sections[i]
-                        
-                        standard_labels = re.findall(
-                            r'<div class="MoreDetail_ItemColASI MoreDetail_ItemCol1"[^>]*>.*?<span class="ACA_SmLabelBolder[^>]*>([^<]+)</span>.*?</div>',
-                            section_html, re.DOTALL
-                        )
-                        standard_values = re.findall(
-                            r'<div class="MoreDetail_ItemColASI MoreDetail_ItemCol2">.*?<span class="ACA_SmLabel ACA_SmLabel_FontSize">([^<]+)</span>.*?</div>',
-                            section_html, re.DOTALL
-                        )
-                        
-                        for j, label in enumerate(standard_labels):
-                            if j < len(standard_values):
-                                key = self._clean_label(label)
-                                app_info[current_section][key] = standard_values[j].strip()
-                        
-                        two_column_divs = re.findall(
-                            r'<div class="ACA_FLeft ASIReview2Columns">(.*?)</div>',
-                            section_html, re.DOTALL
-                        )
-                        
-                        for column_div in two_column_divs:
-                            label_match = re.search(r'<span class="ACA_SmLabelBolder"[^>]*>([^<]+)</span>', column_div)
-                            value_match = re.search(r'<span class="ACA_SmLabel">([^<]+)</span>', column_div)
-                            
-                            if label_match and value_match:
-                                key = self._clean_label(label_match.group(1))
-                                app_info[current_section][key] = value_match.group(1).strip()
-        except:
+        app_info_div = await page.query_selector("div#ctl00_PlaceHolderMain_PermitDetailList1_phPlumbingGroup")
+        if not app_info_div:
             return None
         
+        full_html = await app_info_div.inner_html()
+        app_info = self._parse_application_information(full_html)
+        
         return app_info if app_info else None
     
     async def extract_application_information_table(self, page):
         tables_data = []
-        try:
-            table_sections = await page.query_selector_all("tr#trASITList table[cellpadding='0'][cellspacing='0']")
+        table_sections = await page.query_selector_all("tr#trASITList table[cellpadding='0'][cellspacing='0']")
+        
+        for table_section in table_sections:
+            section_data = {}
             
-            for table_section in table_sections:
-                section_data = {}
-                
-                title_elem = await table_section.query_selector("div.ACA_TabRow.ACA_Title_Text")
-                if title_elem:
-                    section_data["section_title"] = (await title_elem.inner_text()).strip()
-                
-                items = []
-                item_rows = await table_section.query_selector_all("tr:has(div.MoreDetail_Item)")
+            title_elem = await table_section.query_selector("div.ACA_TabRow.ACA_Title_Text")
+            if title_elem:
+                section_data["section_title"] = (await title_elem.inner_text()).strip()
+            
+            items = []
+            item_rows = await table_section.query_selector_all("tr:has(div.MoreDetail_Item)")
+            
+            for item_row in item_rows:
+                item_data = {}
+                labels = await item_row.query_selector_all("span.ACA_SmLabelBolder")
+                values = await item_row.query_selector_all("span.ACA_SmLabel.ACA_SmLabel_FontSize")
                 
-                for item_row in item_rows:
-                    item_data = {}
-                    labels = await item_row.query_selector_all("span.ACA_SmLabelBolder")
-                    values = await item_row.query_selector_all("span.ACA_SmLabel.ACA_SmLabel_FontSize")
-                    
-                    for j, label_elem in enumerate(labels):
-                        try:
-                            label_text = (await label_elem.inner_text()).strip().rstrip(':')
-                            if j < len(values):
-                                value_text = (await values[j].inner_text()).strip()
-                                key = self._clean_key(label_text)
-                                item_data[key] = value_text
-                        except:
-                            continue
-                    
-                    if item_data:
-                        items.append(item_data)
+                for j, label_elem in enumerate(labels):
+                    try:
+                        label_text = (await label_elem.inner_text()).strip().rstrip(':')
+                        if j < len(values):
+                            value_text = (await values[j].inner_text()).strip()
+                            key = self._clean_key(label_text)
+                            item_data[key] = value_text
+                    except:
+                        continue
                 
-                if items:
-                    section_data["items"] = items
-                    tables_data.append(section_data)
-        except:
-            return None
+                if item_data:
+                    items.append(item_data)
+            
+            if items:
+                section_data["items"] = items
+                tables_data.append(section_data)
         
         return tables_data if tables_data else None
     
     async def extract_processing_status(self, page):
-        try:
-            processing_table = await page.query_selector("div#divProcessingTable table")
-            if not processing_table:
-                return None
-            
-            workflows = {}
-            all_rows = await processing_table.query_selector_all("tr")
-            
-            i = 0
-            while i < len(all_rows):
-                row = all_rows[i]
-                try:
-                    row_id = await row.get_attribute("id")
-                    if row_id:
-                        i += 1
-                        continue
-                    
-                    name_cell = await row.query_selector("td.ACA_ALeft[width='770px']")
-                    if not name_cell:
-                        i += 1
-                        continue
-                    
-                    workflow_name = (await name_cell.inner_text()).strip()
+        processing_table = await page.query_selector("div#divProcessingTable table")
+        if not processing_table:
+            return None
+        
+        workflows = {}
+        all_rows = await processing_table.query_selector_all("tr")
+        
+        i = 0
+        while i < len(all_rows):
+            row = all_rows[i]
+            try:
+                row_id = await row.get_attribute("id")
+                if row_id:
+                    i += 1
+                    continue
+                
+                name_cell = await row.query_selector("td.ACA_ALeft[width='770px']")
+                if not name_cell:
                     i += 1
+                    continue
+                
+                workflow_name = (await name_cell.inner_text()).strip()
+                i += 1
+                
+                expand_link = await row.query_selector("a[id^='lnk_']")
+                if expand_link and i < len(all_rows):
+                    detail_row = all_rows[i]
+                    await expand_link.click()
+                    await self.waits.loading_mask(page, "permit.workflow_expand", replaced_ms=500)
                     
-                    expand_link = await row.query_selector("a[id^='lnk_']")
-                    if expand_link and i < len(all_rows):
-                        detail_row = all_rows[i]
-                        await expand_link.click()
-                        await page.wait_for_timeout(500)
+                    detail_items = await detail_row.query_selector_all("tr.ACA_TabRow_Bold, tr.ACA_TabRow_Italic")
+                    
+                    if detail_items and len(detail_items) > 0:
+                        workflow_steps = []
                         
-                        detail_items = await detail_row.query_selector_all("tr.ACA_TabRow_Bold, tr.ACA_TabRow_Italic")
+                        for item in detail_items:
+                            try:
+                                item_text = await item.inner_text()
+                                if item_text.strip():
+                                    step_details = await self._extract_workflow_step_details(item_text)
+                                    if step_details:
+                                        workflow_steps.append(step_details)
+                            except:
+                                continue
                         
-                        if detail_items and len(detail_items) > 0:
-                            workflow_steps = []
-                            
-                            for item in detail_items:
-                                try:
-                                    item_text = await item.inner_text()
-                                    if item_text.strip():
-                                        step_details = await self._extract_workflow_step_details(item_text)
-                                        if step_details:
-                                            workflow_steps.append(step_details)
-                                except:
-                                    continue
-                            
-                            if len(workflow_steps) == 1:
-                                workflows[workflow_name] = workflow_steps[0]
-                            elif len(workflow_steps) > 1:
-                                workflows[workflow_name] = workflow_steps
-                            else:
-                                workflows[workflow_name] = None
-                        else:
-                            workflows[workflow_name] = None
+                        workflows[workflow_name] = self._workflow_value(workflow_steps)
                     else:
                         workflows[workflow_name] = None
-                except:
-                    pass
-                
-                i += 1
+                else:
+                    workflows[workflow_name] = None
+            except:
+                pass
             
-            return workflows if workflows else None
-        except:
-            return None
+            i += 1
+        
+        return workflows if workflows else None
     
     async def extract_related_records(self, page):
-        try:
-            no_records_msg = await page.query_selector("div#divRelatedCapTree span.ACA_CapDetail_NoRecord")
-            if no_records_msg:
-                return None
-            
-            await page.wait_for_selector("table#tableCapTreeList", timeout=5000)
-            related_table = await page.query_selector("table#tableCapTreeList")
-            if not related_table:
-                return None
-            
-            related_records = []
-            rows = await related_table.query_selector_all("tr[name]")
-            
-            for idx, row in enumerate(rows, 1):
+        no_records_msg = await page.query_selector("div#divRelatedCapTree span.ACA_CapDetail_NoRecord")
+        if no_records_msg:
+            return None
+        
+        await page.wait_for_selector("table#tableCapTreeList", timeout=5000)
+        related_table = await page.query_selector("table#tableCapTreeList")
+        if not related_table:
+            return None
+        
+        related_records = []
+        rows = await related_table.query_selector_all("tr[name]")
+        
+        for idx, row in enumerate(rows, 1):
+            try:
+                record = {}
+                cells = await row.query_selector_all(":scope > td")
+                
+                if len(cells) < 4:
+                    continue
+                
                 try:
-                    record = {}
-                    cells = await row.query_selector_all(":scope > td")
-                    
-                    if len(cells) < 4:
-                        continue
-                    
-                    try:
-                        nested_table = await cells[0].query_selector("table")
-                        if nested_table:
-                            nested_cells = await nested_table.query_selector_all("td")
-                            if len(nested_cells) >= 3:
-                                record_number_text = await nested_cells[2].inner_text()
-                                record_number = record_number_text.strip()
-                                if record_number:
-                                    record["related_record_number"] = record_number
-                                else:
-                                    continue
+                    nested_table = await cells[0].query_selector("table")
+                    if nested_table:
+                        nested_cells = await nested_table.query_selector_all("td")
+                        if len(nested_cells) >= 3:
+                            record_number_text = await nested_cells[2].inner_text()
+                            record_number = record_number_text.strip()
+                            if record_number:
+                                record["related_record_number"] = record_number
                             else:
                                 continue
                         else:
                             continue
-                    except:
+                    else:
                         continue
-                    
-                    try:
-                        record_type_text = await cells[1].inner_text()
-                        record["related_record_type"] = record_type_text.strip() if record_type_text.strip() else None
-                    except:
-                        record["related_record_type"] = None
-                    
-                    try:
-                        project_name_text = await cells[2].inner_text()
-                        record["related_project_name"] = project_name_text.strip() if project_name_text.strip() else None
-                    except:
-                        record["related_project_name"] = None
-                    
-                    try:
-                        date_div = await cells[3].query_selector("div.ACA_NShot")
-                        if date_div:
-                            date_text = await date_div.inner_text()
-                            record["related_date"] = date_text.strip() if date_text.strip() else None
-                        else:
-                            date_text = await cells[3].inner_text()
-                            record["related_date"] = date_text.strip() if date_text.strip() else None
-                    except:
-                        record["related_date"] = None
-                    
-                    try:
-                        if len(cells) > 4:
-                            shot_div = await cells[4].query_selector("div.ACA_Shot")
-                            if shot_div:
-                                view_link = await shot_div.query_selector("a#detail")
-                                if view_link:
-                                    detail_url = await view_link.get_attribute("href")
-                                    if detail_url:
-                                        if not detail_url.startswith('http'):
-                                            if detail_url.startswith('../'):
-                                                detail_url = detail_url.replace('../', '/')
-                                            detail_url = f"https://aca-prod.accela.com/LEECO{detail_url}"
-                                        record["related_detail_url"] = detail_url
-                                    else:
-                                        record["related_detail_url"] = None
+                except:
+                    continue
+                
+                try:
+                    record_type_text = await cells[1].inner_text()
+                    record["related_record_type"] = record_type_text.strip() if record_type_text.strip() else None
+                except:
+                    record["related_record_type"] = None
+                
+                try:
+                    project_name_text = await cells[2].inner_text()
+                    record["related_project_name"] = project_name_text.strip() if project_name_text.strip() else None
+                except:
+                    record["related_project_name"] = None
+                
+                try:
+                    date_div = await cells[3].query_selector("div.ACA_NShot")
+                    if date_div:
+                        date_text = await date_div.inner_text()
+                        record["related_date"] = date_text.strip() if date_text.strip() else None
+                    else:
+                        date_text = await cells[3].inner_text()
+                        record["related_date"] = date_text.strip() if date_text.strip() else None
+                except:
+                    record["related_date"] = None
+                
+                try:
+                    if len(cells) > 4:
+                        shot_div = await cells[4].query_selector("div.ACA_Shot")
+                        if shot_div:
+                            view_link = await shot_div.query_selector("a#detail")
+                            if view_link:
+                                detail_url = await view_link.get_attribute("href")
+                                if detail_url:
+                                    record["related_detail_url"] = self._related_detail_url(detail_url)
                                 else:
                                     record["related_detail_url"] = None
                             else:
                                 record["related_detail_url"] = None
                         else:
                             record["related_detail_url"] = None
-                    except:
+                    else:
                         record["related_detail_url"] = None
-                    
-                    if record.get("related_record_number"):
-                        related_records.append(record)
                 except:
-                    continue
-            
-            return related_records if related_records else None
-        except:
-            return None
+                    record["related_detail_url"] = None
+                
+                if record.get("related_record_number"):
+                    related_records.append(record)
+            except:
+                continue
+        
+        return related_records if related_records else None
     
     async def extract_conditions(self, page):
         conditions = []
-        try:
-            await page.wait_for_selector("div#divGeneralConditions", timeout=5000)
-            
-            conditions_table = await page.query_selector("table#ctl00_PlaceHolderMain_capConditions_gdvGeneralConditionsList")
-            if not conditions_table:
-                return None
-            
-            rows = await conditions_table.query_selector_all("tr.ACA_TabRow_Odd, tr.ACA_TabRow_Even")
-            current_group = None
-            
-            for row in rows:
-                try:
-                    condition = {}
-                    
-                    group_name_div = await row.query_selector("div[id*='divGeneralConditionsGroupName']")
-                    if group_name_div:
-                        group_name_elem = await group_name_div.query_selector("span[id*='lblGeneralConditionsGroupName']")
-                        if group_name_elem:
-                            current_group = (await group_name_elem.inner_text()).strip()
-                    
-                    if current_group:
-                        condition["group"] = current_group
-                    
-                    type_div = await row.query_selector("div[id*='divGeneralConditionsType']")
-                    if type_div:
-                        type_elem = await type_div.query_selector("span[id*='lblGeneralConditionsType']")
-                        if type_elem:
-                            condition["type"] = (await type_elem.inner_text()).strip()
-                    
-                    info_span = await row.query_selector("span[id*='lblGeneralConditionsInfo']")
-                    if info_span:
-                        info_html = await info_span.inner_html()
-                        
-                        title_match = re.search(r'<div[^>]*font-weight: bold[^>]*>([^<]+)</div>', info_html)
-                        if title_match:
-                            condition["title"] = title_match.group(1).strip()
-                        
-                        desc_match = re.search(r'<div[^>]*font-style: italic[^>]*>([^<]+)</div>', info_html)
-                        if desc_match:
-                            condition["description"] = desc_match.group(1).strip()
-                        
-                        status_date_match = re.search(r'<div[^>]*>([^<|]+)\|\s*(&nbsp;)?(\d{2}/\d{2}/\d{4})</div>', info_html)
-                        if status_date_match:
-                            condition["status"] = status_date_match.group(1).strip()
-                            condition["date"] = status_date_match.group(3).strip()
-                        else:
-                            info_text = await info_span.inner_text()
-                            status_date_text_match = re.search(r'([^|\n]+)\|\s*(\d{2}/\d{2}/\d{4})\s*$', info_text, re.MULTILINE)
-                            if status_date_text_match:
-                                condition["status"] = status_date_text_match.group(1).strip()
-                                condition["date"] = status_date_text_match.group(2).strip()
-                    
-                    if condition.get("title"):
-                        conditions.append(condition)
-                except:
-                    continue
-            
-            return conditions if conditions else None
-        except:
+        await page.wait_for_selector("div#divGeneralConditions", timeout=5000)
+        
+        conditions_table = await page.query_selector("table#ctl00_PlaceHolderMain_capConditions_gdvGeneralConditionsList")
+        if not conditions_table:
             return None
+        
+        rows = await conditions_table.query_selector_all("tr.ACA_TabRow_Odd, tr.ACA_TabRow_Even")
+        current_group = None
+        
+        for row in rows:
+            try:
+                condition = {}
+                
+                group_name_div = await row.query_selector("div[id*='divGeneralConditionsGroupName']")
+                if group_name_div:
+                    group_name_elem = await group_name_div.query_selector("span[id*='lblGeneralConditionsGroupName']")
+                    if group_name_elem:
+                        current_group = (await group_name_elem.inner_text()).strip()
+                
+                if current_group:
+                    condition["group"] = current_group
+                
+                type_div = await row.query_selector("div[id*='divGeneralConditionsType']")
+                if type_div:
+                    type_elem = await type_div.query_selector("span[id*='lblGeneralConditionsType']")
+                    if type_elem:
+                        condition["type"] = (await type_elem.inner_text()).strip()
+                
+                info_span = await row.query_selector("span[id*='lblGeneralConditionsInfo']")
+                if info_span:
+                    info_html = await info_span.inner_html()
+                    info_text = await info_span.inner_text()
+                    self._parse_condition_info(condition, info_html, info_text)
+                
+                if condition.get("title"):
+                    conditions.append(condition)
+            except:
+                continue
+        
+        return conditions if conditions else None
     
     async def _extract_fee_section(self, page, div_selector, table_selector, fees_key, total_key):
         """Helper to extract fees from a specific section"""
-        try:
-            fee_div = await page.query_selector(div_selector)
-            if fee_div:
-                style = await fee_div.get_attribute("style")
-                if not style or "display: none" not in style:
-                    fee_table = await fee_div.query_selector(table_selector)
-                    if fee_table:
-                        fees, total = await self._extract_fee_rows_from_table(fee_table)
-                        return {fees_key: fees} if fees else {}, {total_key: total} if total else {}
-        except:
-            pass
+        fee_div = await page.query_selector(div_selector)
+        if fee_div:
+            style = await fee_div.get_attribute("style")
+            if not style or "display: none" not in style:
+                fee_table = await fee_div.query_selector(table_selector)
+                if fee_table:
+                    fees, total = await self._extract_fee_rows_from_table(fee_table)
+                    return {fees_key: fees} if fees else {}, {total_key: total} if total else {}
         return {}, {}
     
     async def extract_fees(self, page):
         fees_data = {}
         
-        try:
-            await page.wait_for_selector("div#divFeeListContent", timeout=5000)
-            
-            # Extract outstanding fees
-            outstanding_fees, outstanding_total = await self._extract_fee_section(
-                page,
-                "div#divFeeList",
-                "table#ctl00_PlaceHolderMain_FeeList_gdvFeeUnpaidList",
-                "outstanding_fees",
-                "total_outstanding"
-            )
-            fees_data.update(outstanding_fees)
-            fees_data.update(outstanding_total)
-            
-            # Extract paid fees
-            paid_fees, paid_total = await self._extract_fee_section(
-                page,
-                "div#divFeeListPaid",
-                "table#ctl00_PlaceHolderMain_FeeList_gdvFeeUnpaidList",
-                "paid_fees",
-                "total_paid"
-            )
-            fees_data.update(paid_fees)
-            fees_data.update(paid_total)
-            
-            return fees_data if fees_data else None
-        except:
-            return None
+        await page.wait_for_selector("div#divFeeListContent", timeout=5000)
+        
+        # Extract outstanding fees
+        outstanding_fees, outstanding_total = await self._extract_fee_section(
+            page,
+            "div#divFeeList",
+            "table#ctl00_PlaceHolderMain_FeeList_gdvFeeUnpaidList",
+            "outstanding_fees",
+            "total_outstanding"
+        )
+        fees_data.update(outstanding_fees)
+        fees_data.update(outstanding_total)
+        
+        # Extract paid fees
+        paid_fees, paid_total = await self._extract_fee_section(
+            page,
+            "div#divFeeListPaid",
+            "table#ctl00_PlaceHolderMain_FeeList_gdvFeeUnpaidList",
+            "paid_fees",
+            "total_paid"
+        )
+        fees_data.update(paid_fees)
+        fees_data.update(paid_total)
+        
+        return fees_data if fees_data else None
     
     async def extract_applicant_info(self, page):
-        try:
-            applicant_section = await page.query_selector("span[id*='per_permitDetail_label_applicant']")
-            if not applicant_section:
-                return None
-            
-            parent_container = await applicant_section.evaluate_handle("el => el.closest('td')")
-            applicant = await self._extract_contact_info_from_container(parent_container)
-            return applicant if applicant else None
-        except:
+        applicant_section = await page.query_selector("span[id*='per_permitDetail_label_applicant']")
+        if not applicant_section:
             return None
+        
+        parent_container = await applicant_section.evaluate_handle("el => el.closest('td')")
+        applicant = await self._extract_contact_info_from_container(parent_container)
+        return applicant if applicant else None
     
     async def extract_licensed_professional_info(self, page):
-        try:
-            lp_table = await page.query_selector("table#tbl_licensedps")
-            if not lp_table:
-                return None
-            
-            expand_link = await page.query_selector("a#link_licenseProfessional")
-            if expand_link:
-                link_text = await expand_link.inner_text()
-                if "View Additional" in link_text or "Show Additional" in link_text:
-                    try:
-                        await expand_link.click()
-                        await page.wait_for_timeout(500)
-                    except:
-                        pass
-            
-            professionals = []
-            all_rows = await lp_table.query_selector_all("tr")
-            
-            for row in all_rows:
+        lp_table = await page.query_selector("table#tbl_licensedps")
+        if not lp_table:
+            return None
+        
+        expand_link = await page.query_selector("a#link_licenseProfessional")
+        if expand_link:
+            link_text = await expand_link.inner_text()
+            if "View Additional" in link_text or "Show Additional" in link_text:
                 try:
-                    row_html = await row.inner_html()
-                    if not row_html or "&nbsp;" in row_html and len(row_html) < 50:
-                        continue
-                    if "<<Hide Additional" in row_html or "View Additional" in row_html:
-                        continue
-                    
-                    info_cell = await row.query_selector("td:nth-child(2)")
-                    if not info_cell:
-                        continue
-                    
-                    professional = {}
-                    full_text = await info_cell.inner_text()
-                    if not full_text.strip():
-                        continue
-                    
-                    all_lines = [line.strip() for line in full_text.split('\n') if line.strip()]
-                    lines = [line for line in all_lines if line not in ["Primary Phone:", "Fax:", "Alternate Phone:"]]
-                    
-                    if len(lines) < 2:
-                        continue
-                    
-                    professional["name"] = lines[0] if len(lines) > 0 else None
-                    professional["business_name"] = lines[1] if len(lines) > 1 else None
-                    
-                    address_parts = []
-                    if len(lines) > 2:
-                        address_parts.append(lines[2])
-                    if len(lines) > 3:
-                        address_parts.append(lines[3])
-                    
-                    professional["address"] = ", ".join(address_parts) if address_parts else None
-                    
-                    all_phone_divs = await info_cell.query_selector_all("div.ACA_PhoneNumberLTR")
-                    primary_phone = None
-                    alternate_phone = None
-                    fax = None
-                    
-                    for phone_div in all_phone_divs:
-                        parent_row_elem = await phone_div.evaluate_handle("el => el.closest('tr')")
-                        row_text = await parent_row_elem.inner_text()
-                        phone_value = await phone_div.inner_text()
-                        
-                        if "Primary Phone:" in row_text:
-                            primary_phone = phone_value.strip()
-                        elif "Alternate Phone:" in row_text:
-                            alternate_phone = phone_value.strip()
-                        elif "Fax:" in row_text:
-                            fax = phone_value.strip()
-                    
-                    professional["primary_phone"] = primary_phone
-                    professional["alternate_phone"] = alternate_phone
-                    professional["fax"] = fax
-                    
-                    license_info = None
-                    license_pattern = r'\b[A-Z]{2,4}\d{5,}\b'
-                    
-                    for line in lines:
-                        if line == professional.get("name") or line == professional.get("business_name"):
-                            continue
-                        if re.search(r',\s*[A-Z]{2},?\s*\d{5}', line):
-                            continue
-                        if re.search(license_pattern, line):
-                            license_info = line.strip()
-                            break
-                    
-                    if not license_info:
-                        for line in lines:
-                            line_upper = line.upper()
-                            if line == professional.get("business_name"):
-                                continue
-                            if ('CERTIFIED' in line_upper or 'LICENSE' in line_upper or 'PRIVATE PROVIDER' in line_upper) and \
-                               ('CONTRACTOR' in line_upper or 'CNTR' in line_upper or 'PP' in line_upper or 'PROVIDER' in line_upper):
-                                license_info = line.strip()
-                                break
-                    
-                    professional["license"] = license_info
-                    
-                    if professional.get("name") or professional.get("business_name"):
-                        professionals.append(professional)
+                    await expand_link.click()
+                    await self.waits.loading_mask(page, "permit.lp_expand", replaced_ms=500)
                 except:
+                    pass
+        
+        professionals = []
+        all_rows = await lp_table.query_selector_all("tr")
+        
+        for row in all_rows:
+            try:
+                row_html = await row.inner_html()
+                if not row_html or "&nbsp;" in row_html and len(row_html) < 50:
+                    continue
+                if "<<Hide Additional" in row_html or "View Additional" in row_html:
+                    continue
+                
+                info_cell = await row.query_selector("td:nth-child(2)")
+                if not info_cell:
                     continue
-            
-            if len(professionals) == 0:
-                return None
-            elif len(professionals) == 1:
-                return professionals[0]
-            else:
-                return professionals
-        except:
+                
+                full_text = await info_cell.inner_text()
+                if not full_text.strip():
+                    continue
+                
+                if len([line for line in full_text.split('\n') if line.strip()]) < 2:
+                    continue
+                
+                # The license number comes from the text alone, so a known professional needs no phone lookups
+                cached = self.contact_cache.get(
+                    contact_key(self._parse_licensed_professional(full_text, []), "licensed_professional")
+                )
+                if cached:
+                    professionals.append(cached)
+                    continue
+                
+                phones = []
+                all_phone_divs = await info_cell.query_selector_all("div.ACA_PhoneNumberLTR")
+                for phone_div in all_phone_divs:
+                    parent_row_elem = await phone_div.evaluate_handle("el => el.closest('tr')")
+                    row_text = await parent_row_elem.inner_text()
+                    phone_value = await phone_div.inner_text()
+                    phones.append((row_text, phone_value))
+                
+                professional = self._parse_licensed_professional(full_text, phones)
+                if professional:
+                    professionals.append(professional)
+            except:
+                continue
+        
+        if len(professionals) == 0:
             return None
+        elif len(professionals) == 1:
+            return professionals[0]
+        else:
+            return professionals
     
     async def extract_project_description(self, page):
-        try:
-            project_label = await page.query_selector("span[id*='per_permitDetail_label_projectl']")
-            if not project_label:
-                return None
-            
-            parent_td = await project_label.evaluate_handle("el => el.closest('td')")
-            project_table = await parent_td.query_selector("table.table_child td:last-child")
-            
-            if project_table:
-                full_text = await project_table.inner_text()
-                return full_text.strip()
-            return None
-        except:
+        project_label = await page.query_selector("span[id*='per_permitDetail_label_projectl']")
+        if not project_label:
             return None
+        
+        parent_td = await project_label.evaluate_handle("el => el.closest('td')")
+        project_table = await parent_td.query_selector("table.table_child td:last-child")
+        
+        if project_table:
+            full_text = await project_table.inner_text()
+            return full_text.strip()
+        return None
     
     async def extract_work_location(self, page):
-        try:
-            work_location_table = await page.query_selector("table#tbl_worklocation")
-            if not work_location_table:
-                return None
-            
-            rows = await work_location_table.query_selector_all("tr")
-            locations = []
-            current_location = []
-            
-            for row in rows:
-                row_text = await row.inner_text()
-                row_text = row_text.strip()
-                
-                if not row_text:
+        work_location_table = await page.query_selector("table#tbl_worklocation")
+        if not work_location_table:
+            return None
+        
+        rows = await work_location_table.query_selector_all("tr")
+        row_texts = [await row.inner_text() for row in rows]
+        return self._parse_work_location(row_texts)
+    
+    async def _run_detail_extractor(self, page, section):
+        """Run one section of DETAIL_EXTRACTORS_JS in the page (a single round trip)"""
+        return await page.evaluate(DETAIL_EXTRACTORS_JS, section)
+    
+    async def extract_summary_bulk(self, page):
+        """Header, work location, applicant, licensed professional and project description in one round trip"""
+        permit_data = {
+            "record_number": None,
+            "permit_type": None,
+            "record_status": None,
+            "work_location": None,
+            "applicant": None,
+            "licensed_professional": None,
+            "project_description": None,
+        }
+        if await self._run_detail_extractor(page, "expand_licensed_professional"):
+            await self.waits.loading_mask(page, "permit.lp_expand", replaced_ms=500)
+        
+        summary = await self._run_detail_extractor(page, "summary")
+        permit_data["record_number"] = summary["record_number"]
+        permit_data["permit_type"] = summary["permit_type"]
+        permit_data["record_status"] = summary["record_status"]
+        if summary["work_location_rows"] is not None:
+            permit_data["work_location"] = self._parse_work_location(summary["work_location_rows"])
+        permit_data["applicant"] = summary["applicant"] or None
+        permit_data["project_description"] = summary["project_description"]
+        
+        if summary["licensed_professional_rows"] is not None:
+            professionals = []
+            for row in summary["licensed_professional_rows"]:
+                row_html = row["html"]
+                if not row_html or "&nbsp;" in row_html and len(row_html) < 50:
                     continue
-                    
-                if '<<Hide Additional Locations' in row_text or '>>Show Additional Locations' in row_text:
+                if "<<Hide Additional" in row_html or "View Additional" in row_html:
+                    continue
+                if not row["text"] or not row["text"].strip():
                     continue
                 
-                if re.match(r'^\d+\)', row_text):
-                    if current_location:
-                        location_str = ", ".join(current_location).replace('*', '').strip()
-                        if location_str:
-                            locations.append(location_str)
-                    current_location = [re.sub(r'^\d+\)\s*', '', row_text)]
-                else:
-                    if row_text:
-                        current_location.append(row_text)
-            
-            if current_location:
-                location_str = ", ".join(current_location).replace('*', '').strip()
-                if location_str:
-                    locations.append(location_str)
-            
-            if len(locations) == 0:
-                return None
-            elif len(locations) == 1:
-                return locations[0]
-            else:
-                return {
-                    "primary_location": locations[0],
-                    "additional_locations": locations[1:]
-                }
+                # The same row text and phones on an earlier permit: reuse its parsed form. This only saves the
+                # parsing, the rows (and the expand for additional professionals) are read either way
+                row_key = raw_contact_key(row["text"], row["phones"])
+                professional = self.contact_cache.get(row_key)
+                if professional is None:
+                    professional = self._parse_licensed_professional(row["text"], row["phones"])
+                    if professional:
+                        self.contact_cache.put(row_key, professional)
+                if professional:
+                    professionals.append(professional)
+            
+            if len(professionals) == 1:
+                permit_data["licensed_professional"] = professionals[0]
+            elif len(professionals) > 1:
+                permit_data["licensed_professional"] = professionals
+        
+        return permit_data
+    
+    async def expand_more_details_bulk(self, page):
+        """Click More Details and all its subsection links in one round trip"""
+        try:
+            await self._run_detail_extractor(page, "expand_more_details")
         except:
+            pass
+    
+    async def extract_more_details_bulk(self, page):
+        """Related contacts and application information (fields and tables) in one round trip"""
+        more_details = {}
+        raw = await self._run_detail_extractor(page, "more_details")
+        
+        if raw["related_contacts"]:
+            more_details["related_contacts"] = {"contact_information": raw["related_contacts"]}
+        
+        if raw["application_information_html"] is not None:
+            app_info = self._parse_application_information(raw["application_information_html"])
+            if app_info:
+                more_details["application_information"] = app_info
+        
+        tables_data = []
+        for table in raw["application_information_table"]:
+            section_data = {}
+            if table["section_title"] is not None:
+                section_data["section_title"] = table["section_title"].strip()
+            
+            items = []
+            for item_row in table["items"]:
+                item_data = {}
+                for j, label_text in enumerate(item_row["labels"]):
+                    if j < len(item_row["values"]):
+                        key = self._clean_key(label_text.strip().rstrip(':'))
+                        item_data[key] = item_row["values"][j].strip()
+                if item_data:
+                    items.append(item_data)
+            
+            if items:
+                section_data["items"] = items
+                tables_data.append(section_data)
+        
+        if tables_data:
+            more_details["application_information_table"] = tables_data
+        
+        return more_details
+    
+    async def extract_processing_status_bulk(self, page):
+        """Expand every workflow at once, then read all their steps in one round trip"""
+        if await self._run_detail_extractor(page, "expand_processing_status"):
+            await self.waits.loading_mask(page, "permit.workflow_expand", replaced_ms=500)
+        
+        raw_workflows = await self._run_detail_extractor(page, "processing_status")
+        if not raw_workflows:
+            return None
+        
+        workflows = {}
+        for workflow in raw_workflows:
+            workflow_steps = []
+            for item_text in workflow["items"] or []:
+                if item_text.strip():
+                    step_details = await self._extract_workflow_step_details(item_text)
+                    if step_details:
+                        workflow_steps.append(step_details)
+            workflows[workflow["name"]] = self._workflow_value(workflow_steps)
+        
+        return workflows if workflows else None
+    
+    async def extract_related_records_bulk(self, page):
+        await page.wait_for_selector(
+            "div#divRelatedCapTree span.ACA_CapDetail_NoRecord, table#tableCapTreeList", timeout=5000
+        )
+        related_records = await self._run_detail_extractor(page, "related_records")
+        if not related_records:
+            return None
+        
+        for record in related_records:
+            record["related_detail_url"] = self._related_detail_url(record["related_detail_url"])
+        return related_records
+    
+    async def extract_fees_bulk(self, page):
+        await page.wait_for_selector("div#divFeeListContent", timeout=5000)
+        raw = await self._run_detail_extractor(page, "fees")
+        
+        fees_data = {}
+        for section, fees_key, total_key in (("outstanding", "outstanding_fees", "total_outstanding"),
+                                             ("paid", "paid_fees", "total_paid")):
+            if raw[section]:
+                fees, total = self._build_fee_rows(raw[section]["rows"], raw[section]["total_text"])
+                if fees:
+                    fees_data[fees_key] = fees
+                if total:
+                    fees_data[total_key] = total
+        
+        return fees_data if fees_data else None
+    
+    async def extract_conditions_bulk(self, page):
+        await page.wait_for_selector("div#divGeneralConditions", timeout=5000)
+        rows = await self._run_detail_extractor(page, "conditions")
+        if rows is None:
             return None
+        
+        conditions = []
+        current_group = None
+        for row in rows:
+            condition = {}
+            if row["group"] is not None:
+                current_group = row["group"]
+            if current_group:
+                condition["group"] = current_group
+            if row["type"] is not None:
+                condition["type"] = row["type"]
+            if row["info_html"] is not None:
+                self._parse_condition_info(condition, row["info_html"], row["info_text"])
+            if condition.get("title"):
+                conditions.append(condition)
+        
+        return conditions if conditions else None
     
     async def extract_permit_details(self, page, permit_url, permit_id):
         try:
-            await page.goto(permit_url, wait_until="domcontentloaded")
-            await page.wait_for_timeout(2000)
-            
+            return await self._extract_permit_details(page, permit_url, permit_id)
+        except Exception as e:
+            logger.error(f"Error extracting {permit_id}: {str(e)}")
+            return None
+    
+    async def _extract_permit_details(self, page, permit_url, permit_id):
+        """extract_permit_details without the error handling, so callers can see why a permit failed"""
+        started = time.perf_counter()
+        await page.goto(permit_url, wait_until="domcontentloaded")
+        await self.waits.selector(page, "span#ctl00_PlaceHolderMain_lblPermitNumber", "permit.ready",
+                                  replaced_ms=2000, state="attached", required=True)
+        started = self.metrics.lap("detail.navigation", started)
+        # Sections whose extraction raised; the permit is saved as partial (and retried) when there are any
+        failed_sections = []
+        
+        if not self.wants_section("summary"):
             permit_data = {}
-            
-            try:
-                permit_data["record_number"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblPermitNumber")
-            except:
-                permit_data["record_number"] = None
-            
-            try:
-                permit_data["permit_type"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblPermitType")
-            except:
-                permit_data["permit_type"] = None
-            
-            try:
-                permit_data["record_status"] = await page.inner_text("span#ctl00_PlaceHolderMain_lblRecordStatus")
-            except:
-                permit_data["record_status"] = None
-            
-            permit_data["work_location"] = await self.extract_work_location(page)
-            permit_data["applicant"] = await self.extract_applicant_info(page)
-            permit_data["licensed_professional"] = await self.extract_licensed_professional_info(page)
-            permit_data["project_description"] = await self.extract_project_description(page)
-            
-            await self.expand_more_details(page)
-            await page.wait_for_timeout(1000)
-            
+        elif self.bulk_extraction:
+            permit_data = await self._read_section(self.extract_summary_bulk(page), "summary", failed_sections, {})
+        else:
+            permit_data = await self._read_section(self.extract_summary(page), "summary", failed_sections, {})
+        if self.wants_section("summary"):
+            started = self.metrics.lap("detail.summary", started)
+        
+        if not self.wants_section("more_details"):
             more_details = {}
-            
-            related_contacts = await self.extract_related_contacts(page)
-            if related_contacts:
-                more_details["related_contacts"] = {"contact_information": related_contacts}
-            
-            app_info = await self.extract_application_information(page)
-            if app_info:
-                more_details["application_information"] = app_info
-            
-            app_info_table = await self.extract_application_information_table(page)
-            if app_info_table:
-                more_details["application_information_table"] = app_info_table
-            
-            if more_details:
-                permit_data["more_details"] = more_details
-            
-            if await self.navigate_to_tab(page, "processing_status", parent_menu="Record Info"):
-                processing_status = await self.extract_processing_status(page)
+        elif self.bulk_extraction:
+            await self.expand_more_details_bulk(page)
+            await self.waits.loading_mask(page, "permit.more_details", replaced_ms=1000)
+            more_details = await self._read_section(self.extract_more_details_bulk(page), "more_details",
+                                                    failed_sections, {})
+        else:
+            await self.expand_more_details(page)
+            more_details = await self._read_section(self.extract_more_details(page), "more_details", failed_sections, {})
+        
+        if more_details:
+            permit_data["more_details"] = more_details
+        if self.wants_section("more_details"):
+            self.metrics.lap("detail.more_details", started)
+        
+        await self.extract_detail_tabs(page, permit_data, failed_sections)
+        if failed_sections:
+            permit_data["failed_sections"] = failed_sections
+        return permit_data
+    
+    async def _read_section(self, extraction, section, failed_sections, default=None):
+        """Await one section's extraction, noting the section in failed_sections instead of raising"""
+        try:
+            return await extraction
+        except Exception as e:
+            logger.warning(f"Section {section} failed: {str(e) or type(e).__name__}")
+            failed_sections.append(section)
+            return default
+    
+    async def extract_detail_tabs(self, page, permit_data, failed_sections):
+        """Open the selected postback tabs (processing status, related records, fees, conditions) and add them to permit_data;
+        tabs that fail to load or read are added to failed_sections"""
+        groups = [[tab for tab in group if self.wants_section(tab)] for group in DETAIL_TAB_GROUPS]
+        groups = [group for group in groups if group]
+        
+        if not self.parallel_tabs or len(groups) < 2:
+            results = [await self._extract_tab_group(page, DETAIL_TAB_SECTIONS, failed_sections)]
+        else:
+            # The first group stays on this page, the others get a sibling page when the shared budget has a free slot
+            sequential_tabs = list(groups[0])
+            sibling_groups = []
+            for group in groups[1:]:
+                sibling = await self._try_acquire_sibling(page.context)
+                if sibling is not None:
+                    sibling_groups.append((sibling, group))
+                else:
+                    sequential_tabs.extend(group)
+            results = await asyncio.gather(
+                self._extract_tab_group(page, sequential_tabs, failed_sections),
+                *(self._extract_tabs_on_sibling(page, sibling, group, failed_sections) for sibling, group in sibling_groups)
+            )
+        
+        # Merge in a fixed order so the JSON layout doesn't depend on which tab finished first
+        sections = {key: value for result in results for key, value in result.items()}
+        for key in ("processing_status", "related_records_detail", "fees", "conditions"):
+            if key in sections:
+                permit_data[key] = sections[key]
+    
+    async def _extract_tab_group(self, page, tabs, failed_sections):
+        """Read the given tabs one after another on page, returns {permit_data key: value}"""
+        sections = {}
+        if "processing_status" in tabs and self.wants_section("processing_status"):
+            with self.metrics.stage("detail.processing_status"):
+                processing_status = await self._read_section(
+                    self._extract_tab(page, "processing_status", "Record Info", self.extract_processing_status_bulk,
+                                      self.extract_processing_status),
+                    "processing_status", failed_sections
+                )
                 if processing_status:
-                    permit_data["processing_status"] = processing_status
-            
-            if await self.navigate_to_tab(page, "related_records", parent_menu="Record Info"):
-                related_records_detail = await self.extract_related_records(page)
+                    sections["processing_status"] = processing_status
+        
+        if "related_records" in tabs and self.wants_section("related_records"):
+            with self.metrics.stage("detail.related_records"):
+                related_records_detail = await self._read_section(
+                    self._extract_tab(page, "related_records", "Record Info", self.extract_related_records_bulk,
+                                      self.extract_related_records),
+                    "related_records", failed_sections
+                )
                 if related_records_detail:
-                    permit_data["related_records_detail"] = related_records_detail
-            
-            if await self.navigate_to_tab(page, "fee", parent_menu="Payments"):
-                fees = await self.extract_fees(page)
+                    sections["related_records_detail"] = related_records_detail
+        
+        if "fees" in tabs and self.wants_section("fees"):
+            with self.metrics.stage("detail.fees"):
+                fees = await self._read_section(
+                    self._extract_tab(page, "fee", "Payments", self.extract_fees_bulk, self.extract_fees),
+                    "fees", failed_sections
+                )
                 if fees:
-                    permit_data["fees"] = fees
-            
-            if await self.navigate_to_tab(page, "conditions"):
-                conditions = await self.extract_conditions(page)
+                    sections["fees"] = fees
+        
+        if "conditions" in tabs and self.wants_section("conditions"):
+            with self.metrics.stage("detail.conditions"):
+                conditions = await self._read_section(
+                    self._extract_tab(page, "conditions", None, self.extract_conditions_bulk, self.extract_conditions),
+                    "conditions", failed_sections
+                )
                 if conditions:
-                    permit_data["conditions"] = conditions
-            
-            return permit_data
+                    sections["conditions"] = conditions
+        return sections
+    
+    async def _extract_tab(self, page, tab_name, parent_menu, bulk_extractor, extractor):
+        """Open one tab and read it, None when the permit has no such tab"""
+        if not await self.navigate_to_tab(page, tab_name, parent_menu=parent_menu):
+            return None
+        if self.bulk_extraction:
+            return await bulk_extractor(page)
+        return await extractor(page)
+    
+    async def _try_acquire_sibling(self, context):
+        """A free budget slot plus a page for a sibling tab group, None when either would mean waiting"""
+        if not await self._try_acquire_slot():
+            return None
+        # Never wait for a page while holding the slot: with a shared or raised limit the pool can be all checked out
+        try:
+            sibling = await self.page_pool.try_acquire() if self.page_pool else await self._open_page(context)
         except Exception as e:
-            logger.error(f"Error extracting {permit_id}: {str(e)}")
+            logger.warning(f"Could not open a sibling page: {str(e)}")
+            sibling = None
+        if sibling is None:
+            self.semaphore.release()
+        return sibling
+    
+    async def _extract_tabs_on_sibling(self, page, sibling, tabs, failed_sections):
+        """Open the permit in the sibling page and read tabs there; returns the tab data and gives back the page and its budget slot"""
+        try:
+            record_number = self.page_permits.get(page)
+            if record_number:
+                self.page_permits[sibling] = record_number
+            await sibling.goto(page.url, wait_until="domcontentloaded")
+            await self.waits.selector(sibling, "span#ctl00_PlaceHolderMain_lblPermitNumber", "permit.sibling_ready",
+                                      state="attached")
+            return await self._extract_tab_group(sibling, tabs, failed_sections)
+        except Exception as e:
+            logger.warning(f"Sibling page failed for tabs {tabs}: {str(e)}")
+            failed_sections.extend(tabs)
+            return {}
+        finally:
+            self.page_permits.pop(sibling, None)
+            if self.page_pool:
+                await self.page_pool.release(sibling)
+            else:
+                try:
+                    await sibling.close()
+                except:
+                    pass
+            self.semaphore.release()
+    
+    async def extract_permit_details_http(self, page, permit_url, permit_id):
+        """Parse the server-rendered CapDetail sections from a plain GET (browser instead when tabs are wanted)"""
+        # The tabs need the page loaded in the browser anyway, fetching it over HTTP as well is extra work
+        details = None if self._wants_tabs() else await self._fetch_permit_details_http(page.context, permit_url, permit_id)
+        if details is None:
+            return await self.extract_permit_details(page, permit_url, permit_id)
+        return details
+    
+    async def _fetch_permit_details_http(self, context, permit_url, permit_id):
+        """Summary and more details parsed from a plain GET with lxml, None when the browser has to be used"""
+        try:
+            # context.request shares the browser's cookies and keeps connections alive between permits
+            started = time.perf_counter()
+            response = await context.request.get(permit_url, timeout=30000)
+            if not response.ok:
+                raise Exception(f"HTTP {response.status}")
+            html_text = await response.text()
+            started = self.metrics.lap("detail.http_fetch", started)
+            permit_data = self._parse_detail_html(html_text)
+            self.metrics.lap("detail.http_parse", started)
+            if not permit_data.get("record_number"):
+                raise Exception("record number not found in response")
+            if not self.wants_section("summary"):
+                permit_data = {"more_details": permit_data["more_details"]} if "more_details" in permit_data else {}
+            if not self.wants_section("more_details"):
+                permit_data.pop("more_details", None)
+        except Exception as e:
+            logger.warning(f"HTTP fast path failed for {permit_id}, using the browser: {str(e)}")
+            return None
+        return permit_data
+    
+    def _wants_tabs(self):
+        return any(self.wants_section(section) for section in DETAIL_TAB_SECTIONS)
+    
+    def _xpath_class(self, class_name):
+        """XPath predicate matching one CSS class token, like .class_name"""
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+    
+    def _html_text(self, element):
+        """Approximate innerText for an lxml element: block elements and <br> become line breaks"""
+        if element is None:
             return None
+        parts = []
+        
+        def walk(node):
+            tag = node.tag if isinstance(node.tag, str) else ""
+            if tag in ("script", "style"):
+                return
+            if tag == "br" or tag in HTML_BLOCK_TAGS:
+                parts.append("\n")
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+            if tag in HTML_BLOCK_TAGS:
+                parts.append("\n")
+            elif tag in ("td", "th"):
+                parts.append("\t")
+        
+        walk(element)
+        lines = [re.sub(r'[ \t\r\f\v\xa0]+', ' ', line).strip() for line in "".join(parts).split("\n")]
+        return "\n".join(line for line in lines if line)
+    
+    def _html_first(self, element, xpath):
+        found = element.xpath(xpath)
+        return found[0] if found else None
+    
+    def _html_value(self, element, xpath):
+        """Trimmed text of the first match, None when missing or empty (like _safe_extract_text)"""
+        return self._html_text(self._html_first(element, xpath)) or None
+    
+    def _inner_html(self, element):
+        return (element.text or "") + "".join(
+            lxml_html.tostring(child, encoding="unicode", method="html") for child in element
+        )
+    
+    def _parse_contact_html(self, container):
+        """lxml version of _extract_contact_info_from_container"""
+        span = lambda class_name: f".//span[{self._xpath_class(class_name)}]"
+        contact = {}
+        
+        first_name = self._html_first(container, span("contactinfo_firstname"))
+        last_name = self._html_first(container, span("contactinfo_lastname"))
+        if first_name is not None and last_name is not None:
+            contact["name"] = f"{self._html_text(first_name)} {self._html_text(last_name)}".strip()
+        else:
+            contact["name"] = None
+        
+        contact["contact_id"] = self._html_value(container, span("contactinfo_title"))
+        contact["business_name"] = self._html_value(container, span("contactinfo_businessname"))
+        
+        address_parts = []
+        address_line = self._html_first(container, span("contactinfo_addressline1"))
+        if address_line is not None:
+            address_parts.append(self._html_text(address_line))
+        region_texts = []
+        for region in container.xpath(span("contactinfo_region")):
+            region_text = self._html_text(region).rstrip(',').strip()
+            if region_text:
+                region_texts.append(region_text)
+        if region_texts:
+            address_parts.append(", ".join(region_texts))
+        contact["address"] = ", ".join(address_parts) if address_parts else None
+        
+        phone = f"//div[{self._xpath_class('ACA_PhoneNumberLTR')}]"
+        contact["primary_phone"] = self._html_value(container, span("contactinfo_phone1") + phone)
+        contact["cell_phone"] = self._html_value(container, span("contactinfo_phone3") + phone)
+        contact["alternate_phone"] = self._html_value(container, span("contactinfo_phone2") + phone)
+        contact["fax"] = self._html_value(container, span("contactinfo_fax") + phone)
+        
+        contact["email"] = (
+            self._html_value(container, span("contactinfo_email") + "//table//td[not(following-sibling::*)]//td")
+            or self._html_value(container, span("contactinfo_email") + "//td[not(.//table)]")
+        )
+        return contact
+    
+    def _parse_detail_html(self, html_text):
+        """Summary and more details sections from CapDetail HTML, same schema as the browser extractors"""
+        tree = lxml_html.fromstring(html_text)
+        permit_data = {
+            "record_number": self._html_value(tree, "//span[@id='ctl00_PlaceHolderMain_lblPermitNumber']"),
+            "permit_type": self._html_value(tree, "//span[@id='ctl00_PlaceHolderMain_lblPermitType']"),
+            "record_status": self._html_value(tree, "//span[@id='ctl00_PlaceHolderMain_lblRecordStatus']"),
+            "work_location": None,
+            "applicant": None,
+            "licensed_professional": None,
+            "project_description": None,
+        }
+        
+        work_location = self._html_first(tree, "//table[@id='tbl_worklocation']")
+        if work_location is not None:
+            permit_data["work_location"] = self._parse_work_location(
+                [self._html_text(row) or "" for row in work_location.xpath(".//tr")]
+            )
+        
+        applicant_cell = self._html_first(tree, "//span[contains(@id, 'per_permitDetail_label_applicant')]/ancestor::td[1]")
+        if applicant_cell is not None:
+            permit_data["applicant"] = self._parse_contact_html(applicant_cell)
+        
+        lp_table = self._html_first(tree, "//table[@id='tbl_licensedps']")
+        if lp_table is not None:
+            professionals = []
+            for row in lp_table.xpath(".//tr"):
+                info_cell = self._html_first(row, ".//td[count(preceding-sibling::*) = 1]")
+                if info_cell is None:
+                    continue
+                full_text = self._html_text(info_cell)
+                if not full_text or "<<Hide Additional" in full_text or "View Additional" in full_text:
+                    continue
+                phones = [
+                    (self._html_text(self._html_first(phone_div, "./ancestor::tr[1]")) or "", self._html_text(phone_div))
+                    for phone_div in info_cell.xpath(f".//div[{self._xpath_class('ACA_PhoneNumberLTR')}]")
+                ]
+                professional = self._parse_licensed_professional(full_text, phones)
+                if professional:
+                    professionals.append(professional)
+            if len(professionals) == 1:
+                permit_data["licensed_professional"] = professionals[0]
+            elif len(professionals) > 1:
+                permit_data["licensed_professional"] = professionals
+        
+        project_cell = self._html_first(
+            tree,
+            "//span[contains(@id, 'per_permitDetail_label_projectl')]/ancestor::td[1]"
+            f"//table[{self._xpath_class('table_child')}]//td[not(following-sibling::*)]"
+        )
+        if project_cell is not None:
+            permit_data["project_description"] = self._html_text(project_cell)
+        
+        more_details = {}
+        contacts_table = self._html_first(tree, "//table[@id='ctl00_PlaceHolderMain_PermitDetailList1_RelatContactList']")
+        if contacts_table is not None:
+            contacts = [
+                contact for contact in (
+                    self._parse_contact_html(div)
+                    for div in contacts_table.xpath(f".//div[{self._xpath_class('MoreDetail_ItemCol1')}]")
+                )
+                if contact.get("name") or contact.get("business_name")
+            ]
+            if contacts:
+                more_details["related_contacts"] = {"contact_information": contacts}
+        
+        app_info_div = self._html_first(tree, "//div[@id='ctl00_PlaceHolderMain_PermitDetailList1_phPlumbingGroup']")
+        if app_info_div is not None:
+            app_info = self._parse_application_information(self._inner_html(app_info_div))
+            if app_info:
+                more_details["application_information"] = app_info
+        
+        tables_data = []
+        for table in tree.xpath("//tr[@id='trASITList']//table[@cellpadding='0'][@cellspacing='0']"):
+            section_data = {}
+            title = self._html_first(table, f".//div[{self._xpath_class('ACA_TabRow')} and {self._xpath_class('ACA_Title_Text')}]")
+            if title is not None:
+                section_data["section_title"] = self._html_text(title)
+            
+            items = []
+            for item_row in table.xpath(f".//tr[.//div[{self._xpath_class('MoreDetail_Item')}]]"):
+                labels = item_row.xpath(f".//span[{self._xpath_class('ACA_SmLabelBolder')}]")
+                values = item_row.xpath(f".//span[{self._xpath_class('ACA_SmLabel')} and {self._xpath_class('ACA_SmLabel_FontSize')}]")
+                item_data = {}
+                for j, label in enumerate(labels):
+                    if j < len(values):
+                        item_data[self._clean_key(self._html_text(label).rstrip(':'))] = self._html_text(values[j])
+                if item_data:
+                    items.append(item_data)
+            
+            if items:
+                section_data["items"] = items
+                tables_data.append(section_data)
+        
+        if tables_data:
+            more_details["application_information_table"] = tables_data
+        if more_details:
+            permit_data["more_details"] = more_details
+        
+        return permit_data
     
     def _clean_csv_value(self, value):
         """Clean value for CSV by removing newlines and extra spaces"""
@@ -1222,6 +3221,9 @@ class LeeCountyPermitScraper:
             'permit_issued_date': None,
             'application_date': None,
             
+            # "partial" when the details could not be extracted
+            'extraction_status': permit.get('extraction_status'),
+            
             # Link
             'detail_url': self._clean_csv_value(permit.get('detail_url'))
         }
@@ -1337,24 +3339,8 @@ class LeeCountyPermitScraper:
                 logger.warning("No permits to save to CSV")
                 return
             
-            # Define CSV columns
-            csv_columns = [
-                'record_number', 'permit_type', 'status', 'record_status', 
-                'description', 'submittal_type', 'action', 'related_records',
-                'address', 'work_location',
-                'applicant_name', 'applicant_business', 'applicant_address', 
-                'applicant_phone', 'applicant_cell', 'applicant_email',
-                'licensed_professional_name', 'licensed_professional_business', 'licensed_professional_address', 
-                'licensed_professional_license', 'licensed_professional_phone',
-                'project_description', 'job_value', 'commercial_residential', 'type_of_use',
-                'work_area_sqft', 'property_use_type', 'master_plan_num',
-                'total_outstanding', 'total_paid', 'total_fees',
-                'conditions_count', 'current_workflow_step', 'permit_issued_date', 'application_date',
-                'detail_url'
-            ]
-            
             with open(self.csv_file, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=csv_columns, quoting=csv.QUOTE_ALL)
+                writer = csv.DictWriter(f, fieldnames=self.CSV_COLUMNS, quoting=csv.QUOTE_ALL)
                 writer.writeheader()
                 
                 for permit in self.all_permits:
@@ -1368,8 +3354,7 @@ class LeeCountyPermitScraper:
     def save_to_json(self):
         """Save all permit data to JSON"""
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.all_permits, f, indent=2, ensure_ascii=False)
+            self._write_json_array(self.all_permits)
             logger.info(f"Saved {len(self.all_permits)} permits to JSON: {self.output_file}")
             
             # Also save important fields to CSV
@@ -1380,57 +3365,493 @@ class LeeCountyPermitScraper:
         except Exception as e:
             logger.error(f"Error saving to JSON: {str(e)}")
     
-    async def run(self, start_date, end_date, extract_details=False, headless=False):
+    def append_to_stream(self, permits):
+        """Append finished permits to the JSONL and CSV files - each permit is serialized exactly once"""
+        if not permits:
+            return
+        try:
+            with open(self.jsonl_file, 'a', encoding='utf-8') as f:
+                for permit in permits:
+                    f.write(json.dumps(permit, ensure_ascii=False) + '\n')
+            
+            write_header = not self.csv_file.exists() or self.csv_file.stat().st_size == 0
+            with open(self.csv_file, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.CSV_COLUMNS, quoting=csv.QUOTE_ALL)
+                if write_header:
+                    writer.writeheader()
+                for permit in permits:
+                    writer.writerow(self._flatten_permit_for_csv(permit))
+            
+            logger.info(f"Appended {len(permits)} permits to {self.jsonl_file.name} (Total: {self.permit_count})")
+        except Exception as e:
+            logger.error(f"Error appending to stream: {str(e)}")
+    
+    def _write_json_array(self, permits):
+        """Write permits (any iterable) to the JSON file one at a time, returns how many were written"""
+        tmp_file = self.output_file.with_name(self.output_file.name + '.tmp')
+        count = 0
+        contacts = {}
+        with open(tmp_file, 'w', encoding='utf-8') as dst:
+            dst.write('[')
+            for permit in permits:
+                if self.contact_refs:
+                    permit = contacts_to_refs(permit, contacts)
+                # Same layout json.dump(indent=2) produces for the whole list
+                dst.write(',\n' if count else '\n')
+                dst.write(textwrap.indent(json.dumps(permit, indent=2, ensure_ascii=False), '  '))
+                count += 1
+            dst.write('\n]' if count else ']')
+        
+        tmp_file.replace(self.output_file)
+        if self.contact_refs:
+            with open(self.contacts_file, 'w', encoding='utf-8') as f:
+                json.dump(contacts, f, indent=2, ensure_ascii=False)
+            logger.info(f"Saved {len(contacts)} distinct contacts to {self.contacts_file.name}")
+        return count
+    
+    def _read_stream(self):
+        """Yield the permits in the JSONL stream, skipping unreadable lines"""
+        with open(self.jsonl_file, 'r', encoding='utf-8') as src:
+            for line_number, line in enumerate(src, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    logger.warning(f"Skipping unreadable line {line_number} in {self.jsonl_file.name}")
+    
+    def compact_stream_to_json(self):
+        """Rewrite the JSONL stream into the regular JSON array file, one permit at a time"""
+        if not self.jsonl_file.exists():
+            return
+        try:
+            count = self._write_json_array(self._read_stream())
+            logger.info(f"Compacted {count} permits to JSON: {self.output_file}")
+            logger.info(f"All files saved to folder: {self.output_dir}")
+        except Exception as e:
+            logger.error(f"Error compacting stream to JSON: {str(e)}")
+    
+    def export_from_store(self):
+        """Stream the permits in the SQLite store out to the JSON and CSV files"""
+        try:
+            count = self._write_json_array(self.permit_store.iter_permits())
+            logger.info(f"Exported {count} permits from {self.db_file.name} to JSON: {self.output_file}")
+            
+            with open(self.csv_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=self.CSV_COLUMNS, quoting=csv.QUOTE_ALL)
+                writer.writeheader()
+                for permit in self.permit_store.iter_permits():
+                    writer.writerow(self._flatten_permit_for_csv(permit))
+            logger.info(f"Exported {count} permits to CSV: {self.csv_file}")
+            logger.info(f"All files saved to folder: {self.output_dir}")
+        except Exception as e:
+            logger.error(f"Error exporting from database: {str(e)}")
+    
+    def save_to_parquet(self):
+        """Export the saved permits to permits/fees/workflow_steps/contacts/related_records.parquet"""
+        try:
+            counts = export_parquet(self._iter_output_permits(), self.output_dir, self.CSV_COLUMNS, self._flatten_permit_for_csv)
+            logger.info(f"Saved {counts['permits']} permits to Parquet ({counts['fees']} fees, "
+                        f"{counts['workflow_steps']} workflow steps, {counts['contacts']} contacts, "
+                        f"{counts['related_records']} related records)")
+        except Exception as e:
+            logger.error(f"Error saving to Parquet: {str(e)}")
+    
+    def save_checkpoint(self, finished=False):
+        """Persist search range, page position and permit progress so an interrupted run can resume"""
+        if self.permit_store:
+            # Permits are only marked completed in the checkpoint once they are in the database
+            self.permit_store.flush()
+        self.contact_cache.flush()
+        
+        # A page counts as completed once it is listed and none of its permits are still pending
+        for range_key, listed_page in self.listed_pages.items():
+            pending_pages = [page for key, page in self.pending_pages.values() if key == range_key]
+            completed_page = min(pending_pages) - 1 if pending_pages else listed_page
+            self.last_completed_pages[range_key] = max(self.last_completed_pages.get(range_key, 0), completed_page)
+        
+        try:
+            with open(self.completed_log_file, self.completed_log_mode, encoding='utf-8') as f:
+                f.writelines(record_number + '\n' for record_number in self.unlogged_completions)
+            self.unlogged_completions = []
+            self.completed_log_mode = 'a'
+        except Exception as e:
+            logger.error(f"Error saving completed record numbers: {str(e)}")
+        
+        checkpoint = {
+            "start_date": self.search_range[0] if self.search_range else None,
+            "end_date": self.search_range[1] if self.search_range else None,
+            "extract_details": self.extract_details,
+            "shard_by": self.shard_by,
+            "agency": self.agency,
+            "module": self.module,
+            "sections": list(self.sections) if self.sections is not None else None,
+            "last_completed_pages": self.last_completed_pages,
+            "completed_shards": sorted(self.completed_shards),
+            "pending_permits": self.pending_permits,
+            "finished": finished,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        try:
+            # Write to a temp file first so a crash never leaves a half-written checkpoint
+            tmp_file = self.checkpoint_file.with_name(self.checkpoint_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+            tmp_file.replace(self.checkpoint_file)
+        except Exception as e:
+            logger.error(f"Error saving checkpoint: {str(e)}")
+    
+    def _iter_output_permits(self):
+        """Permits saved so far, read from the database or the JSONL stream when there is one"""
+        if self.permit_store:
+            return self.permit_store.iter_permits()
+        if self.stream_output and self.jsonl_file.exists():
+            return self._read_stream()
+        return iter(self.all_permits)
+    
+    def summarize_output(self):
+        """Permit count and extraction status breakdown (read back from disk when permits aren't kept in memory)"""
+        summary = {"permits": 0, "complete": 0, "partial": 0}
+        try:
+            for permit in self.all_permits if self.keep_permits else self._iter_output_permits():
+                summary["permits"] += 1
+                if permit.get("extraction_status") in ("complete", "partial"):
+                    summary[permit["extraction_status"]] += 1
+        except Exception as e:
+            logger.error(f"Error summarizing saved permits: {str(e)}")
+        return summary
+    
+    def _load_saved_permits(self):
+        """Load permits already written by a previous run (JSONL stream first, then the JSON file)"""
+        permits = []
+        if self.permit_store and self.permit_store.count():
+            permits = list(self.permit_store.iter_permits())
+        elif self.jsonl_file.exists():
+            permits = list(self._read_stream())
+        elif self.output_file.exists():
+            with open(self.output_file, 'r', encoding='utf-8') as f:
+                permits = json.load(f)
+            if self.contacts_file.exists():
+                # Saved with contact references
+                with open(self.contacts_file, 'r', encoding='utf-8') as f:
+                    contacts = json.load(f)
+                permits = [resolve_contact_refs(permit, contacts) for permit in permits]
+            if self.stream_output:
+                # Seed the stream so the final compaction keeps the permits saved before
+                with open(self.jsonl_file, 'w', encoding='utf-8') as f:
+                    for permit in permits:
+                        f.write(json.dumps(permit, ensure_ascii=False) + '\n')
+        return permits
+    
+    def load_checkpoint(self):
+        """Restore checkpoint state and the permits already saved on disk"""
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        
+        if checkpoint.get("start_date") and checkpoint.get("end_date"):
+            self.search_range = (checkpoint["start_date"], checkpoint["end_date"])
+        self.extract_details = checkpoint.get("extract_details", False)
+        self.last_completed_pages = checkpoint.get("last_completed_pages", {})
+        self.completed_shards = set(checkpoint.get("completed_shards", []))
+        if "shard_by" in checkpoint:
+            # Keep the sharding the run started with, otherwise shards and page positions don't line up
+            if self.shard_by is not None and self.shard_by != checkpoint["shard_by"]:
+                logger.warning(f"Ignoring shard_by {self.shard_by!r}, the checkpoint was sharded by "
+                               f"{checkpoint['shard_by']!r}")
+            self.shard_by = checkpoint["shard_by"]
+        if checkpoint.get("agency"):
+            # A resumed run searches the portal it started on
+            self._set_agency(checkpoint["agency"], checkpoint.get("module", self.module))
+        if self.sections is None and checkpoint.get("sections") is not None:
+            self.sections = self.normalize_sections(checkpoint["sections"])
+        self.pending_permits = checkpoint.get("pending_permits", {})
+        
+        # Older checkpoints list the completed record numbers themselves
+        self.completed_permit_ids = set(checkpoint.get("completed_record_numbers", []))
+        self.completed_log_mode = 'a'
+        if self.completed_log_file.exists():
+            with open(self.completed_log_file, 'r', encoding='utf-8') as f:
+                # A crash mid-write can leave a truncated last line
+                self.completed_permit_ids.update(line[:-1] for line in f if line.endswith('\n') and line.strip())
+        if not self.keep_permits:
+            # Only the record numbers of the saved permits are kept
+            if not self.permit_store and not self.jsonl_file.exists() and self.output_file.exists():
+                self._load_saved_permits()  # seeds the stream from the JSON file
+            for permit in self._iter_output_permits():
+                self.permit_count += 1
+                if permit.get("record_number"):
+                    self.completed_permit_ids.add(permit["record_number"])
+        else:
+            self.all_permits = self._load_saved_permits()
+            self.permit_count = len(self.all_permits)
+            self.completed_permit_ids.update(p["record_number"] for p in self.all_permits if p.get("record_number"))
+        
+        # Pending permits that made it to disk before the crash are done
+        for record_number in list(self.pending_permits):
+            if record_number in self.completed_permit_ids:
+                del self.pending_permits[record_number]
+        
+        self.processed_permit_ids = set(self.completed_permit_ids) | set(self.pending_permits)
+        
+        if checkpoint.get("finished"):
+            logger.warning(f"Checkpoint in {self.output_dir} is marked finished - only new permits will be added")
+        logger.info(f"Resuming from {self.output_dir}: {len(self.completed_permit_ids)} permits done, "
+                    f"{len(self.pending_permits)} pending, {len(self.last_completed_pages)} searches in progress")
+    
+    def save_har_fixture(self, start_date, end_date):
+        """Write the search a HAR capture was made for next to it, so the run can be replayed (see benchmark.py)"""
+        self.record_har.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "har": self.record_har.name,
+            "start_date": start_date,
+            "end_date": end_date,
+            "sections": list(self.sections) if self.sections is not None else None,
+            "shard_by": self.shard_by,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(self.record_har.with_suffix(".json"), 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, indent=2)
+    
+    async def run(self, start_date=None, end_date=None, extract_details=False, headless=False, sections=None):
+        """Launch the browser, scrape the date range in it and close it again"""
         async with async_playwright() as p:
+            launch_options = {}
+            if self.record_har:
+                self.save_har_fixture(start_date, end_date)
+                launch_options = {"record_har_path": str(self.record_har), "record_har_content": "embed"}
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=str(self.user_data_dir),
+                channel="chrome",
+                headless=headless,
+                no_viewport=True,
+                **launch_options
+            )
             try:
-                self.context = await p.chromium.launch_persistent_context(
-                    user_data_dir=str(self.user_data_dir),
-                    channel="chrome",
-                    headless=headless,
-                    no_viewport=True,
-                )
-                
-                page = self.context.pages[0] if self.context.pages else await self.context.new_page()
-                await self.search_permits(page, start_date, end_date)
-                await self.scrape_permits_page_by_page(page, extract_details)
+                return await self.run_in_context(context, start_date, end_date, extract_details, sections)
             finally:
                 # Always close the context properly
-                if self.context:
-                    try:
-                        await self.context.close()
-                        logger.info("Browser context closed successfully")
-                    except Exception as e:
-                        logger.warning(f"Error closing context: {e}")
-                    self.context = None
-                
-                # Save data even if stopped
-                if self.all_permits:
-                    logger.info(f"Saving {len(self.all_permits)} permits collected so far...")
-                    self.save_to_json()
-            
-            # Print completion summary
-            print(f"\n{'='*50}")
-            status_msg = "Scraping complete!" if not self.should_stop else "Scraping stopped!"
-            print(f"{status_msg} Total permits: {len(self.all_permits)}")
-            print(f"Output folder: {self.output_dir}")
-            print(f"  - JSON (all data): {self.output_file.name}")
-            print(f"  - CSV (key fields): {self.csv_file.name}")
-            print(f"{'='*50}\n")
-            
-            return self.all_permits
-
+                try:
+                    await context.close()
+                    logger.info("Browser context closed successfully")
+                except Exception as e:
+                    logger.warning(f"Error closing context: {e}")
+    
+    async def run_in_context(self, context, start_date=None, end_date=None, extract_details=False, sections=None,
+                             shared=False):
+        """Scrape the date range in an already open browser context, which is left open afterwards.
+        With shared=True other scrapers (e.g. other agencies) use the same context at the same time."""
+        if sections is not None:
+            self.sections = self.normalize_sections(sections)
+        if self.resuming:
+            # Resumed runs repeat the original search unless told otherwise
+            if self.search_range:
+                start_date = start_date or self.search_range[0]
+                end_date = end_date or self.search_range[1]
+            extract_details = self.extract_details or extract_details
+        if not start_date or not end_date:
+            raise ValueError("start_date and end_date are required")
+        if extract_details and self.sections == ():
+            logger.info("No detail sections selected - collecting search results only")
+            extract_details = False
+        if self.http_fast_path and extract_details and self._wants_tabs():
+            logger.warning("HTTP fast path only helps when no detail tabs are collected (--sections summary,more_details) "
+                           "- the tabs need the browser, so detail pages are loaded in the browser only")
+        if self.follow_related and not (extract_details and self.wants_section("related_records")):
+            logger.warning("Following related records needs the related_records section - not crawling them")
+            self.follow_related = False
+        
+        self.search_range = (start_date, end_date)
+        self.extract_details = extract_details
+        self.shared_context = shared
+        finished = False
+        
+        try:
+            self.context = context
+            await self.setup_resource_blocking(self.context)
+            if self.replay_har:
+                # Registered last so it is matched before the blocking route; anything not captured is aborted
+                await self.context.route_from_har(str(self.replay_har), not_found="abort")
+                logger.info(f"Replaying portal responses from {self.replay_har}")
+            
+            if extract_details:
+                self.start_detail_workers(self.context)
+            
+            # Finish permits that were queued but not saved when the previous run stopped
+            if self.pending_permits:
+                logger.info(f"Resuming {len(self.pending_permits)} pending permits from checkpoint")
+                for record_number, search_data in list(self.pending_permits.items()):
+                    if extract_details:
+                        await self.detail_queue.put((search_data, record_number))
+                    else:
+                        self.complete_permit(search_data, record_number)
+            
+            if self.shard_by:
+                await self.scrape_sharded(start_date, end_date, extract_details)
+            else:
+                # A shared context's first tab belongs to nobody in particular
+                page = self.context.pages[0] if self.context.pages and not shared else await self._open_page(self.context)
+                if await self.search_permits(page, start_date, end_date):
+                    await self.scrape_permits_page_by_page(page, extract_details)
+                if shared:
+                    await page.close()
+            
+            # Listing is done, let the workers drain what is still queued
+            await self.finish_detail_workers()
+            if extract_details:
+                await self.retry_failed_permits(self.context)
+                # Related records found by permits that only succeeded on retry
+                while self.related_overflow and not self.should_stop:
+                    self.start_detail_workers(self.context)
+                    await self.finish_detail_workers()
+                    await self.retry_failed_permits(self.context)
+            finished = not self.should_stop
+        finally:
+            if self.detail_workers:
+                await self.stop_detail_workers()
+            await self.teardown_resource_blocking(self.context)
+            self.context = None
+            
+            self.log_resource_summary()
+            self.waits.log_summary()
+            if self.permit_index:
+                stats = self.recrawl_stats
+                logger.info(f"Change detection: {stats['new']} new, {stats['changed']} changed, "
+                            f"{stats['unchanged']} unchanged (details reused), "
+                            f"{stats['details_changed']} with new details")
+                self.permit_index.close()
+            cache = self.contact_cache
+            if cache.hits or cache.conn:
+                logger.info(f"Contact cache: {len(cache.contacts)} contacts, {cache.hits} lookups answered "
+                            f"from cache, {cache.misses} extracted")
+            cache.close()
+            
+            # Save data even if stopped
+            if self.permit_store:
+                self.export_from_store()
+            elif self.stream_output:
+                self.compact_stream_to_json()
+            elif self.all_permits:
+                logger.info(f"Saving {len(self.all_permits)} permits collected so far...")
+                self.save_to_json()
+            if self.parquet:
+                self.save_to_parquet()
+            
+            self.save_checkpoint(finished=finished)
+            # Read back from disk, nothing else holds the permits in bounded memory mode or with a database
+            summary = self.summarize_output()
+            try:
+                self.metrics.save(self.metrics_file, self.waits, getattr(self.semaphore, "decisions", None),
+                                  self.resource_report())
+            except Exception as e:
+                logger.error(f"Error saving run metrics: {str(e)}")
+            if self.permit_store:
+                self.permit_store.close()
+            if not finished:
+                logger.info(f"Run can be resumed with: --resume \"{self.output_dir}\"")
+        
+        # Print completion summary
+        print(f"\n{'='*50}")
+        status_msg = "Scraping complete!" if not self.should_stop else "Scraping stopped!"
+        print(f"{status_msg} Total permits: {summary['permits']}"
+              + (f" ({summary['partial']} partial)" if summary['partial'] else ""))
+        print(f"Output folder: {self.output_dir}")
+        print(f"  - JSON (all data): {self.output_file.name}")
+        print(f"  - CSV (key fields): {self.csv_file.name}")
+        if self.stream_output:
+            print(f"  - JSONL (stream): {self.jsonl_file.name}")
+        print(f"{'='*50}\n")
+        
+        return self.all_permits
 
 async def main():
+    parser = argparse.ArgumentParser(description="Scrape permits from Lee County's Accela portal")
+    parser.add_argument("--start-date", help="Start date (mm/dd/yyyy), default 11/06/2025")
+    parser.add_argument("--end-date", help="End date (mm/dd/yyyy), default today")
+    parser.add_argument("--resume", metavar="FOLDER", help="Resume an interrupted run from its output folder")
+    parser.add_argument("--agency", default=DEFAULT_AGENCY,
+                        help=f"Accela Citizen Access agency code, as in the portal URL (default: {DEFAULT_AGENCY})")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help=f"Agency module to search (default: {DEFAULT_MODULE})")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Permits processed simultaneously")
+    parser.add_argument("--headless", action="store_true", help="Run the browser hidden")
+    parser.add_argument("--shard-by", choices=["day", "week"], help="Split the date range into parallel searches")
+    parser.add_argument("--max-searches", type=int, default=2, help="Shard searches running at once")
+    parser.add_argument("--block-resources", choices=list(RESOURCE_BLOCK_PROFILES), default="standard",
+                        help="Which non-essential requests to abort (default: standard)")
+    parser.add_argument("--http-fast-path", action="store_true",
+                        help="Fetch CapDetail pages over HTTP instead of the browser when only summary/more_details "
+                             "are collected (needs lxml)")
+    parser.add_argument("--sections", help=f"Comma-separated detail sections to collect (default: all of {','.join(DETAIL_SECTIONS)})")
+    parser.add_argument("--parallel-tabs", action="store_true",
+                        help="Read the detail tab groups of a permit in parallel pages when concurrency slots are free")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only extract details of new permits or permits whose search row changed since the last run")
+    parser.add_argument("--index-file", default="output/permit_index.db",
+                        help="Permit index used by --incremental (default: output/permit_index.db)")
+    parser.add_argument("--database", action="store_true",
+                        help="Save permits to a SQLite database (permits_data.db) and export JSON/CSV from it")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adjust concurrency to the portal's latency and error rate, starting at --max-concurrent")
+    parser.add_argument("--min-concurrent", type=int, default=1, help="Lowest concurrency --adaptive may use")
+    parser.add_argument("--max-concurrent-limit", type=int,
+                        help="Highest concurrency --adaptive may use (default: twice --max-concurrent)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also export typed Parquet files: permits, fees, workflow_steps, contacts, related_records")
+    parser.add_argument("--bounded-memory", action="store_true",
+                        help="Keep only record numbers in memory; finished permits are read back from disk when needed")
+    parser.add_argument("--follow-related", action="store_true",
+                        help="Also extract the related records of every permit (even outside the date range)")
+    parser.add_argument("--related-depth", type=int, default=1,
+                        help="How many related-record links --follow-related follows from a searched permit (default: 1)")
+    parser.add_argument("--contact-cache", metavar="FILE",
+                        help="Keep the contact/licensed professional cache in this SQLite file between runs")
+    parser.add_argument("--contact-refs", action="store_true",
+                        help="Write each contact once to contacts.json and reference it from the JSON permits")
+    parser.add_argument("--record-har", metavar="FILE",
+                        help="Capture the portal responses of this run to a HAR file (replay with benchmark.py)")
+    parser.add_argument("--per-element-extraction", action="store_true",
+                        help="Read detail pages element by element instead of one script per tab")
+    args = parser.parse_args()
+    
     scraper = LeeCountyPermitScraper(
         output_file="permits_data.json",
         user_data_dir="./chrome_profile",
-        max_concurrent=5
+        max_concurrent=args.max_concurrent,
+        stream_output=True,
+        resume_dir=args.resume,
+        shard_by=args.shard_by,
+        max_concurrent_searches=args.max_searches,
+        bulk_extraction=not args.per_element_extraction,
+        resource_profile=args.block_resources,
+        http_fast_path=args.http_fast_path,
+        sections=args.sections,
+        parallel_tabs=args.parallel_tabs,
+        index_file=args.index_file if args.incremental else None,
+        use_database=args.database,
+        adaptive_concurrency=args.adaptive,
+        min_concurrent=args.min_concurrent,
+        max_concurrent_limit=args.max_concurrent_limit,
+        record_har=args.record_har,
+        parquet=args.parquet,
+        contact_cache_file=args.contact_cache,
+        contact_refs=args.contact_refs,
+        agency=args.agency,
+        module=args.module,
+        bounded_memory=args.bounded_memory,
+        follow_related=args.follow_related,
+        related_max_depth=args.related_depth
     )
     
-    start_date = "11/06/2025"
-    end_date = datetime.now().strftime("%m/%d/%Y")
+    if args.resume:
+        # Dates default to the ones stored in the checkpoint
+        start_date = args.start_date
+        end_date = args.end_date
+    else:
+        start_date = args.start_date or "11/06/2025"
+        end_date = args.end_date or datetime.now().strftime("%m/%d/%Y")
     
-    await scraper.run(start_date, end_date, extract_details=True)
+    await scraper.run(start_date, end_date, extract_details=True, headless=args.headless)
 
 
 if __name__ == "__main__":
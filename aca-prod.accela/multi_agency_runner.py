@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from lee_county_permit_scraper import LeeCountyPermitScraper, DEFAULT_MODULE, RESOURCE_BLOCK_PROFILES
+
+logger = logging.getLogger('main')
+
+
+def parse_agency(value):
+    """'AGENCY' or 'AGENCY:Module' -> agency config"""
+    agency, _, module = value.partition(":")
+    return {"agency": agency.strip(), "module": module.strip() or DEFAULT_MODULE}
+
+
+def load_agencies(config_file):
+    """Agency configs from a JSON list: agency, plus optional module, max_concurrent, sections, selectors, ..."""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        agencies = json.load(f)
+    if not isinstance(agencies, list) or not all(isinstance(a, dict) and a.get("agency") for a in agencies):
+        raise ValueError(f"{config_file} must hold a list of objects with an 'agency' key")
+    return agencies
+
+
+async def run_agencies(agencies, start_date, end_date, headless=False, user_data_dir="./chrome_profile",
+                       output_dir=None, **scraper_options):
+    """Scrape several agencies at once in one browser, each with its own concurrency limit and output folder"""
+    codes = [config["agency"] for config in agencies]
+    duplicates = sorted({code for code in codes if codes.count(code) > 1})
+    if duplicates:
+        raise ValueError(f"agencies must be listed once, got {duplicates!r} more than once")
+    if output_dir is None:
+        output_dir = Path("output") / f"agencies_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    output_dir = Path(output_dir)
+    
+    scrapers = []
+    for config in agencies:
+        options = {**scraper_options, **config}
+        scrapers.append(LeeCountyPermitScraper(
+            output_file="permits_data.json",
+            user_data_dir=user_data_dir,
+            stream_output=True,
+            output_dir=output_dir / options["agency"],
+            **options
+        ))
+    
+    logger.info(f"Scraping {', '.join(f'{s.agency} ({s.module}, {s.max_concurrent} at a time)' for s in scrapers)} "
+                f"from {start_date} to {end_date}")
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=str(user_data_dir),
+            channel="chrome",
+            headless=headless,
+            no_viewport=True,
+        )
+        try:
+            results = await asyncio.gather(
+                *(scraper.run_in_context(context, start_date, end_date, extract_details=True, shared=True)
+                  for scraper in scrapers),
+                return_exceptions=True
+            )
+        finally:
+            try:
+                await context.close()
+                logger.info("Browser context closed successfully")
+            except Exception as e:
+                logger.warning(f"Error closing context: {e}")
+    
+    permits = {}
+    for scraper, result in zip(scrapers, results):
+        if isinstance(result, Exception):
+            logger.error(f"{scraper.agency} failed: {str(result)} - resume it with: "
+                         f"lee_county_permit_scraper.py --resume \"{scraper.output_dir}\"")
+        else:
+            permits[scraper.agency] = result
+            logger.info(f"{scraper.agency}: {scraper.permit_count} permits in {scraper.output_dir}")
+    return permits
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Scrape several Accela Citizen Access agencies at once")
+    parser.add_argument("--agency", action="append", type=parse_agency, default=[], metavar="AGENCY[:MODULE]",
+                        help=f"Agency code as in the portal URL, optionally with its module (default {DEFAULT_MODULE}); repeat for more agencies")
+    parser.add_argument("--config", metavar="FILE",
+                        help="JSON list of agencies with per-agency options (module, max_concurrent, sections, selectors, ...)")
+    parser.add_argument("--start-date", required=True, help="Start date (mm/dd/yyyy)")
+    parser.add_argument("--end-date", help="End date (mm/dd/yyyy), default today")
+    parser.add_argument("--output-dir", help="Parent folder of the per-agency folders (default: output/agencies_<timestamp>)")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Permits processed simultaneously per agency")
+    parser.add_argument("--headless", action="store_true", help="Run the browser hidden")
+    parser.add_argument("--block-resources", choices=list(RESOURCE_BLOCK_PROFILES), default="standard",
+                        help="Which non-essential requests to abort (default: standard)")
+    parser.add_argument("--sections", help="Comma-separated detail sections to collect (default: all)")
+    args = parser.parse_args()
+    
+    agencies = (load_agencies(args.config) if args.config else []) + args.agency
+    if not agencies:
+        parser.error("give at least one --agency or a --config file")
+    
+    await run_agencies(
+        agencies,
+        args.start_date,
+        args.end_date or datetime.now().strftime("%m/%d/%Y"),
+        headless=args.headless,
+        output_dir=args.output_dir,
+        max_concurrent=args.max_concurrent,
+        resource_profile=args.block_resources,
+        sections=args.sections,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import queue
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from lee_county_permit_scraper import LeeCountyPermitScraper, RESOURCE_BLOCK_PROFILES, DETAIL_SECTIONS
+
+logger = logging.getLogger('main')
+
+# Chrome refuses to open a profile that still has another browser's lock files
+PROFILE_IGNORE = shutil.ignore_patterns("Singleton*", "lockfile", "*.lock", "Cache", "Code Cache", "GPUCache")
+
+
+def split_date_range(start_date, end_date, parts):
+    """Split an mm/dd/yyyy date range into at most `parts` contiguous sub-ranges of whole days"""
+    start = datetime.strptime(start_date, "%m/%d/%Y")
+    end = datetime.strptime(end_date, "%m/%d/%Y")
+    if end < start:
+        raise ValueError(f"end_date must not be before start_date, got {start_date!r} - {end_date!r}")
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    
+    ranges = []
+    chunk_start = start
+    for i in range(parts):
+        # Spread the remainder over the first chunks so sizes differ by at most one day
+        chunk_days = days // parts + (1 if i < days % parts else 0)
+        chunk_end = chunk_start + timedelta(days=chunk_days - 1)
+        ranges.append((chunk_start.strftime("%m/%d/%Y"), chunk_end.strftime("%m/%d/%Y")))
+        chunk_start = chunk_end + timedelta(days=1)
+    return ranges
+
+
+def copy_profile(user_data_dir, target):
+    """Give a worker its own copy of the browser profile (cookies, logins) so browsers don't share a lock"""
+    source = Path(user_data_dir)
+    target = Path(target)
+    if target.exists():
+        return target
+    if source.exists():
+        shutil.copytree(source, target, ignore=PROFILE_IGNORE)
+    else:
+        target.mkdir(parents=True)
+    return target
+
+
+def _worker_main(index, start_date, end_date, worker_dir, profile_dir, results, scraper_options, headless):
+    """Run one scraper over its date range in this process and send every finished permit to the coordinator"""
+    logging.basicConfig(level=logging.INFO, format=f'%(asctime)s - worker {index} - %(levelname)s - %(message)s',
+                        force=True)
+    try:
+        scraper = LeeCountyPermitScraper(
+            output_file="permits_data.json",
+            user_data_dir=profile_dir,
+            stream_output=True,
+            output_dir=worker_dir,
+            on_permit=lambda permit: results.put(("permit", index, permit)),
+            **scraper_options
+        )
+        asyncio.run(scraper.run(start_date, end_date, extract_details=True, headless=headless))
+        results.put(("done", index, scraper.permit_count))
+    except KeyboardInterrupt:
+        results.put(("error", index, "interrupted"))
+    except Exception as e:
+        results.put(("error", index, str(e)))
+
+
+class MultiProcessCoordinator:
+    """Splits a date range across N browser processes and merges their permits into one output folder"""
+    
+    def __init__(self, workers=2, user_data_dir="./chrome_profile", output_dir=None, headless=False, **scraper_options):
+        self.workers = workers
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        self.scraper_options = scraper_options
+        if output_dir is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = Path("output") / f"scrape_{timestamp}"
+        # Merged output uses the same files as a single-process run
+        self.merger = LeeCountyPermitScraper(output_file="permits_data.json", stream_output=True, output_dir=output_dir,
+                                             bounded_memory=scraper_options.get("bounded_memory", False))
+        self.output_dir = self.merger.output_dir
+        self.workers_dir = self.output_dir / "workers"
+        self.duplicates = 0
+    
+    def _merge(self, permit):
+        record_number = permit.get("record_number")
+        if record_number and record_number in self.merger.completed_permit_ids:
+            self.duplicates += 1
+            return
+        self.merger.complete_permit(permit, record_number)
+        if self.merger.permit_count % 100 == 0:
+            self.merger.save_checkpoint()
+    
+    def _drain(self, results, timeout=None):
+        """Merge one queued permit, returns False once the queue is empty"""
+        try:
+            kind, index, payload = results.get(timeout=timeout) if timeout else results.get_nowait()
+        except queue.Empty:
+            return False
+        if kind == "permit":
+            self._merge(payload)
+        return True
+    
+    def run(self, start_date, end_date):
+        ranges = split_date_range(start_date, end_date, self.workers)
+        self.merger.search_range = (start_date, end_date)
+        self.merger.extract_details = True
+        logger.info(f"Starting {len(ranges)} worker processes: "
+                    f"{', '.join(f'{start}-{end}' for start, end in ranges)}")
+        
+        results = multiprocessing.Queue()
+        processes = []
+        for index, (range_start, range_end) in enumerate(ranges):
+            worker_dir = self.workers_dir / f"worker_{index}"
+            profile_dir = copy_profile(self.user_data_dir, worker_dir / "chrome_profile")
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, range_start, range_end, str(worker_dir), str(profile_dir), results,
+                      self.scraper_options, self.headless),
+                name=f"scraper-worker-{index}",
+            )
+            process.start()
+            processes.append(process)
+        
+        running = set(range(len(processes)))
+        failed = {}
+        try:
+            while running:
+                try:
+                    kind, index, payload = results.get(timeout=1)
+                except queue.Empty:
+                    # A worker that died without reporting (e.g. killed) must not hang the merge
+                    for index in list(running):
+                        if not processes[index].is_alive():
+                            running.discard(index)
+                            failed[index] = f"exited with code {processes[index].exitcode}"
+                    continue
+                if kind == "permit":
+                    self._merge(payload)
+                elif kind == "done":
+                    running.discard(index)
+                    logger.info(f"Worker {index} finished with {payload} permits")
+                else:
+                    running.discard(index)
+                    failed[index] = payload
+        except KeyboardInterrupt:
+            logger.info("Stopping - waiting for workers to save their progress...")
+        finally:
+            # Keep draining while the workers shut down, a process can't exit with unsent queue items
+            deadline = time.monotonic() + 60
+            while any(process.is_alive() for process in processes) and time.monotonic() < deadline:
+                self._drain(results, timeout=0.5)
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            # Permits sent just before a worker exited
+            while self._drain(results):
+                pass
+            
+            for index, reason in failed.items():
+                logger.error(f"Worker {index} ({ranges[index][0]}-{ranges[index][1]}) failed: {reason} - "
+                             f"resume it with: --resume \"{self.workers_dir / f'worker_{index}'}\"")
+            finished = not failed and not running
+            self.merger.compact_stream_to_json()
+            self.merger.save_checkpoint(finished=finished)
+        
+        logger.info(f"Merged {self.merger.permit_count} permits from {len(ranges)} workers "
+                    f"({self.duplicates} duplicates dropped) into {self.output_dir}")
+        return self.merger.permit_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape a large date range with several browser processes at once")
+    parser.add_argument("--start-date", required=True, help="Start date (mm/dd/yyyy)")
+    parser.add_argument("--end-date", help="End date (mm/dd/yyyy), default today")
+    parser.add_argument("--workers", type=int, default=2, help="Browser processes, each with its own profile copy")
+    parser.add_argument("--user-data-dir", default="./chrome_profile", help="Browser profile copied for every worker")
+    parser.add_argument("--output-dir", help="Merged output folder (default: output/scrape_<timestamp>)")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Permits processed simultaneously per worker")
+    parser.add_argument("--headless", action="store_true", help="Run the browsers hidden")
+    parser.add_argument("--shard-by", choices=["day", "week"], help="Split each worker's range into parallel searches")
+    parser.add_argument("--block-resources", choices=list(RESOURCE_BLOCK_PROFILES), default="standard",
+                        help="Which non-essential requests to abort (default: standard)")
+    parser.add_argument("--http-fast-path", action="store_true",
+                        help="Fetch CapDetail pages over HTTP when only summary/more_details are collected (needs lxml)")
+    parser.add_argument("--sections", help=f"Comma-separated detail sections to collect (default: all of {','.join(DETAIL_SECTIONS)})")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adjust each worker's concurrency to the portal's latency and error rate")
+    parser.add_argument("--bounded-memory", action="store_true",
+                        help="Keep only record numbers in memory in the workers and the merger")
+    args = parser.parse_args()
+    
+    coordinator = MultiProcessCoordinator(
+        workers=args.workers,
+        user_data_dir=args.user_data_dir,
+        output_dir=args.output_dir,
+        headless=args.headless,
+        max_concurrent=args.max_concurrent,
+        shard_by=args.shard_by,
+        resource_profile=args.block_resources,
+        http_fast_path=args.http_fast_path,
+        sections=args.sections,
+        adaptive_concurrency=args.adaptive,
+        bounded_memory=args.bounded_memory,
+    )
+    coordinator.run(args.start_date, args.end_date or datetime.now().strftime("%m/%d/%Y"))
+
+
+if __name__ == "__main__":
+    main()
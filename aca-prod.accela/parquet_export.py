@@ -0,0 +1,177 @@
+import re
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+PARQUET_AVAILABLE = pa is not None
+
+from permit_store import (
+    CONTACT_COLUMNS, WORKFLOW_STEP_COLUMNS, as_list, as_text, parse_date, permit_contacts, permit_fees,
+    permit_workflow_steps,
+)
+
+CENTS = Decimal("0.01")
+
+# Typed permit columns, everything else in the CSV row is a string
+PERMIT_DECIMAL_COLUMNS = ("job_value", "total_outstanding", "total_paid", "total_fees")
+PERMIT_DATE_COLUMNS = ("permit_issued_date", "application_date")
+RELATED_RECORD_COLUMNS = (
+    "related_record_number", "related_record_type", "related_project_name", "related_date", "related_detail_url",
+)
+
+
+def parse_amount(value):
+    """'$1,234.00' or '($5.00)' -> Decimal, None if there is no amount"""
+    if value is None or isinstance(value, Decimal):
+        return value
+    text = str(value).strip()
+    negative = text.startswith("(") and text.endswith(")") or text.startswith("-")
+    digits = re.sub(r'[^0-9.]', '', text)
+    if not digits:
+        return None
+    try:
+        amount = Decimal(digits).quantize(CENTS)
+    except InvalidOperation:
+        return None
+    return -amount if negative else amount
+
+
+def _key_fields():
+    return [("record_number", pa.string()), ("position", pa.int32())]
+
+
+def _schemas(csv_columns):
+    amount = pa.decimal128(14, 2)
+    permit_fields = []
+    for column in csv_columns:
+        if column in PERMIT_DECIMAL_COLUMNS:
+            permit_fields.append((column, amount))
+        elif column in PERMIT_DATE_COLUMNS:
+            permit_fields.append((column, pa.date32()))
+        elif column == "conditions_count":
+            permit_fields.append((column, pa.int32()))
+        else:
+            permit_fields.append((column, pa.string()))
+    return {
+        "permits": pa.schema(permit_fields),
+        "fees": pa.schema(_key_fields() + [
+            ("kind", pa.string()), ("date", pa.date32()), ("invoice_number", pa.string()), ("amount", amount),
+        ]),
+        "workflow_steps": pa.schema(_key_fields() + [
+            ("workflow", pa.string()), ("due_date", pa.date32()), ("assigned_to", pa.string()),
+            ("marked_as", pa.string()), ("marked_date", pa.date32()), ("marked_by", pa.string()),
+        ]),
+        "contacts": pa.schema(_key_fields() + [("role", pa.string())]
+                              + [(column, pa.string()) for column in CONTACT_COLUMNS]),
+        "related_records": pa.schema(_key_fields() + [
+            ("related_record_number", pa.string()), ("related_record_type", pa.string()),
+            ("related_project_name", pa.string()), ("related_date", pa.date32()), ("related_detail_url", pa.string()),
+        ]),
+    }
+
+
+def _permit_row(row):
+    typed = {}
+    for column, value in row.items():
+        if column in PERMIT_DECIMAL_COLUMNS:
+            typed[column] = parse_amount(value)
+        elif column in PERMIT_DATE_COLUMNS:
+            typed[column] = parse_date(value)
+        elif column == "conditions_count":
+            typed[column] = int(value) if value is not None else None
+        else:
+            typed[column] = None if value is None else str(value)
+    return typed
+
+
+def _child_rows(permit):
+    record_number = permit.get("record_number")
+    rows = {"fees": [], "workflow_steps": [], "contacts": [], "related_records": []}
+    
+    positions = {}
+    for kind, fee in permit_fees(permit):
+        positions[kind] = positions.get(kind, -1) + 1
+        rows["fees"].append({
+            "record_number": record_number, "position": positions[kind], "kind": kind,
+            "date": parse_date(fee.get("date")), "invoice_number": as_text(fee.get("invoice_number")),
+            "amount": parse_amount(fee.get("amount")),
+        })
+    
+    for position, (workflow, step) in enumerate(permit_workflow_steps(permit)):
+        step_row = {"record_number": record_number, "position": position, "workflow": workflow}
+        for column in WORKFLOW_STEP_COLUMNS:
+            value = step.get(column)
+            step_row[column] = parse_date(value) if column.endswith("_date") else as_text(value)
+        rows["workflow_steps"].append(step_row)
+    
+    for position, (role, contact) in enumerate(permit_contacts(permit)):
+        contact_row = {"record_number": record_number, "position": position, "role": role}
+        contact_row.update((column, as_text(contact.get(column))) for column in CONTACT_COLUMNS)
+        rows["contacts"].append(contact_row)
+    
+    for position, record in enumerate(as_list(permit.get("related_records_detail"))):
+        related_row = {"record_number": record_number, "position": position}
+        related_row.update((column, record.get(column)) for column in RELATED_RECORD_COLUMNS)
+        related_row["related_date"] = parse_date(related_row["related_date"])
+        rows["related_records"].append(related_row)
+    return rows
+
+
+class ParquetExporter:
+    """Writes permits plus fees/workflow_steps/contacts/related_records as typed Parquet files, in row groups"""
+    
+    def __init__(self, output_dir, csv_columns, flatten, row_group_size=5000):
+        if pa is None:
+            raise ImportError("pyarrow is required for the Parquet export (pip install pyarrow)")
+        self.output_dir = Path(output_dir)
+        self.flatten = flatten
+        self.row_group_size = row_group_size
+        self.schemas = _schemas(csv_columns)
+        self.files = {table: self.output_dir / f"{table}.parquet" for table in self.schemas}
+        self.writers = {}
+        self.buffers = {table: [] for table in self.schemas}
+        self.counts = {table: 0 for table in self.schemas}
+    
+    def _write(self, table):
+        rows = self.buffers[table]
+        if not rows:
+            return
+        if table not in self.writers:
+            self.writers[table] = pq.ParquetWriter(str(self.files[table]), self.schemas[table], compression="zstd")
+        self.writers[table].write_table(pa.Table.from_pylist(rows, schema=self.schemas[table]))
+        self.counts[table] += len(rows)
+        self.buffers[table] = []
+    
+    def add(self, permit):
+        self.buffers["permits"].append(_permit_row(self.flatten(permit)))
+        for table, rows in _child_rows(permit).items():
+            self.buffers[table].extend(rows)
+        for table, rows in self.buffers.items():
+            if len(rows) >= self.row_group_size:
+                self._write(table)
+    
+    def close(self):
+        """Write what is buffered and finish the files; tables without rows still get an empty file"""
+        for table in self.schemas:
+            self._write(table)
+            if table not in self.writers:
+                pq.write_table(self.schemas[table].empty_table(), str(self.files[table]), compression="zstd")
+            else:
+                self.writers[table].close()
+        self.writers = {}
+        return self.counts
+
+
+def export_parquet(permits, output_dir, csv_columns, flatten):
+    """Export an iterable of permits, returns the number of rows written per table"""
+    exporter = ParquetExporter(output_dir, csv_columns, flatten)
+    try:
+        for permit in permits:
+            exporter.add(permit)
+    finally:
+        counts = exporter.close()
+    return counts
@@ -0,0 +1,464 @@
+import hashlib
+import json
+import re
+import sqlite3
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+DATE_PATTERN = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+
+def _hash(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def row_fingerprint(search_data):
+    """Hash of the search row fields that change when a permit moves along (status, action, related records)"""
+    return _hash([search_data.get("status"), search_data.get("action"), search_data.get("related_records")])
+
+
+class PermitIndex:
+    """record_number -> row fingerprint and last extracted details, kept between runs for change detection"""
+    
+    def __init__(self, db_file):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS permit_index (
+                record_number TEXT PRIMARY KEY,
+                row_fingerprint TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                details_hash TEXT NOT NULL,
+                details TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    def lookup(self, record_number):
+        """Stored entry for a permit, or None if it was never extracted"""
+        row = self.conn.execute(
+            "SELECT row_fingerprint, sections, details_hash, details FROM permit_index WHERE record_number = ?",
+            (record_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "row_fingerprint": row[0],
+            "sections": row[1],
+            "details_hash": row[2],
+            "details": json.loads(row[3]),
+        }
+    
+    def update(self, record_number, fingerprint, sections, permit, details):
+        """Store the latest permit, returns True if its details (the non search row part) differ from the stored ones"""
+        details_hash = _hash(details)
+        previous = self.conn.execute(
+            "SELECT details_hash FROM permit_index WHERE record_number = ?", (record_number,)
+        ).fetchone()
+        self.conn.execute(
+            """
+            INSERT INTO permit_index (record_number, row_fingerprint, sections, details_hash, details, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(record_number) DO UPDATE SET
+                row_fingerprint = excluded.row_fingerprint,
+                sections = excluded.sections,
+                details_hash = excluded.details_hash,
+                details = excluded.details,
+                updated_at = excluded.updated_at
+            """,
+            (record_number, fingerprint, sections, details_hash, json.dumps(permit, ensure_ascii=False),
+             datetime.now().isoformat(timespec="seconds"))
+        )
+        self.conn.commit()
+        return previous is None or previous[0] != details_hash
+    
+    def close(self):
+        self.conn.close()
+
+
+PERMIT_COLUMNS = (
+    "record_number", "permit_type", "status", "record_status", "description", "submittal_type", "action",
+    "related_records", "address", "project_description", "total_outstanding", "total_paid", "extraction_status",
+    "detail_url",
+)
+CONTACT_COLUMNS = ("name", "business_name", "contact_id", "address", "primary_phone", "cell_phone", "email", "license")
+FEE_COLUMNS = ("date", "invoice_number", "amount")
+WORKFLOW_STEP_COLUMNS = ("due_date", "assigned_to", "marked_as", "marked_date", "marked_by")
+CONDITION_COLUMNS = ("group_name", "type", "title", "description", "status", "date")
+# Stored as YYYY-MM-DD, so they compare and sort as dates
+DATE_COLUMNS = {"fees": ("date",), "workflow_steps": ("due_date", "marked_date"), "conditions": ("date",)}
+
+
+def as_text(value):
+    """Scalars as they are, nested values (e.g. a work location with several addresses) as JSON"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def parse_date(value):
+    """First MM/DD/YYYY in the value -> date, None if there is none"""
+    if value is None or isinstance(value, date):
+        return value
+    match = DATE_PATTERN.search(str(value))
+    if not match:
+        return None
+    month, day, year = (int(part) for part in match.groups())
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def iso_date(value):
+    """Portal date -> 'YYYY-MM-DD', None if the value holds no date"""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+
+def as_list(value):
+    """A single value or list of values as a list"""
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def permit_contacts(permit):
+    """(role, contact) pairs of a permit: applicant, licensed professionals and related contacts"""
+    more_details = permit.get("more_details") or {}
+    related_contacts = (more_details.get("related_contacts") or {}).get("contact_information")
+    return (
+        [("applicant", contact) for contact in as_list(permit.get("applicant"))]
+        + [("licensed_professional", contact) for contact in as_list(permit.get("licensed_professional"))]
+        + [("related_contact", contact) for contact in as_list(related_contacts)]
+    )
+
+
+def permit_fees(permit):
+    """(kind, fee) pairs of the outstanding and paid fee lines"""
+    fees = permit.get("fees") or {}
+    return [(kind, fee) for kind, key in (("outstanding", "outstanding_fees"), ("paid", "paid_fees"))
+            for fee in fees.get(key) or []]
+
+
+def permit_workflow_steps(permit):
+    """(workflow, step) pairs of the processing status, in page order"""
+    return [(workflow, step) for workflow, steps in (permit.get("processing_status") or {}).items()
+            for step in as_list(steps)]
+
+
+class PermitStore:
+    """SQLite store of finished permits: the full JSON plus permits/contacts/fees/workflow_steps/conditions tables"""
+    
+    def __init__(self, db_file, batch_size=50):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.batch = []
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        child_key = "record_number TEXT NOT NULL, position INTEGER NOT NULL"
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS permits (
+                {", ".join(f"{column} TEXT" + (" PRIMARY KEY" if column == "record_number" else "") for column in PERMIT_COLUMNS)},
+                data TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_permits_status ON permits(status);
+            CREATE INDEX IF NOT EXISTS idx_permits_record_status ON permits(record_status);
+            CREATE INDEX IF NOT EXISTS idx_permits_permit_type ON permits(permit_type);
+            
+            CREATE TABLE IF NOT EXISTS contacts (
+                {child_key}, role TEXT NOT NULL, {", ".join(f"{column} TEXT" for column in CONTACT_COLUMNS)}
+            );
+            CREATE INDEX IF NOT EXISTS idx_contacts_record_number ON contacts(record_number);
+            
+            CREATE TABLE IF NOT EXISTS fees (
+                {child_key}, kind TEXT NOT NULL, {", ".join(f"{column} TEXT" for column in FEE_COLUMNS)}
+            );
+            CREATE INDEX IF NOT EXISTS idx_fees_record_number ON fees(record_number);
+            
+            CREATE TABLE IF NOT EXISTS workflow_steps (
+                {child_key}, workflow TEXT NOT NULL, {", ".join(f"{column} TEXT" for column in WORKFLOW_STEP_COLUMNS)}
+            );
+            CREATE INDEX IF NOT EXISTS idx_workflow_steps_record_number ON workflow_steps(record_number);
+            CREATE INDEX IF NOT EXISTS idx_workflow_steps_marked ON workflow_steps(marked_as, marked_date);
+            
+            CREATE TABLE IF NOT EXISTS conditions (
+                {child_key}, {", ".join(f"{column} TEXT" for column in CONDITION_COLUMNS)}
+            );
+            CREATE INDEX IF NOT EXISTS idx_conditions_record_number ON conditions(record_number);
+        """)
+        # Databases written before dates were normalized hold them as MM/DD/YYYY
+        self.conn.create_function("iso_date", 1, iso_date, deterministic=True)
+        with self.conn:
+            for table, columns in DATE_COLUMNS.items():
+                for column in columns:
+                    self.conn.execute(f"UPDATE {table} SET {column} = iso_date({column}) WHERE {column} LIKE '%/%'")
+    
+    def add(self, permit):
+        """Queue a finished permit, writing the batch once it is full"""
+        if not permit.get("record_number"):
+            return
+        self.batch.append(permit)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Upsert the queued permits and replace their child rows in one transaction"""
+        if not self.batch:
+            return
+        permits = self.batch
+        self.batch = []
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        
+        permit_rows, contact_rows, fee_rows, step_rows, condition_rows = [], [], [], [], []
+        for permit in permits:
+            record_number = permit["record_number"]
+            fees = permit.get("fees") or {}
+            values = {column: as_text(permit.get(column)) for column in PERMIT_COLUMNS}
+            values["total_outstanding"] = fees.get("total_outstanding")
+            values["total_paid"] = fees.get("total_paid")
+            permit_rows.append(
+                tuple(values[column] for column in PERMIT_COLUMNS)
+                + (json.dumps(permit, ensure_ascii=False), updated_at)
+            )
+            
+            for position, (role, contact) in enumerate(permit_contacts(permit)):
+                contact_rows.append((record_number, position, role) + tuple(as_text(contact.get(column)) for column in CONTACT_COLUMNS))
+            
+            positions = {}
+            for kind, fee in permit_fees(permit):
+                positions[kind] = positions.get(kind, -1) + 1
+                fee_rows.append((record_number, positions[kind], kind)
+                                + tuple(iso_date(fee.get(column)) if column == "date" else fee.get(column)
+                                        for column in FEE_COLUMNS))
+            
+            for position, (workflow, step) in enumerate(permit_workflow_steps(permit)):
+                step_rows.append((record_number, position, workflow)
+                                 + tuple(iso_date(step.get(column)) if column.endswith("_date") else step.get(column)
+                                         for column in WORKFLOW_STEP_COLUMNS))
+            
+            for position, condition in enumerate(permit.get("conditions") or []):
+                condition_rows.append(
+                    (record_number, position, condition.get("group"))
+                    + tuple(iso_date(condition.get(column)) if column == "date" else condition.get(column)
+                            for column in CONDITION_COLUMNS[1:])
+                )
+        
+        record_numbers = [(permit["record_number"],) for permit in permits]
+        placeholders = lambda count: ", ".join("?" * count)
+        with self.conn:
+            for table in ("contacts", "fees", "workflow_steps", "conditions"):
+                self.conn.executemany(f"DELETE FROM {table} WHERE record_number = ?", record_numbers)
+            # Upsert keeps the rowid, so exports stay in the order permits were first saved
+            self.conn.executemany(
+                f"""
+                INSERT INTO permits ({", ".join(PERMIT_COLUMNS)}, data, updated_at)
+                VALUES ({placeholders(len(PERMIT_COLUMNS) + 2)})
+                ON CONFLICT(record_number) DO UPDATE SET
+                    {", ".join(f"{column} = excluded.{column}" for column in PERMIT_COLUMNS[1:])},
+                    data = excluded.data, updated_at = excluded.updated_at
+                """,
+                permit_rows
+            )
+            self.conn.executemany(
+                f"INSERT INTO contacts VALUES ({placeholders(3 + len(CONTACT_COLUMNS))})", contact_rows
+            )
+            self.conn.executemany(f"INSERT INTO fees VALUES ({placeholders(3 + len(FEE_COLUMNS))})", fee_rows)
+            self.conn.executemany(
+                f"INSERT INTO workflow_steps VALUES ({placeholders(3 + len(WORKFLOW_STEP_COLUMNS))})", step_rows
+            )
+            self.conn.executemany(
+                f"INSERT INTO conditions VALUES ({placeholders(2 + len(CONDITION_COLUMNS))})", condition_rows
+            )
+    
+    def count(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM permits").fetchone()[0]
+    
+    def iter_permits(self):
+        """Yield the stored permits one at a time, in the order they were first saved"""
+        self.flush()
+        cursor = self.conn.execute("SELECT data FROM permits ORDER BY rowid")
+        for (data,) in cursor:
+            yield json.loads(data)
+    
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def contact_key(contact, role):
+    """License number for licensed professionals, contact id plus name for other contacts, None if neither is known"""
+    if not isinstance(contact, dict):
+        return None
+    if role == "licensed_professional":
+        return f"license:{contact['license']}" if contact.get("license") else None
+    if contact.get("contact_id"):
+        return "contact:" + "|".join(contact.get(field) or "" for field in ("contact_id", "name", "business_name"))
+    return None
+
+
+def raw_contact_key(text, phones):
+    """Key of a contact's raw page text, so a parsed contact is only reused for exactly the same text"""
+    return "raw:" + _hash([text, phones])
+
+
+def map_contacts(permit, replace):
+    """Copy of a permit with every contact swapped for replace(role, contact)"""
+    def apply(value, role):
+        if isinstance(value, list):
+            return [replace(role, contact) for contact in value]
+        return replace(role, value) if value else value
+    
+    permit = dict(permit)
+    for role in ("applicant", "licensed_professional"):
+        if permit.get(role):
+            permit[role] = apply(permit[role], role)
+    more_details = permit.get("more_details") or {}
+    related_contacts = more_details.get("related_contacts") or {}
+    if related_contacts.get("contact_information"):
+        permit["more_details"] = dict(more_details)
+        permit["more_details"]["related_contacts"] = dict(
+            related_contacts, contact_information=apply(related_contacts["contact_information"], "related_contact")
+        )
+    return permit
+
+
+def contacts_to_refs(permit, contacts):
+    """Replace every keyed contact by {"contact_ref": key}, collecting the contacts themselves in `contacts`.
+    The first contact seen under a key is stored; fields this permit's copy has different stay in the reference."""
+    def to_ref(role, contact):
+        key = contact_key(contact, role)
+        if key is None:
+            return contact
+        stored = contacts.setdefault(key, contact)
+        if any(field not in contact for field in stored):
+            # Can't be expressed as overrides, keep it whole
+            return contact
+        return {"contact_ref": key, **{field: value for field, value in contact.items() if stored.get(field) != value}}
+    return map_contacts(permit, to_ref)
+
+
+def resolve_contact_refs(permit, contacts):
+    """Inverse of contacts_to_refs"""
+    def resolve(role, contact):
+        if isinstance(contact, dict) and "contact_ref" in contact:
+            if contact["contact_ref"] not in contacts:
+                return contact
+            overrides = {field: value for field, value in contact.items() if field != "contact_ref"}
+            return {**contacts[contact["contact_ref"]], **overrides}
+        return contact
+    return map_contacts(permit, resolve)
+
+
+class ContactCache:
+    """Contacts and licensed professionals seen on earlier permits, optionally kept in SQLite between runs"""
+    
+    # Unsaved contacts are written to SQLite in batches of this size, not only at the end of the run
+    FLUSH_BATCH = 500
+    
+    def __init__(self, db_file=None, max_age_days=30, max_entries=None):
+        # With max_entries, the least recently used contacts are dropped from memory (SQLite still has them)
+        self.contacts = OrderedDict()
+        self.max_entries = max_entries
+        self.dirty = {}
+        self.hits = 0
+        self.misses = 0
+        self.conn = None
+        self.cutoff = None
+        if db_file:
+            db_file = Path(db_file)
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(db_file))
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS contact_cache (
+                    key TEXT PRIMARY KEY,
+                    contact TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self.conn.commit()
+            # Contact details do change (new phone, new address), so old entries are not trusted
+            self.cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+            # Most recently updated last, so a bounded cache keeps the newest ones
+            rows = self.conn.execute(
+                "SELECT key, contact FROM contact_cache WHERE updated_at >= ? ORDER BY updated_at DESC LIMIT ?",
+                (self.cutoff, max_entries if max_entries else -1)
+            ).fetchall()
+            for key, contact in reversed(rows):
+                self.contacts[key] = json.loads(contact)
+    
+    def get(self, key):
+        """Copy of the cached contact, or None"""
+        contact = self.contacts.get(key) if key else None
+        if contact is None and key and self.max_entries and self.conn:
+            contact = self._stored(key)
+            if contact is not None:
+                self._keep(key, contact)
+        if contact is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.contacts.move_to_end(key)
+        return dict(contact)
+    
+    def put(self, key, contact):
+        if self.contacts.get(key) != contact:
+            self._keep(key, contact)
+            if self.conn:
+                self.dirty[key] = contact
+                if len(self.dirty) >= self.FLUSH_BATCH:
+                    self.flush()
+        else:
+            self.contacts.move_to_end(key)
+    
+    def _keep(self, key, contact):
+        self.contacts[key] = contact
+        self.contacts.move_to_end(key)
+        if self.max_entries:
+            while len(self.contacts) > self.max_entries:
+                self.contacts.popitem(last=False)
+    
+    def _stored(self, key):
+        """Contact dropped from memory, from the unsaved batch or SQLite"""
+        if key in self.dirty:
+            return self.dirty[key]
+        row = self.conn.execute(
+            "SELECT contact FROM contact_cache WHERE key = ? AND updated_at >= ?", (key, self.cutoff)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def remember(self, permit):
+        """Cache every keyed contact of a finished permit"""
+        for role, contact in permit_contacts(permit):
+            key = contact_key(contact, role)
+            if key:
+                self.put(key, contact)
+    
+    def flush(self):
+        if not self.conn or not self.dirty:
+            return
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO contact_cache (key, contact, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET contact = excluded.contact, updated_at = excluded.updated_at
+                """,
+                [(key, json.dumps(contact, ensure_ascii=False), updated_at) for key, contact in self.dirty.items()]
+            )
+        self.dirty = {}
+    
+    def close(self):
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
@@ -1,16 +1,18 @@
 import sys
 import asyncio
+import json
 import logging
+from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QTextEdit, QGroupBox, QSpinBox,
-    QDateEdit, QMessageBox, QCheckBox
+    QDateEdit, QMessageBox, QCheckBox, QFileDialog, QComboBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QDate
 from PyQt6.QtGui import QFont, QTextCursor
 
-from lee_county_permit_scraper import LeeCountyPermitScraper
+from lee_county_permit_scraper import LeeCountyPermitScraper, DETAIL_SECTIONS
 
 
 class ScraperThread(QThread):
@@ -18,7 +20,8 @@ class ScraperThread(QThread):
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool, str)
     
-    def __init__(self, start_date, end_date, max_concurrent, output_file, user_data_dir, headless):
+    def __init__(self, start_date, end_date, max_concurrent, output_file, user_data_dir, headless, resume_dir=None,
+                 shard_by=None, sections=None, adaptive_concurrency=False, max_concurrent_limit=None, bounded_memory=False):
         super().__init__()
         self.start_date = start_date
         self.end_date = end_date
@@ -26,6 +29,12 @@ class ScraperThread(QThread):
         self.output_file = output_file
         self.user_data_dir = user_data_dir
         self.headless = headless
+        self.resume_dir = resume_dir
+        self.shard_by = shard_by
+        self.sections = sections
+        self.adaptive_concurrency = adaptive_concurrency
+        self.max_concurrent_limit = max_concurrent_limit
+        self.bounded_memory = bounded_memory
         self._is_running = True
         self.scraper = None
     
@@ -59,14 +68,21 @@ class ScraperThread(QThread):
             self.scraper = LeeCountyPermitScraper(
                 output_file=self.output_file,
                 user_data_dir=self.user_data_dir,
-                max_concurrent=self.max_concurrent
+                max_concurrent=self.max_concurrent,
+                stream_output=True,
+                resume_dir=self.resume_dir,
+                shard_by=self.shard_by,
+                adaptive_concurrency=self.adaptive_concurrency,
+                max_concurrent_limit=self.max_concurrent_limit,
+                bounded_memory=self.bounded_memory
             )
             
             # Run async code
-            asyncio.run(self.scraper.run(self.start_date, self.end_date, extract_details=True, headless=self.headless))
+            asyncio.run(self.scraper.run(self.start_date, self.end_date, extract_details=True, headless=self.headless,
+                                        sections=self.sections))
             
             if self._is_running:
-                total = len(self.scraper.all_permits)
+                total = self.scraper.permit_count
                 message = f"Scraping complete! Total permits: {total}\n\nOutput Folder:\n{self.scraper.output_dir}\n\nFiles:\n  • {self.scraper.output_file.name}\n  • {self.scraper.csv_file.name}"
                 self.log_signal.emit("\n" + "="*50)
                 self.log_signal.emit(message)
@@ -74,7 +90,7 @@ class ScraperThread(QThread):
                 
                 self.finished_signal.emit(True, message)
             else:
-                message = f"Scraping stopped by user\n\nPermits collected: {len(self.scraper.all_permits)}\n\nOutput Folder:\n{self.scraper.output_dir}"
+                message = f"Scraping stopped by user\n\nPermits collected: {self.scraper.permit_count}\n\nOutput Folder:\n{self.scraper.output_dir}"
                 self.log_signal.emit("Scraping stopped by user")
                 self.finished_signal.emit(True, message)
         except Exception as e:
@@ -164,10 +180,55 @@ class PermitScraperGUI(QMainWindow):
         
         concurrent_layout.addWidget(concurrent_label)
         concurrent_layout.addWidget(self.concurrent_spin)
+        
+        self.adaptive_checkbox = QCheckBox("Adaptive")
+        self.adaptive_checkbox.setChecked(False)
+        self.adaptive_checkbox.setToolTip(f"Start at the value above and raise or lower concurrency "
+                                          f"(1-{self.concurrent_spin.maximum()})\n"
+                                          "depending on how fast and reliably the portal answers.")
+        concurrent_layout.addWidget(self.adaptive_checkbox)
+        concurrent_layout.addSpacing(20)
+        
+        # Date-range sharding
+        shard_label = QLabel("Split Search:")
+        self.shard_combo = QComboBox()
+        self.shard_combo.addItem("Off", None)
+        self.shard_combo.addItem("By Week", "week")
+        self.shard_combo.addItem("By Day", "day")
+        self.shard_combo.setToolTip("Split the date range into smaller searches that run in parallel.\n"
+                                    "Speeds up long ranges and keeps each search under the portal's result limit.")
+        
+        concurrent_layout.addWidget(shard_label)
+        concurrent_layout.addWidget(self.shard_combo)
         concurrent_layout.addStretch()
         
         config_layout.addLayout(concurrent_layout)
         
+        # Detail sections to collect
+        sections_layout = QHBoxLayout()
+        sections_label = QLabel("Detail Sections:")
+        sections_label.setMinimumWidth(150)
+        sections_layout.addWidget(sections_label)
+        
+        section_titles = {
+            "summary": "Summary",
+            "more_details": "More Details",
+            "processing_status": "Processing Status",
+            "related_records": "Related Records",
+            "fees": "Fees",
+            "conditions": "Conditions",
+        }
+        self.section_checkboxes = {}
+        for section in DETAIL_SECTIONS:
+            checkbox = QCheckBox(section_titles[section])
+            checkbox.setChecked(True)
+            checkbox.setToolTip("Unchecked sections are skipped entirely (fewer tab loads per permit)")
+            self.section_checkboxes[section] = checkbox
+            sections_layout.addWidget(checkbox)
+        sections_layout.addStretch()
+        
+        config_layout.addLayout(sections_layout)
+        
         # Headless mode checkbox
         headless_layout = QHBoxLayout()
         self.headless_checkbox = QCheckBox("Run in Headless Mode (browser hidden) - Not Recommended")
@@ -175,6 +236,13 @@ class PermitScraperGUI(QMainWindow):
         self.headless_checkbox.setToolTip("⚠️ Headless mode is NOT RECOMMENDED.\n\nWhen unchecked (recommended): Browser window is visible during scraping.\nThis allows you to monitor progress and troubleshoot issues.\n\nWhen checked: Browser runs hidden in the background.\nMay cause issues with some websites that detect headless browsers.")
         
         headless_layout.addWidget(self.headless_checkbox)
+        headless_layout.addSpacing(20)
+        
+        self.bounded_memory_checkbox = QCheckBox("Bounded Memory")
+        self.bounded_memory_checkbox.setChecked(False)
+        self.bounded_memory_checkbox.setToolTip("Don't keep finished permits in memory, only write them to disk.\n"
+                                                "Use it for long date ranges on a machine with little memory.")
+        headless_layout.addWidget(self.bounded_memory_checkbox)
         headless_layout.addStretch()
         
         config_layout.addLayout(headless_layout)
@@ -225,6 +293,27 @@ class PermitScraperGUI(QMainWindow):
         """)
         self.stop_button.clicked.connect(self.stop_scraping)
         
+        self.resume_button = QPushButton("Resume Run...")
+        self.resume_button.setFixedSize(120, 32)
+        self.resume_button.setToolTip("Continue an interrupted run from its output folder")
+        self.resume_button.setStyleSheet("""
+            QPushButton {
+                background-color: #FF9800;
+                color: white;
+                font-size: 12px;
+                font-weight: bold;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #e68900;
+            }
+            QPushButton:disabled {
+                background-color: #cccccc;
+                color: #666666;
+            }
+        """)
+        self.resume_button.clicked.connect(self.resume_scraping)
+        
         self.clear_button = QPushButton("Clear Logs")
         self.clear_button.setFixedSize(100, 32)
         self.clear_button.setStyleSheet("""
@@ -243,6 +332,7 @@ class PermitScraperGUI(QMainWindow):
         
         button_layout.addWidget(self.start_button)
         button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(self.resume_button)
         button_layout.addWidget(self.clear_button)
         
         main_layout.addLayout(button_layout)
@@ -283,55 +373,112 @@ class PermitScraperGUI(QMainWindow):
                                   "Start date must be before or equal to end date!")
                 return
             
-            # Get configuration
-            max_concurrent = self.concurrent_spin.value()
-            headless = self.headless_checkbox.isChecked()
-            output_file = "permits_data.json"
-            user_data_dir = "./chrome_profile"
+            self.launch_scraper(start_date, end_date)
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to start scraper: {str(e)}")
+            self.reset_controls()
+    
+    def resume_scraping(self):
+        """Resume an interrupted run from its output folder"""
+        try:
+            resume_dir = QFileDialog.getExistingDirectory(self, "Select Output Folder to Resume", "output")
+            if not resume_dir:
+                return
             
-            # Disable controls
-            self.start_button.setEnabled(False)
-            self.stop_button.setEnabled(True)
-            self.start_date_edit.setEnabled(False)
-            self.end_date_edit.setEnabled(False)
-            self.concurrent_spin.setEnabled(False)
-            self.headless_checkbox.setEnabled(False)
+            checkpoint_file = Path(resume_dir) / "checkpoint.json"
+            if not checkpoint_file.exists():
+                QMessageBox.warning(self, "No Checkpoint",
+                                    "The selected folder has no checkpoint.json to resume from.")
+                return
             
-            # Clear logs
-            self.log_text.clear()
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
             
-            # Update status
-            self.statusBar().showMessage("Scraping in progress...")
-            self.append_log(f"Configuration:")
-            self.append_log(f"  Start Date: {start_date}")
-            self.append_log(f"  End Date: {end_date}")
-            self.append_log(f"  Max Concurrent: {max_concurrent}")
-            self.append_log(f"  Headless Mode: {'Yes' if headless else 'No (browser visible)'}")
-            self.append_log("-" * 80)
+            # Show the sharding and sections the run started with, the scraper keeps them from the checkpoint
+            self.shard_combo.setCurrentIndex(max(0, self.shard_combo.findData(checkpoint.get("shard_by"))))
+            saved_sections = checkpoint.get("sections")
+            for section, checkbox in self.section_checkboxes.items():
+                checkbox.setChecked(saved_sections is None or section in saved_sections)
             
-            # Start scraper thread
-            self.scraper_thread = ScraperThread(
-                start_date=start_date,
-                end_date=end_date,
-                max_concurrent=max_concurrent,
-                output_file=output_file,
-                user_data_dir=user_data_dir,
-                headless=headless
-            )
-            self.scraper_thread.log_signal.connect(self.append_log)
-            self.scraper_thread.finished_signal.connect(self.scraping_finished)
-            self.scraper_thread.start()
+            # Dates come from the checkpoint, the scraper repeats the original search
+            self.launch_scraper(checkpoint.get("start_date"), checkpoint.get("end_date"), resume_dir=resume_dir)
             
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to start scraper: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to resume scraper: {str(e)}")
             self.reset_controls()
     
+    def launch_scraper(self, start_date, end_date, resume_dir=None):
+        """Disable the controls and start the scraper thread"""
+        # Get configuration
+        max_concurrent = self.concurrent_spin.value()
+        adaptive_concurrency = self.adaptive_checkbox.isChecked()
+        # Adaptive concurrency may go as high as the spin box allows
+        max_concurrent_limit = self.concurrent_spin.maximum()
+        headless = self.headless_checkbox.isChecked()
+        bounded_memory = self.bounded_memory_checkbox.isChecked()
+        shard_by = self.shard_combo.currentData()
+        sections = [section for section, checkbox in self.section_checkboxes.items() if checkbox.isChecked()]
+        output_file = "permits_data.json"
+        user_data_dir = "./chrome_profile"
+        
+        # Disable controls
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.resume_button.setEnabled(False)
+        self.start_date_edit.setEnabled(False)
+        self.end_date_edit.setEnabled(False)
+        self.concurrent_spin.setEnabled(False)
+        self.adaptive_checkbox.setEnabled(False)
+        self.shard_combo.setEnabled(False)
+        for checkbox in self.section_checkboxes.values():
+            checkbox.setEnabled(False)
+        self.headless_checkbox.setEnabled(False)
+        self.bounded_memory_checkbox.setEnabled(False)
+        
+        # Clear logs
+        self.log_text.clear()
+        
+        # Update status
+        self.statusBar().showMessage("Scraping in progress...")
+        self.append_log(f"Configuration:")
+        if resume_dir:
+            self.append_log(f"  Resuming: {resume_dir}")
+        self.append_log(f"  Start Date: {start_date}")
+        self.append_log(f"  End Date: {end_date}")
+        self.append_log(f"  Max Concurrent: {max_concurrent}{f' (adaptive, 1-{max_concurrent_limit})' if adaptive_concurrency else ''}")
+        self.append_log(f"  Split Search: {self.shard_combo.currentText()}")
+        self.append_log(f"  Detail Sections: {', '.join(sections) if sections else 'none (search results only)'}")
+        self.append_log(f"  Headless Mode: {'Yes' if headless else 'No (browser visible)'}")
+        self.append_log(f"  Bounded Memory: {'Yes' if bounded_memory else 'No'}")
+        self.append_log("-" * 80)
+        
+        # Start scraper thread
+        self.scraper_thread = ScraperThread(
+            start_date=start_date,
+            end_date=end_date,
+            max_concurrent=max_concurrent,
+            output_file=output_file,
+            user_data_dir=user_data_dir,
+            headless=headless,
+            resume_dir=resume_dir,
+            # A resumed run keeps the sharding and collects the sections saved in its checkpoint
+            shard_by=None if resume_dir else shard_by,
+            sections=None if resume_dir else sections,
+            adaptive_concurrency=adaptive_concurrency,
+            max_concurrent_limit=max_concurrent_limit,
+            bounded_memory=bounded_memory
+        )
+        self.scraper_thread.log_signal.connect(self.append_log)
+        self.scraper_thread.finished_signal.connect(self.scraping_finished)
+        self.scraper_thread.start()
+    
     def stop_scraping(self):
         """Stop the scraping process and quit the application"""
         if self.scraper_thread and self.scraper_thread.isRunning():
             reply = QMessageBox.question(
                 self, "Stop Scraping",
-                "Are you sure you want to stop the scraping process?\n\nThe browser will close, current progress will be saved, and the application will quit.",
+                "Are you sure you want to stop the scraping process?\n\nThe browser will close, current progress will be saved, and the application will quit.\nUse 'Resume Run...' to continue later.",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             
@@ -371,10 +518,16 @@ class PermitScraperGUI(QMainWindow):
         """Reset UI controls to initial state"""
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
+        self.resume_button.setEnabled(True)
         self.start_date_edit.setEnabled(True)
         self.end_date_edit.setEnabled(True)
         self.concurrent_spin.setEnabled(True)
+        self.adaptive_checkbox.setEnabled(True)
+        self.shard_combo.setEnabled(True)
+        for checkbox in self.section_checkboxes.values():
+            checkbox.setEnabled(True)
         self.headless_checkbox.setEnabled(True)
+        self.bounded_memory_checkbox.setEnabled(True)
     
     def append_log(self, message):
         """Append a message to the log display"""
@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import uuid
+from asyncio import Semaphore
+from datetime import datetime
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from lee_county_permit_scraper import LeeCountyPermitScraper, RESOURCE_BLOCK_PROFILES
+
+logger = logging.getLogger('main')
+
+# Scraper options a job may set, on top of start_date/end_date/sections/output_dir
+JOB_OPTIONS = ("agency", "module", "shard_by", "resource_profile", "use_database", "parquet", "http_fast_path",
+               "contact_refs", "follow_related", "related_max_depth", "bounded_memory")
+BOOLEAN_OPTIONS = ("extract_details", "use_database", "parquet", "http_fast_path", "contact_refs", "follow_related",
+                   "bounded_memory")
+# Agency codes and modules go into the portal URL
+URL_PART_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                500: "Internal Server Error"}
+
+
+class ScraperDaemon:
+    """Keeps one browser context warm and runs queued scrape jobs in it, sharing one permit concurrency limit"""
+    
+    def __init__(self, user_data_dir="./chrome_profile", headless=True, max_jobs=2, max_concurrent=5,
+                 output_root="output/jobs"):
+        self.user_data_dir = Path(user_data_dir)
+        self.headless = headless
+        self.max_jobs = max_jobs
+        self.max_concurrent = max_concurrent
+        self.output_root = Path(output_root)
+        # Permit slots shared by every running job, so N jobs don't mean N times the load on the portal
+        self.semaphore = Semaphore(max_concurrent)
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.running = {}
+        self.playwright = None
+        self.context = None
+        self.context_lock = asyncio.Lock()
+    
+    async def _ensure_context(self):
+        """The warm browser context, relaunched if the browser was closed or crashed"""
+        async with self.context_lock:
+            if self.context is None:
+                logger.info("Launching browser")
+                self.context = await self.playwright.chromium.launch_persistent_context(
+                    user_data_dir=str(self.user_data_dir),
+                    channel="chrome",
+                    headless=self.headless,
+                    no_viewport=True,
+                )
+                self.context.on("close", lambda *args: setattr(self, "context", None))
+            return self.context
+    
+    def validate(self, request):
+        """Raise ValueError for a job request the scraper would reject, so it fails at submission"""
+        unknown = sorted(set(request) - {"start_date", "end_date", "sections", "output_dir", "extract_details"}
+                         - set(JOB_OPTIONS))
+        if unknown:
+            raise ValueError(f"unknown job fields {unknown!r}")
+        dates = {}
+        for field in ("start_date", "end_date"):
+            try:
+                dates[field] = datetime.strptime(str(request.get(field)), "%m/%d/%Y")
+            except ValueError:
+                raise ValueError(f"{field} must be a mm/dd/yyyy date, got {request.get(field)!r}")
+        if dates["end_date"] < dates["start_date"]:
+            raise ValueError(f"end_date must not be before start_date, got {request['start_date']!r} - {request['end_date']!r}")
+        
+        LeeCountyPermitScraper.normalize_sections(request.get("sections"))
+        for field in ("agency", "module"):
+            if field in request and not (isinstance(request[field], str) and URL_PART_PATTERN.fullmatch(request[field])):
+                raise ValueError(f"{field} must be letters, digits or underscores, got {request[field]!r}")
+        if request.get("shard_by") not in (None, "day", "week"):
+            raise ValueError(f"shard_by must be None, 'day' or 'week', got {request['shard_by']!r}")
+        if "resource_profile" in request and request["resource_profile"] not in RESOURCE_BLOCK_PROFILES:
+            raise ValueError(f"resource_profile must be one of {list(RESOURCE_BLOCK_PROFILES)}, "
+                             f"got {request['resource_profile']!r}")
+        for field in BOOLEAN_OPTIONS:
+            if field in request and not isinstance(request[field], bool):
+                raise ValueError(f"{field} must be true or false, got {request[field]!r}")
+        depth = request.get("related_max_depth", 1)
+        if not isinstance(depth, int) or isinstance(depth, bool) or depth < 1:
+            raise ValueError(f"related_max_depth must be at least 1, got {depth!r}")
+        if request.get("output_dir") is not None and not isinstance(request["output_dir"], str):
+            raise ValueError(f"output_dir must be a path, got {request['output_dir']!r}")
+    
+    def submit(self, request):
+        """Validate a job request and queue it, returns the job"""
+        self.validate(request)
+        
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "request": request,
+            "output_dir": str(Path(request.get("output_dir") or self.output_root / job_id)),
+            "permits": 0,
+            "error": None,
+            "submitted_at": datetime.now().isoformat(timespec="seconds"),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job_id)
+        logger.info(f"Job {job_id} queued: {request['start_date']} - {request['end_date']}")
+        return job
+    
+    def cancel(self, job_id):
+        job = self.jobs[job_id]
+        if job["status"] == "queued":
+            job["status"] = "cancelled"
+        elif job["status"] == "running":
+            # The scraper saves what it has and marks its checkpoint unfinished
+            self.running[job_id].should_stop = True
+            job["status"] = "stopping"
+        return job
+    
+    def _make_scraper(self, job):
+        request = job["request"]
+        options = {option: request[option] for option in JOB_OPTIONS if option in request}
+        return LeeCountyPermitScraper(
+            output_file="permits_data.json",
+            user_data_dir=self.user_data_dir,
+            max_concurrent=self.max_concurrent,
+            stream_output=True,
+            sections=request.get("sections"),
+            output_dir=job["output_dir"],
+            semaphore=self.semaphore,
+            **options
+        )
+    
+    async def _job_runner(self):
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs[job_id]
+            if job["status"] == "cancelled":
+                continue
+            request = job["request"]
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat(timespec="seconds")
+            try:
+                scraper = self._make_scraper(job)
+                self.running[job_id] = scraper
+                context = await self._ensure_context()
+                await scraper.run_in_context(
+                    context, request["start_date"], request["end_date"],
+                    extract_details=request.get("extract_details", True), shared=True
+                )
+                job["permits"] = scraper.permit_count
+                job["status"] = "stopped" if scraper.should_stop else "finished"
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                job["status"] = "failed"
+                job["error"] = str(e)
+            finally:
+                self.running.pop(job_id, None)
+                job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+                logger.info(f"Job {job_id} {job['status']} ({job['permits']} permits) - {job['output_dir']}")
+    
+    async def _route(self, method, path, body):
+        """(status, payload) for one API request"""
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return 200, {"browser": self.context is not None, "queued": self.queue.qsize(),
+                         "running": sorted(self.running)}
+        if parts == ["jobs"]:
+            if method == "GET":
+                return 200, list(self.jobs.values())
+            if method == "POST":
+                try:
+                    request = json.loads(body or b"{}")
+                    if not isinstance(request, dict):
+                        raise ValueError("job must be a JSON object")
+                    return 202, self.submit(request)
+                except ValueError as e:
+                    return 400, {"error": str(e)}
+            return 405, {"error": f"{method} not allowed on /jobs"}
+        if len(parts) == 2 and parts[0] == "jobs":
+            if parts[1] not in self.jobs:
+                return 404, {"error": f"no job {parts[1]!r}"}
+            if method == "GET":
+                return 200, self.jobs[parts[1]]
+            if method == "DELETE":
+                return 200, self.cancel(parts[1])
+            return 405, {"error": f"{method} not allowed on /jobs/<id>"}
+        return 404, {"error": f"no such endpoint {path!r}"}
+    
+    async def _handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1: one JSON request per connection"""
+        status, payload = 400, {"error": "bad request"}
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+            if len(request_line) >= 2:
+                status, payload = await self._route(request_line[0].upper(), request_line[1], body)
+        except Exception as e:
+            logger.error(f"API error: {str(e)}")
+            status, payload = 500, {"error": str(e)}
+        
+        data = json.dumps(payload, indent=2).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    async def serve(self, host="127.0.0.1", port=8765):
+        async with async_playwright() as p:
+            self.playwright = p
+            # Start the browser now, so the first job doesn't pay for it
+            await self._ensure_context()
+            runners = [asyncio.create_task(self._job_runner()) for _ in range(self.max_jobs)]
+            server = await asyncio.start_server(self._handle_connection, host, port)
+            logger.info(f"Scraper daemon listening on http://{host}:{port} "
+                        f"({self.max_jobs} jobs at a time, {self.max_concurrent} permits in flight)")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                for scraper in self.running.values():
+                    scraper.should_stop = True
+                # Give running jobs the chance to save and checkpoint
+                try:
+                    await asyncio.wait_for(self._wait_idle(), timeout=120)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Jobs still running at shutdown: {', '.join(sorted(self.running))}")
+                for runner in runners:
+                    runner.cancel()
+                if self.context:
+                    await self.context.close()
+    
+    async def _wait_idle(self):
+        while self.running:
+            await asyncio.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a browser warm and run scrape jobs submitted over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--max-jobs", type=int, default=2, help="Jobs running at the same time")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Permits processed simultaneously over all jobs")
+    parser.add_argument("--output-root", default="output/jobs", help="Folder of the job output folders")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+    
+    daemon = ScraperDaemon(
+        headless=not args.headed,
+        max_jobs=args.max_jobs,
+        max_concurrent=args.max_concurrent,
+        output_root=args.output_root,
+    )
+    try:
+        asyncio.run(daemon.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("Scraper daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
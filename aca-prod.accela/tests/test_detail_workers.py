@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from lee_county_permit_scraper import LeeCountyPermitScraper
+
+
+class FakeContext:
+    """Browser context stand-in; the tests replace extraction, so no page is ever opened"""
+    
+    async def new_page(self):
+        raise AssertionError("no page should be opened")
+
+
+def related(record_number, count):
+    return [{"related_record_number": f"{record_number}.{i}", "related_detail_url": f"https://x/{record_number}.{i}"}
+            for i in range(count)]
+
+
+def make_scraper(tmp_path, children):
+    scraper = LeeCountyPermitScraper(output_dir=str(tmp_path), max_concurrent=1, follow_related=True)
+    extracted = []
+    
+    async def extract(context, search_data, record_number, fresh_page=False):
+        await asyncio.sleep(0)
+        extracted.append(record_number)
+        return {"record_number": record_number, "extraction_status": "complete",
+                "related_records_detail": related(record_number, children.get(record_number, 0))}
+    
+    scraper.extract_single_permit_details = extract
+    return scraper, extracted
+
+
+def test_workers_drain_related_records_found_while_running(tmp_path):
+    # One worker and a queue of two: most related records have to wait in the overflow
+    scraper, extracted = make_scraper(tmp_path, {"ROOT": 7})
+    
+    async def run():
+        scraper.start_detail_workers(FakeContext())
+        scraper.pending_permits["ROOT"] = {"record_number": "ROOT", "detail_url": "https://x/ROOT"}
+        await scraper.detail_queue.put((scraper.pending_permits["ROOT"], "ROOT"))
+        await scraper.finish_detail_workers()
+    
+    asyncio.run(run())
+    assert sorted(extracted) == ["ROOT"] + [f"ROOT.{i}" for i in range(7)]
+    assert scraper.pending_permits == {}
+    assert scraper.related_overflow == []
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 5, 8])
+def test_new_workers_drain_overflow_left_after_retries(tmp_path, count):
+    # Related records of permits that only succeeded on retry, with no permit in the queue
+    scraper, extracted = make_scraper(tmp_path, {})
+    record_numbers = [f"R{i}" for i in range(count)]
+    for record_number in record_numbers:
+        search_data = {"record_number": record_number, "detail_url": f"https://x/{record_number}", "related_depth": 1}
+        scraper.pending_permits[record_number] = search_data
+        scraper.related_overflow.append((search_data, record_number))
+    
+    async def run():
+        scraper.start_detail_workers(FakeContext())
+        await scraper.finish_detail_workers()
+    
+    asyncio.run(run())
+    assert sorted(extracted) == record_numbers
+    assert scraper.pending_permits == {}
@@ -0,0 +1,69 @@
+import asyncio
+
+from lee_county_permit_scraper import DetailPagePool
+
+
+class FakePage:
+    
+    async def evaluate(self, script):
+        return 0
+    
+    async def goto(self, url):
+        pass
+    
+    async def close(self):
+        pass
+
+
+def make_pool(size, max_uses=50):
+    opened = []
+    
+    async def open_page():
+        # Yield to the other acquirers while the page opens
+        await asyncio.sleep(0.01)
+        page = FakePage()
+        opened.append(page)
+        return page
+    
+    return DetailPagePool(None, size, max_uses=max_uses, open_page=open_page), opened
+
+
+def test_concurrent_acquires_never_open_more_pages_than_the_pool_size():
+    pool, opened = make_pool(2)
+    
+    async def worker():
+        page = await pool.acquire()
+        await asyncio.sleep(0.01)
+        await pool.release(page)
+    
+    async def run():
+        await asyncio.gather(*(worker() for _ in range(6)))
+    
+    asyncio.run(run())
+    assert len(opened) == 2
+    assert len(pool.uses) == 2
+
+
+def test_try_acquire_counts_pages_still_opening():
+    pool, opened = make_pool(1)
+    
+    async def run():
+        return await asyncio.gather(pool.try_acquire(), pool.try_acquire())
+    
+    pages = asyncio.run(run())
+    assert len(opened) == 1
+    assert pages.count(None) == 1
+
+
+def test_recycled_page_keeps_its_slot_while_closing():
+    pool, opened = make_pool(1, max_uses=1)
+    
+    async def run():
+        page = await pool.acquire()
+        # Release recycles the worn page; a concurrent acquire has to wait for the replacement
+        await asyncio.gather(pool.release(page), pool.acquire())
+    
+    asyncio.run(run())
+    assert len(opened) == 2
+    assert pool.recycled == 1
+    assert len(pool.uses) == 1
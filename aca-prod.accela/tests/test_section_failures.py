@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from lee_county_permit_scraper import LeeCountyPermitScraper
+
+
+class FakePage:
+    """Detail page where every section is empty, except that querying failing_selector raises"""
+    
+    def __init__(self, failing_selector=None):
+        self.failing_selector = failing_selector
+    
+    def on(self, event, callback):
+        pass
+    
+    async def goto(self, url, **kwargs):
+        pass
+    
+    async def wait_for_selector(self, selector, **kwargs):
+        pass
+    
+    async def wait_for_function(self, expression, **kwargs):
+        return True
+    
+    async def inner_text(self, selector, **kwargs):
+        return "B25-0001"
+    
+    async def query_selector(self, selector):
+        if selector == self.failing_selector:
+            raise Exception("Target page, context or browser has been closed")
+        return None
+    
+    async def query_selector_all(self, selector):
+        return []
+    
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self, failing_selector=None):
+        self.failing_selector = failing_selector
+    
+    async def new_page(self):
+        return FakePage(self.failing_selector)
+
+
+async def tab_found(page, tab_name, parent_menu=None):
+    return True
+
+
+def extract(tmp_path, failing_selector):
+    scraper = LeeCountyPermitScraper(output_dir=str(tmp_path), bulk_extraction=False)
+    scraper.navigate_to_tab = tab_found
+    
+    async def run():
+        scraper._ensure_semaphore()
+        return await scraper.extract_single_permit_details(
+            FakeContext(failing_selector), {"record_number": "B25-0001", "detail_url": "https://x/B25-0001"},
+            "B25-0001", fresh_page=True
+        )
+    
+    return asyncio.run(run())
+
+
+def test_per_element_permit_without_failures_is_complete(tmp_path):
+    permit = extract(tmp_path, None)
+    assert permit["extraction_status"] == "complete"
+    assert "failed_sections" not in permit
+
+
+@pytest.mark.parametrize("failing_selector, section", [
+    ("table#tbl_worklocation", "summary"),
+    ("table#ctl00_PlaceHolderMain_PermitDetailList1_RelatContactList", "more_details"),
+    ("div#divProcessingTable table", "processing_status"),
+    ("div#divRelatedCapTree span.ACA_CapDetail_NoRecord", "related_records"),
+    ("div#divFeeList", "fees"),
+    ("table#ctl00_PlaceHolderMain_capConditions_gdvGeneralConditionsList", "conditions"),
+])
+def test_per_element_section_failure_makes_permit_partial(tmp_path, failing_selector, section):
+    permit = extract(tmp_path, failing_selector)
+    assert permit["extraction_status"] == "partial"
+    assert permit["failed_sections"] == [section]
+    assert permit["extraction_error"] == f"sections failed: {section}"